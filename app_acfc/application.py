@@ -23,21 +23,29 @@ from flask import Flask, Response, render_template, request, Request, Blueprint,
 from flask_session import Session
 from waitress import serve
 from typing import Any, Dict, Tuple, List
+from re import fullmatch
+from time import perf_counter
+from uuid import uuid4
 from werkzeug.exceptions import HTTPException, Forbidden, Unauthorized
 from services import PasswordService, SecureSessionService
-from modeles import SessionBdD, User, Commande, Client
+from modeles import SessionBdD, User, Commande, Client, Part, Pro
 from datetime import datetime, date
-from sqlalchemy import text, and_, or_
-from sqlalchemy.orm import Session as SessionBdDType, joinedload
+from sqlalchemy import text, or_, case, select, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session as SessionBdDType
 from sqlalchemy.sql.functions import func
-from logs.logger import acfc_log, INFO, WARNING, ERROR
+from logs.logger import acfc_log, INFO, WARNING, ERROR, contexte_requete, compter_requete_bdd
+from app_acfc.indicateurs import moteur_indicateurs          # Moteur d'indicateurs commerciaux
+from app_acfc.cache import cache_acfc, CLE_COMMANDES_EN_COURS, CLE_INDICATEURS  # Cache des fragments du tableau de bord
+from app_acfc.cache_catalogue import cache_catalogue  # Instantané du catalogue (formulaire de commande)
+from app_acfc.pagination import encoder_curseur, decoder_curseur, apres_curseur  # Pagination par curseur
 from app_acfc.contextes_bp.clients import clients_bp         # Module CRM - Gestion clients
 from app_acfc.contextes_bp.catalogue import catalogue_bp     # Module Catalogue produits
 from app_acfc.contextes_bp.commercial import commercial_bp   # Module Commercial - Devis, commandes
 from app_acfc.contextes_bp.comptabilite import comptabilite_bp # Module Comptabilité - Facturation
 from app_acfc.contextes_bp.stocks import stocks_bp          # Module Stocks - Inventaire
 from app_acfc.contextes_bp.admin import admin_bp            # Module Administration - Utilisateurs
-from app_acfc.contextes_bp.commandes import commandes_bp    # Module Commandes - Gestion des commandes
+from app_acfc.contextes_bp.commandes import commandes_bp, commandes_api_bp # Module Commandes - Gestion des commandes
 
 # Création de l'instance Flask principale avec configuration des dossiers statiques et templates
 acfc = Flask(__name__,
@@ -60,7 +68,7 @@ Session(acfc)
 BASE: str = 'base.html'  # Template de base pour toutes les pages
 
 # Regroupement des blueprints pour faciliter l'enregistrement en masse
-acfc_blueprints: Tuple[Blueprint, ...] = (clients_bp, catalogue_bp, commercial_bp, comptabilite_bp, stocks_bp, admin_bp, commandes_bp)
+acfc_blueprints: Tuple[Blueprint, ...] = (clients_bp, catalogue_bp, commercial_bp, comptabilite_bp, stocks_bp, admin_bp, commandes_bp, commandes_api_bp)
 
 # Dictionnaires de configuration pour standardiser le rendu des pages
 # Structure : title (titre affiché), context (identifiant CSS/JS), page (template base)
@@ -129,6 +137,9 @@ LOG_500_FILE = '500.log'
 # Configuration commerciale
 LOG_COMMERCIAL_FILE = 'commercial.log'
 
+# Traces des requêtes HTTP (durée, nombre de requêtes SQL)
+LOG_REQUETES_FILE = 'requetes.log'
+
 # Messages d'erreur standardisés pour l'authentification
 INVALID: str = 'Identifiants invalides.'
 WRONG_ROAD: str = 'Méthode non autorisée ou droits insuffisants.'
@@ -140,6 +151,29 @@ ph_acfc = PasswordService()
 # MIDDLEWARES - GESTION DES REQUÊTES GLOBALES
 # ====================================================================
 
+# Nombre de requêtes SQL par requête HTTP (contexte de log de la requête en cours)
+event.listen(Engine, 'before_cursor_execute', compter_requete_bdd)
+
+@acfc.before_request
+def ouvrir_contexte_requete() -> None:
+    '''
+    Middleware exécuté en premier : ouvre le contexte de log de la requête.
+
+    L'identifiant de corrélation est repris de l'en-tête X-Request-ID (s'il est valide,
+    ex: posé par nginx) ou généré. Il est ajouté à toutes les entrées de log (fichiers
+    et MongoDB) émises pendant la requête et renvoyé dans la réponse.
+    '''
+    id_requete = request.headers.get('X-Request-ID', '')
+    if not fullmatch(r'[A-Za-z0-9._-]{1,64}', id_requete):
+        id_requete = uuid4().hex
+    request.environ['acfc.debut'] = perf_counter()
+    request.environ['acfc.contexte'] = contexte_requete.set({
+        'id_requete': id_requete,
+        'utilisateur': session.get('pseudo'),
+        'endpoint': request.endpoint,
+        'requetes_bdd': 0
+    })
+
 @acfc.before_request
 def before_request() -> Any:
     '''
@@ -181,63 +215,110 @@ def after_request(response: Response) -> Response:
     Returns:
         Response: Réponse modifiée si nécessaire
     """
-    print("After request")  # Log basique - à remplacer par un logger professionnel
+    contexte = contexte_requete.get()
+    if contexte is None:
+        return response
+    response.headers['X-Request-ID'] = contexte['id_requete']
+
+    # Trace de la requête (fichier et MongoDB) : durée et nombre de requêtes SQL (fichiers statiques exclus)
+    if request.endpoint and request.endpoint != 'static' and not request.endpoint.endswith('.static'):
+        duree_ms = round((perf_counter() - request.environ.get('acfc.debut', perf_counter())) * 1000, 1)
+        acfc_log.log_to_file(INFO, '%s %s %s', request.method, request.path, response.status_code,
+                             specific_logger=LOG_REQUETES_FILE, zone_log='requetes', db_log=True,
+                             champs={'methode': request.method, 'statut': response.status_code,
+                                     'duree_ms': duree_ms, 'utilisateur': session.get('pseudo')})
     return response
 
+@acfc.teardown_request
+def fermer_contexte_requete(_erreur: BaseException | None = None) -> None:
+    '''Referme le contexte de log de la requête (le thread est réutilisé par Waitress).'''
+    jeton = request.environ.pop('acfc.contexte', None)
+    if jeton is not None:
+        contexte_requete.reset(jeton)
+
 # ====================================================================
 # FONCTIONS DE RECHERCHES - HORS ROUTES
 # ====================================================================
 
-def get_current_orders(id_client: int = 0) -> List[Commande]:
+# Taille de page des commandes en cours sur le tableau de bord
+CURRENT_ORDERS_PAGE_SIZE: int = 20
+CURRENT_ORDERS_MAX_PAGE_SIZE: int = 100
+
+def get_current_orders(id_client: int = 0, limit: int = CURRENT_ORDERS_PAGE_SIZE,
+                       after: Tuple[date, int] | None = None) -> Dict[str, Any]:
     """
-    Récupère les commandes en cours pour un client donné.
+    Récupère une page de commandes en cours (non facturées ou non expédiées).
+
+    Seules les colonnes affichées sont sélectionnées (id, date, montant, nom d'affichage
+    du client) et la pagination se fait par curseur (date_commande, id) décroissant :
+    le coût d'une page ne dépend pas du nombre total de commandes ouvertes.
 
     Args:
         id_client (int): ID du client, 0 pour tous les clients
+        limit (int): Nombre maximal de commandes par page
+        after (Tuple[date, int] | None): Curseur de la dernière commande de la page précédente
 
     Returns:
-        List[Commande]: Liste des commandes en cours
+        Dict[str, Any]: {
+            "commandes": [{"id", "date_commande", "montant", "nom_affichage"}, ...],
+            "next_cursor": curseur de la page suivante ou None,
+            "total": nombre total de commandes en cours (première page uniquement, sinon None)
+        }
     """
     # Ouverture de la session
     db_session_orders: SessionBdDType = SessionBdD()
 
-    # Récupération des commandes en cours sans notion de client
-    if id_client == 0:
-        commandes: List[Commande] = (
-            db_session_orders.query(Commande)
-            .options(
-                joinedload(Commande.client).joinedload(Client.part),  # Eager loading du client particulier
-                joinedload(Commande.client).joinedload(Client.pro)    # Eager loading du client professionnel
-            )
-            .filter(or_(
-                Commande.is_facture == False,
-                Commande.is_expedie == False
-            ))
-            .all()
-        )
-
-    # Récupération des commandes en cours pour un client spécifique
-    else:
-        commandes: List[Commande] = (
-            db_session_orders.query(Commande)
-            .options(
-                joinedload(Commande.client).joinedload(Client.part),  # Eager loading du client particulier
-                joinedload(Commande.client).joinedload(Client.pro)    # Eager loading du client professionnel
-            )
-            .filter(and_(
-                Commande.id_client == id_client,
-                or_(
-                    Commande.is_facture == False,
-                    Commande.is_expedie == False
-                )
-            ))
-            .all()
-        )
+    # Filtres communs : commandes non annulées, non facturées ou non expédiées
+    filters: List[Any] = [
+        Commande.is_annulee == False,
+        or_(Commande.is_facture == False, Commande.is_expedie == False)
+    ]
+    if id_client != 0:
+        filters.append(Commande.id_client == id_client)
 
-    # Fermeture de la session
-    db_session_orders.close()
+    # Nom d'affichage calculé en SQL (même règle que Client.nom_affichage)
+    nom_affichage = case(
+        (Client.type_client == 1, func.concat(Part.prenom, ' ', Part.nom)),
+        else_=Pro.raison_sociale
+    ).label('nom_affichage')
 
-    return commandes
+    try:
+        query = (
+            select(Commande.id, Commande.date_commande, Commande.montant, nom_affichage)
+            .join(Client, Client.id == Commande.id_client)
+            .outerjoin(Part, Part.id_client == Client.id)
+            .outerjoin(Pro, Pro.id_client == Client.id)
+            .where(*filters)
+        )
+        if after is not None:
+            query = query.where(apres_curseur(Commande.date_commande, Commande.id, after))
+        # Une ligne de plus que la page pour savoir s'il reste des commandes
+        rows = db_session_orders.execute(
+            query.order_by(Commande.date_commande.desc(), Commande.id.desc()).limit(limit + 1)
+        ).all()
+
+        # Total uniquement pour la première page (pied de carte du tableau de bord)
+        total: int | None = None
+        if after is None:
+            total = db_session_orders.execute(select(func.count(Commande.id)).where(*filters)).scalar_one()
+    finally:
+        # Fermeture de la session
+        db_session_orders.close()
+
+    page = rows[:limit]
+    return {
+        "commandes": [
+            {
+                "id": row.id,
+                "date_commande": row.date_commande.isoformat(),
+                "montant": float(row.montant),
+                "nom_affichage": row.nom_affichage or ''
+            }
+            for row in page
+        ],
+        "next_cursor": encoder_curseur(page[-1].date_commande, page[-1].id) if len(rows) > limit else None,
+        "total": total
+    }
 
 def get_commercial_indicators() -> Dict[str, Any] | None:
     """
@@ -248,70 +329,19 @@ def get_commercial_indicators() -> Dict[str, Any] | None:
         - Clients actifs
         - Commandes annuelles
 
+    Les indicateurs sont déclarés dans le module indicateurs et calculés en une
+    seule requête sur la table de cumul journalier des ventes (VentesJournalieres,
+    14_ventes_journalieres), alimentée par les mutations des commandes.
+
     Returns:
         Dict[str, Any]: Dictionnaire des indicateurs commerciaux
     """
     # Ouverture de la session
     db_session_commercial: SessionBdDType = SessionBdD()
 
-    # Récupération des dates de référence
-    today = date.today()
-    first_day_of_month = today.replace(day=1)
-    first_day_of_year = today.replace(month=1, day=1)
-
-    # Récupération des indicateurs commerciaux et gestion des exceptions
+    # Calcul de tous les indicateurs en une seule requête d'agrégation conditionnelle
     try:
-        indicators: Dict[str, List[Any]] | None = {
-            # Chiffre d'affaire total facturé pour le mois en cours
-            "ca_current_month": [
-                db_session_commercial.query(func.sum(Commande.montant))
-                .filter(
-                    Commande.is_facture == True,
-                    Commande.date_commande >= first_day_of_month
-                ).scalar() or 0,
-                'CA Mensuel'
-            ],
-
-            # Chiffre d'affaire total facturé pour l'année en cours
-            "ca_current_year": [
-                db_session_commercial.query(func.sum(Commande.montant))
-                .filter(
-                    Commande.is_facture == True,
-                    Commande.date_commande >= first_day_of_year
-                ).scalar() or 0,
-                'CA Annuel'
-            ],
-
-            # Panier moyen annuel
-            "average_basket": [
-                db_session_commercial.query(func.avg(Commande.montant))
-                .filter(
-                    Commande.is_facture == True,
-                    Commande.date_commande >= first_day_of_year
-                ).scalar() or 0,
-                'Panier Moyen'
-            ],
-
-            # Clients actifs
-            "active_clients": [
-                db_session_commercial.query(func.count(func.distinct(Commande.id_client)))
-                .filter(
-                    Commande.is_facture == True,
-                    Commande.date_commande >= first_day_of_year
-                ).scalar() or 0,
-                'Clients Actifs'
-            ],
-
-            # Nombre de commandes par an
-            "orders_per_year": [
-                db_session_commercial.query(func.count(Commande.id))
-                .filter(
-                    Commande.is_facture == True,
-                    Commande.date_commande >= first_day_of_year
-                ).scalar() or 0,
-                'Commandes Annuelles'
-            ]
-        }
+        indicators: Dict[str, List[Any]] | None = moteur_indicateurs.calculer(db_session_commercial)
     except Exception as e:
         acfc_log.log_to_file(level=ERROR, message=str(e), specific_logger=LOG_COMMERCIAL_FILE, zone_log='commercial', db_log=False)
         indicators = None
@@ -475,6 +505,9 @@ def health() -> Any:
                 "database": db_status,
                 "application": "ok"
             },
+            "cache": cache_acfc.statistiques(),
+            "catalogue": cache_catalogue.statistiques(),
+            "logs": acfc_log.statistiques(),
             "version": "1.0"
         }
         
@@ -494,11 +527,39 @@ def dashboard() -> Any:
     Point d'entrée principal après authentification. Affiche les commandes en cours.
         - Commandes en cours
         - Indicateurs commerciaux
+    Les deux fragments sont partagés entre utilisateurs via le cache applicatif,
+    invalidé à chaque mutation de commande.
     """
-    current_orders = get_current_orders()
-    commercial_indicators = get_commercial_indicators()
+    current_orders = cache_acfc.obtenir(CLE_COMMANDES_EN_COURS, get_current_orders)
+    commercial_indicators = cache_acfc.obtenir(CLE_INDICATEURS, get_commercial_indicators)
     return render_template(DEFAULT['page'], title=DEFAULT['title'], context=DEFAULT['context'], objects=[current_orders, commercial_indicators])
 
+@acfc.route('/dashboard/commandes_en_cours')
+def dashboard_current_orders() -> Any:
+    """
+    API JSON : page suivante des commandes en cours du tableau de bord.
+
+    Query Parameters:
+        - after (str): Curseur renvoyé par la page précédente (next_cursor)
+        - limit (int): Taille de page (défaut: 20, maximum: 100)
+        - id_client (int): Restreindre à un client (défaut: 0, tous les clients)
+
+    Returns:
+        JSON: {"commandes": [...], "next_cursor": str | null, "total": int | null}
+    """
+    after_param = request.args.get('after')
+    after = decoder_curseur(after_param)
+    if after_param and after is None:
+        return jsonify({"error": "Curseur de pagination invalide"}), 400
+
+    limit = min(max(request.args.get('limit', CURRENT_ORDERS_PAGE_SIZE, type=int), 1), CURRENT_ORDERS_MAX_PAGE_SIZE)
+    id_client = request.args.get('id_client', 0, type=int)
+
+    # Seule la première page par défaut est partagée via le cache
+    if after is None and limit == CURRENT_ORDERS_PAGE_SIZE and id_client == 0:
+        return jsonify(cache_acfc.obtenir(CLE_COMMANDES_EN_COURS, get_current_orders))
+    return jsonify(get_current_orders(id_client=id_client, limit=limit, after=after))
+
 # ====================================================================
 # GESTIONNAIRES UTILISATEURS/UTILISATEUR
 # ====================================================================
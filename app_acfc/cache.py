@@ -0,0 +1,311 @@
+"""
+ACFC - Cache Applicatif des Fragments du Tableau de Bord
+========================================================
+
+Module de mise en cache des données coûteuses à calculer (commandes en cours,
+indicateurs commerciaux) partagées entre tous les utilisateurs.
+
+Fonctionnalités principales :
+- Cache LRU en mémoire du processus avec expiration (TTL)
+- Backend Redis optionnel (conteneur acfc-redis) partagé entre processus
+- Invalidation explicite depuis les chemins de mutation des commandes
+- Calcul unique par clé lors d'un défaut de cache (pas de rafale de requêtes identiques)
+- Génération par clé : une valeur calculée avant une invalidation n'est pas écrite
+- Compteurs de succès/échecs exposés par l'endpoint /health
+
+Configuration (variables d'environnement) :
+- CACHE_BACKEND : 'memoire' (défaut) ou 'redis'
+- CACHE_TTL : durée de vie par défaut des entrées en secondes (défaut: 300)
+- CACHE_TAILLE_MAX : nombre maximal d'entrées du cache mémoire (défaut: 256)
+- REDIS_HOST, REDIS_PORT, REDIS_DB : connexion Redis
+
+Auteur : ACFC Development Team
+Version : 1.0
+"""
+
+import pickle
+from collections import OrderedDict
+from os import getenv
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, Tuple
+from logs.logger import acfc_log, WARNING
+
+try:
+    from redis import Redis, RedisError
+    from redis.exceptions import WatchError
+except ImportError:  # Dépendance optionnelle : repli sur le cache mémoire
+    Redis = None
+    RedisError = Exception
+    WatchError = Exception
+
+# ====================================================================
+# CONSTANTES - CLÉS DE CACHE
+# ====================================================================
+
+CLE_COMMANDES_EN_COURS = 'dashboard:commandes_en_cours'
+CLE_INDICATEURS = 'dashboard:indicateurs_commerciaux'
+
+# Clés dépendant des commandes, invalidées à chaque mutation d'une commande
+CLES_COMMANDES: Tuple[str, ...] = (CLE_COMMANDES_EN_COURS, CLE_INDICATEURS)
+
+LOG_CACHE_FILE = 'cache.log'
+
+# ====================================================================
+# BACKENDS DE STOCKAGE
+# ====================================================================
+
+class CacheMemoire:
+    """
+    Cache LRU en mémoire avec expiration des entrées.
+
+    Les entrées les moins récemment utilisées sont évincées au-delà de taille_max.
+    L'accès est protégé par un verrou (serveur Waitress multi-threads).
+    Chaque suppression incrémente la génération de la clé.
+    """
+    nom = 'memoire'
+
+    def __init__(self, taille_max: int = 256) -> None:
+        self.taille_max = taille_max
+        self._donnees: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._verrou = Lock()
+
+    def lire(self, cle: str) -> Tuple[bool, Any]:
+        """Retourne (trouvé, valeur) en ignorant les entrées expirées."""
+        with self._verrou:
+            entree = self._donnees.get(cle)
+            if entree is None:
+                return False, None
+            expiration, valeur = entree
+            if expiration <= monotonic():
+                del self._donnees[cle]
+                return False, None
+            self._donnees.move_to_end(cle)
+            return True, valeur
+
+    def generation(self, cle: str) -> int:
+        """Génération courante de la clé (nombre de suppressions)."""
+        with self._verrou:
+            return self._generations.get(cle, 0)
+
+    def ecrire(self, cle: str, valeur: Any, ttl: int, generation: int | None = None) -> bool:
+        """
+        Enregistre une valeur pour ttl secondes, avec éviction LRU.
+
+        Si generation est fournie, la valeur n'est écrite que si la clé n'a pas été
+        supprimée depuis (retourne False sinon).
+        """
+        with self._verrou:
+            if generation is not None and self._generations.get(cle, 0) != generation:
+                return False
+            self._donnees[cle] = (monotonic() + ttl, valeur)
+            self._donnees.move_to_end(cle)
+            while len(self._donnees) > self.taille_max:
+                self._donnees.popitem(last=False)
+            return True
+
+    def supprimer(self, *cles: str) -> None:
+        """Supprime les clés données (absentes ignorées) et incrémente leur génération."""
+        with self._verrou:
+            for cle in cles:
+                self._donnees.pop(cle, None)
+                self._generations[cle] = self._generations.get(cle, 0) + 1
+
+    def taille(self) -> int:
+        """Nombre d'entrées actuellement stockées (expirées incluses)."""
+        return len(self._donnees)
+
+class CacheRedis:
+    """
+    Cache partagé stocké dans Redis (valeurs sérialisées avec pickle).
+
+    L'expiration est déléguée à Redis (SETEX). Les clés sont préfixées pour
+    cohabiter avec la file d'attente RQ du service mails. La génération de chaque
+    clé est un compteur Redis (INCR à la suppression), partagé entre processus.
+    """
+    nom = 'redis'
+    prefixe = 'acfc:cache:'
+    prefixe_generation = 'acfc:cache_generation:'
+
+    def __init__(self, host: str, port: int, db: int = 0) -> None:
+        if Redis is None:
+            raise RuntimeError("Le paquet redis n'est pas installé")
+        self.client = Redis(host=host, port=port, db=db, socket_timeout=1, socket_connect_timeout=1)
+
+    def lire(self, cle: str) -> Tuple[bool, Any]:
+        brut = self.client.get(self.prefixe + cle)
+        if brut is None:
+            return False, None
+        return True, pickle.loads(brut)
+
+    def generation(self, cle: str) -> int:
+        return int(self.client.get(self.prefixe_generation + cle) or 0)
+
+    def ecrire(self, cle: str, valeur: Any, ttl: int, generation: int | None = None) -> bool:
+        if generation is None:
+            self.client.setex(self.prefixe + cle, ttl, pickle.dumps(valeur))
+            return True
+        # Écriture conditionnelle : annulée si la génération change entre la lecture et l'écriture
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(self.prefixe_generation + cle)
+                if int(pipe.get(self.prefixe_generation + cle) or 0) != generation:
+                    return False
+                pipe.multi()
+                pipe.setex(self.prefixe + cle, ttl, pickle.dumps(valeur))
+                pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    def supprimer(self, *cles: str) -> None:
+        if cles:
+            with self.client.pipeline() as pipe:
+                pipe.delete(*[self.prefixe + cle for cle in cles])
+                for cle in cles:
+                    pipe.incr(self.prefixe_generation + cle)
+                pipe.execute()
+
+    def taille(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=self.prefixe + '*'))
+
+# ====================================================================
+# FAÇADE DE CACHE AVEC STATISTIQUES
+# ====================================================================
+
+class CacheApplication:
+    """
+    Point d'accès unique au cache avec compteurs de succès et d'échecs.
+
+    Attributes:
+        backend (CacheMemoire | CacheRedis): Stockage sous-jacent
+        ttl_defaut (int): Durée de vie par défaut des entrées en secondes
+    """
+
+    def __init__(self, backend: CacheMemoire | CacheRedis, ttl_defaut: int = 300) -> None:
+        self.backend = backend
+        self.ttl_defaut = ttl_defaut
+        self._compteurs: Dict[str, int] = {'hits': 0, 'misses': 0, 'invalidations': 0, 'obsoletes': 0, 'erreurs': 0}
+        self._verrou_compteurs = Lock()
+        self._verrous_cles: Dict[str, Lock] = {}
+        self._verrou_cles = Lock()
+
+    def _incrementer(self, compteur: str) -> None:
+        with self._verrou_compteurs:
+            self._compteurs[compteur] += 1
+
+    def _verrou_cle(self, cle: str) -> Lock:
+        with self._verrou_cles:
+            return self._verrous_cles.setdefault(cle, Lock())
+
+    def _lire(self, cle: str) -> Tuple[bool, Any]:
+        try:
+            return self.backend.lire(cle)
+        except (RedisError, pickle.PickleError) as e:
+            self._incrementer('erreurs')
+            acfc_log.log_to_file(level=WARNING, message=f'Lecture du cache impossible ({cle}) : {e}',
+                                 specific_logger=LOG_CACHE_FILE, zone_log='cache')
+            return False, None
+
+    def obtenir(self, cle: str, calcul: Callable[[], Any], ttl: int | None = None) -> Any:
+        """
+        Retourne la valeur en cache ou la calcule et la met en cache.
+
+        Un seul thread calcule une clé absente ; les autres attendent puis relisent
+        le cache. Les résultats None (erreur de calcul) ne sont pas mis en cache.
+
+        La génération de la clé est lue avant le calcul : si la clé est invalidée
+        pendant le calcul, la valeur (lue avant la mutation) est retournée mais pas
+        mise en cache (compteur obsoletes).
+
+        Args:
+            cle (str): Clé de cache
+            calcul (Callable[[], Any]): Fonction de calcul de la valeur
+            ttl (int | None): Durée de vie en secondes (ttl_defaut si None)
+
+        Returns:
+            Any: Valeur en cache ou fraîchement calculée
+        """
+        trouve, valeur = self._lire(cle)
+        if trouve:
+            self._incrementer('hits')
+            return valeur
+
+        with self._verrou_cle(cle):
+            trouve, valeur = self._lire(cle)
+            if trouve:
+                self._incrementer('hits')
+                return valeur
+
+            self._incrementer('misses')
+            try:
+                generation: int | None = self.backend.generation(cle)
+            except RedisError:
+                generation = None
+            valeur = calcul()
+            if valeur is not None and generation is not None:
+                try:
+                    if not self.backend.ecrire(cle, valeur, ttl or self.ttl_defaut, generation):
+                        self._incrementer('obsoletes')
+                except (RedisError, pickle.PickleError) as e:
+                    self._incrementer('erreurs')
+                    acfc_log.log_to_file(level=WARNING, message=f'Écriture du cache impossible ({cle}) : {e}',
+                                         specific_logger=LOG_CACHE_FILE, zone_log='cache')
+            return valeur
+
+    def invalider(self, *cles: str) -> None:
+        """Supprime les clés données du cache."""
+        try:
+            self.backend.supprimer(*cles)
+            self._incrementer('invalidations')
+        except RedisError as e:
+            self._incrementer('erreurs')
+            acfc_log.log_to_file(level=WARNING, message=f'Invalidation du cache impossible {cles} : {e}',
+                                 specific_logger=LOG_CACHE_FILE, zone_log='cache')
+
+    def statistiques(self) -> Dict[str, Any]:
+        """
+        Retourne les compteurs du cache pour la supervision.
+
+        Returns:
+            Dict[str, Any]: backend, hits, misses, invalidations, obsoletes (valeurs invalidées pendant
+            leur calcul, non écrites), erreurs, ratio de succès, taille
+        """
+        with self._verrou_compteurs:
+            stats: Dict[str, Any] = dict(self._compteurs)
+        total = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / total, 3) if total else 0.0
+        stats['backend'] = self.backend.nom
+        try:
+            stats['taille'] = self.backend.taille()
+        except RedisError:
+            stats['taille'] = None
+        return stats
+
+def creer_cache() -> CacheApplication:
+    """
+    Crée le cache applicatif selon la configuration d'environnement.
+
+    Le backend Redis est utilisé si CACHE_BACKEND=redis et que le serveur répond ;
+    sinon, repli sur le cache mémoire.
+    """
+    ttl = int(getenv('CACHE_TTL', '300'))
+    if getenv('CACHE_BACKEND', 'memoire') == 'redis':
+        try:
+            backend = CacheRedis(host=getenv('REDIS_HOST', 'acfc-redis'),
+                                 port=int(getenv('REDIS_PORT', '6379')),
+                                 db=int(getenv('REDIS_DB', '0')))
+            backend.client.ping()
+            return CacheApplication(backend, ttl)
+        except (RuntimeError, RedisError) as e:
+            acfc_log.log_to_file(level=WARNING, message=f'Cache Redis indisponible ({e}), repli sur le cache mémoire',
+                                 specific_logger=LOG_CACHE_FILE, zone_log='cache')
+    return CacheApplication(CacheMemoire(int(getenv('CACHE_TAILLE_MAX', '256'))), ttl)
+
+# Instance partagée par l'application et les blueprints
+cache_acfc = creer_cache()
+
+def invalider_cache_commandes() -> None:
+    """Invalide les fragments du tableau de bord dépendant des commandes."""
+    cache_acfc.invalider(*CLES_COMMANDES)
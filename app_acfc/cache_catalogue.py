@@ -0,0 +1,225 @@
+"""
+ACFC - Instantané du Catalogue en Mémoire
+=========================================
+
+Module de mise en cache du catalogue produits (21_catalogue) utilisé par le
+formulaire de commande : liste des produits et valeurs des filtres (millésimes,
+types de produit, géographies).
+
+Le catalogue ne change que quelques fois par an. L'instantané est conservé en
+mémoire du processus sous forme compacte (tuples immuables) et n'est rechargé
+que lorsque sa version change. La version est le triplet (MAX(updated_at),
+COUNT(*), SUM(CRC32(contenu de la ligne))) : une suppression change le nombre
+de lignes, une modification ou un ajout change la somme de contrôle. La date
+seule ne suffit pas : updated_at n'est précis qu'à la seconde, une modification
+faite dans la même seconde qu'une vérification ne la change pas.
+
+La version n'est relue en base qu'une fois par intervalle de vérification :
+entre deux vérifications, l'affichage d'un formulaire de commande n'exécute
+aucune requête sur le catalogue.
+
+Le module calcule aussi les filtres à facettes de l'API JSON du catalogue
+(voir contextes_bp/catalogue.py) directement sur l'instantané.
+
+Configuration (variables d'environnement) :
+- CATALOGUE_INTERVALLE_VERIFICATION : délai en secondes entre deux lectures
+  de la version du catalogue (défaut: 60)
+
+Auteur : ACFC Development Team
+Version : 1.0
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from os import getenv
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict, List, Mapping, NamedTuple, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session as SessionBdDType
+from app_acfc.modeles import Catalogue
+
+# ====================================================================
+# STRUCTURES DE L'INSTANTANÉ
+# ====================================================================
+
+# (MAX(updated_at), COUNT(*), SUM(CRC32(contenu))) du catalogue en base
+VersionCatalogue = Tuple[datetime | None, int, int]
+
+class ProduitCatalogue(NamedTuple):
+    """Produit du catalogue figé dans l'instantané (mêmes attributs que le modèle Catalogue)."""
+    id: int
+    type_produit: str
+    stype_produit: str
+    millesime: int
+    prix_unitaire_ht: Decimal
+    geographie: str | None
+    ref_auto: str
+    des_auto: str
+
+@dataclass(frozen=True)
+class InstantaneCatalogue:
+    """
+    Contenu du catalogue à une version donnée.
+
+    Attributes:
+        version: (MAX(updated_at), COUNT(*), somme de contrôle) au moment du chargement
+        produits: Produits triés par identifiant décroissant
+        millesimes, types_produit, geographies: Valeurs distinctes pour les filtres
+        par_id: Index des produits par identifiant
+    """
+    version: VersionCatalogue
+    produits: Tuple[ProduitCatalogue, ...]
+    millesimes: Tuple[int, ...]
+    types_produit: Tuple[str, ...]
+    geographies: Tuple[str, ...]
+    par_id: Dict[int, ProduitCatalogue] = field(repr=False, compare=False)
+
+# Attributs des produits filtrables par facette (paramètres de l'API JSON)
+FACETTES: Tuple[str, ...] = ('millesime', 'type_produit', 'geographie')
+
+# ====================================================================
+# CHARGEMENT
+# ====================================================================
+
+def lire_version(db_session: SessionBdDType) -> VersionCatalogue:
+    """
+    Version courante du catalogue en base : (MAX(updated_at), COUNT(*), SUM(CRC32(contenu))).
+
+    La somme de contrôle porte sur les colonnes reprises dans l'instantané
+    (geographie est calculée depuis stype_produit).
+    """
+    contenu = func.concat_ws('|', Catalogue.id, Catalogue.type_produit, Catalogue.stype_produit,
+                             Catalogue.millesime, Catalogue.prix_unitaire_ht)
+    derniere_maj, nb_produits, controle = db_session.execute(
+        select(func.max(Catalogue.updated_at), func.count(Catalogue.id),
+               func.coalesce(func.sum(func.crc32(contenu)), 0))
+    ).one()
+    return derniere_maj, nb_produits or 0, int(controle or 0)
+
+def charger_instantane(db_session: SessionBdDType, version: VersionCatalogue) -> InstantaneCatalogue:
+    """
+    Charge l'ensemble du catalogue en une requête et calcule les valeurs des filtres en mémoire.
+
+    Args:
+        db_session (SessionBdDType): Session de base de données
+        version (VersionCatalogue): Version lue par lire_version()
+    """
+    lignes = db_session.scalars(select(Catalogue).order_by(Catalogue.id.desc())).all()
+    produits = tuple(ProduitCatalogue(id=p.id, type_produit=p.type_produit, stype_produit=p.stype_produit,
+                                      millesime=p.millesime, prix_unitaire_ht=p.prix_unitaire_ht,
+                                      geographie=p.geographie, ref_auto=p.ref_auto, des_auto=p.des_auto)
+                     for p in lignes)  # Les objets ORM ne sont pas conservés au-delà de la session
+    return InstantaneCatalogue(
+        version=version,
+        produits=produits,
+        millesimes=tuple(sorted({p.millesime for p in produits if p.millesime}, reverse=True)),
+        types_produit=tuple(sorted({p.type_produit for p in produits if p.type_produit})),
+        geographies=tuple(sorted({p.geographie for p in produits if p.geographie})),
+        par_id={p.id: p for p in produits}
+    )
+
+# ====================================================================
+# FILTRES À FACETTES
+# ====================================================================
+
+def filtrer_catalogue(instantane: InstantaneCatalogue,
+                      filtres: Mapping[str, Any]) -> Tuple[List[ProduitCatalogue], Dict[str, Dict[str, int]]]:
+    """
+    Filtre les produits de l'instantané et compte les valeurs de chaque facette en un seul parcours.
+
+    Le compte d'une facette applique les filtres des autres facettes mais pas le sien :
+    il indique combien de produits seraient affichés en choisissant chaque valeur.
+
+    Args:
+        instantane (InstantaneCatalogue): Instantané du catalogue
+        filtres (Mapping[str, Any]): Facette -> valeur retenue (facettes absentes : pas de filtre)
+
+    Returns:
+        Tuple[List[ProduitCatalogue], Dict[str, Dict[str, int]]]: Produits retenus et
+        facette -> {valeur: nombre de produits}
+    """
+    actifs = {facette: valeur for facette, valeur in filtres.items() if facette in FACETTES and valeur is not None}
+    produits: List[ProduitCatalogue] = []
+    facettes: Dict[str, Dict[str, int]] = {facette: {} for facette in FACETTES}
+    for produit in instantane.produits:
+        ecarts = [facette for facette, valeur in actifs.items() if getattr(produit, facette) != valeur]
+        if not ecarts:
+            produits.append(produit)
+        for facette in FACETTES:
+            # Retenu par toutes les autres facettes : compte pour sa valeur de cette facette
+            if ecarts in ([], [facette]):
+                valeur = getattr(produit, facette)
+                if valeur is not None:
+                    facettes[facette][str(valeur)] = facettes[facette].get(str(valeur), 0) + 1
+    return produits, facettes
+
+# ====================================================================
+# CACHE DE L'INSTANTANÉ
+# ====================================================================
+
+class CacheCatalogue:
+    """
+    Conserve l'instantané du catalogue et le recharge lorsque la version en base change.
+
+    Args:
+        intervalle_verification (float): Délai en secondes entre deux lectures de la version
+    """
+
+    def __init__(self, intervalle_verification: float = 60.0) -> None:
+        self.intervalle_verification = intervalle_verification
+        self._instantane: InstantaneCatalogue | None = None
+        self._verifie_a = 0.0
+        self._verrou = Lock()
+        self._compteurs: Dict[str, int] = {'hits': 0, 'verifications': 0, 'chargements': 0}
+        self._verrou_compteurs = Lock()
+
+    def _incrementer(self, compteur: str) -> None:
+        with self._verrou_compteurs:
+            self._compteurs[compteur] += 1
+
+    def obtenir(self, db_session: SessionBdDType) -> InstantaneCatalogue:
+        """
+        Retourne l'instantané du catalogue, rechargé si sa version a changé.
+
+        Un seul thread vérifie la version à l'expiration de l'intervalle ; les autres
+        attendent puis utilisent l'instantané à jour.
+        """
+        instantane = self._instantane
+        if instantane is not None and monotonic() - self._verifie_a < self.intervalle_verification:
+            self._incrementer('hits')
+            return instantane
+
+        with self._verrou:
+            instantane = self._instantane
+            if instantane is not None and monotonic() - self._verifie_a < self.intervalle_verification:
+                self._incrementer('hits')
+                return instantane
+
+            version = lire_version(db_session)
+            self._incrementer('verifications')
+            if instantane is None or instantane.version != version:
+                instantane = charger_instantane(db_session, version)
+                self._instantane = instantane
+                self._incrementer('chargements')
+            self._verifie_a = monotonic()
+            return instantane
+
+    def statistiques(self) -> Dict[str, Any]:
+        """
+        Retourne les compteurs de l'instantané pour la supervision.
+
+        Returns:
+            Dict[str, Any]: hits, verifications, chargements, nombre de produits et version chargée
+        """
+        with self._verrou_compteurs:
+            stats: Dict[str, Any] = dict(self._compteurs)
+        instantane = self._instantane
+        stats['produits'] = len(instantane.produits) if instantane else 0
+        stats['version'] = (f'{instantane.version[0].isoformat() if instantane.version[0] else None}'
+                            f'/{instantane.version[1]}/{instantane.version[2]}') if instantane else None
+        return stats
+
+# Instance partagée par l'application et les blueprints
+cache_catalogue = CacheCatalogue(float(getenv('CATALOGUE_INTERVALLE_VERIFICATION', '60')))
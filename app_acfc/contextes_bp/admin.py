@@ -1,4 +1,6 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+from app_acfc.habilitations import validate_habilitation, ADMINISTRATEUR
+from logs.logger import acfc_log, NIVEAUX, WARNING
 
 admin_bp = Blueprint('admin',
                      __name__,
@@ -14,3 +16,26 @@ def admin_list():
 @admin_bp.route('/hello')
 def admin_hello():
     return 'Admin blueprint: hello'
+
+
+@admin_bp.route('/logs/niveaux', methods=['GET', 'POST'])
+@validate_habilitation(ADMINISTRATEUR)
+def logs_niveaux():
+    """
+    Consulte ou modifie à chaud le niveau minimal des logs.
+
+    POST : {'niveau': 'ERROR' | 'WARNING' | 'INFO' | 'DEBUG', 'zone': str (optionnelle,
+    niveau par défaut si absente)}
+
+    Returns:
+        JSON: {'defaut': niveau, 'zones': {zone: niveau}}
+    """
+    if request.method == 'POST':
+        donnees = request.get_json(silent=True) or {}
+        niveau = NIVEAUX.get(str(donnees.get('niveau', '')).upper())
+        if niveau is None:
+            return jsonify({'error': f'Niveau invalide, attendu : {", ".join(NIVEAUX)}'}), 400
+        zone = donnees.get('zone') or None
+        acfc_log.definir_niveau(niveau, zone)
+        acfc_log.log_to_file(WARNING, 'Niveau des logs %s : %s', zone or 'par défaut', donnees['niveau'], zone_log='admin')
+    return jsonify(acfc_log.niveaux())
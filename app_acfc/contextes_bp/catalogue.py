@@ -1,4 +1,28 @@
-from flask import Blueprint, jsonify
+"""
+ACFC - Module Catalogue - Produits
+==================================
+
+Blueprint Flask du catalogue produits.
+
+Fonctionnalités principales :
+- API JSON du catalogue avec filtres à facettes (millésime, type, géographie)
+  utilisée par le formulaire de commande pour filtrer sans recharger la page
+
+L'API est servie depuis l'instantané du catalogue en mémoire (voir cache_catalogue.py)
+et porte un ETag dérivé de la version du catalogue : le navigateur revalide ses
+réponses (If-None-Match) et reçoit un 304 tant que le catalogue n'a pas changé.
+
+Auteur : ACFC Development Team
+Version : 1.0
+"""
+
+from flask import Blueprint, Response, jsonify, request
+from hashlib import sha1
+from typing import Any, Dict
+from sqlalchemy.orm import Session as SessionBdDType
+from app_acfc.modeles import SessionBdD
+from app_acfc.habilitations import validate_habilitation, CLIENTS
+from app_acfc.cache_catalogue import cache_catalogue, filtrer_catalogue, InstantaneCatalogue, FACETTES
 
 catalogue_bp = Blueprint('catalogue',
                          __name__,
@@ -14,3 +38,51 @@ def catalogue_list():
 @catalogue_bp.route('/hello')
 def hello_catalogue():
     return 'Catalogue blueprint: hello'
+
+
+def etag_catalogue(instantane: InstantaneCatalogue, filtres: Dict[str, Any]) -> str:
+    """ETag d'une réponse de l'API : version du catalogue et filtres demandés."""
+    derniere_maj, nb_produits = instantane.version
+    signature = f'{derniere_maj.isoformat() if derniere_maj else ""}|{nb_produits}|{sorted(filtres.items())}'
+    return sha1(signature.encode('utf-8')).hexdigest()
+
+
+@catalogue_bp.route('/api/produits')
+@validate_habilitation(CLIENTS)
+def catalogue_produits_api():
+    """
+    Produits du catalogue filtrés par facettes, avec le nombre de produits par valeur de facette.
+
+    Paramètres (query string, optionnels) : millesime, type_produit, geographie
+
+    Returns:
+        JSON: {'produits': [...], 'total': int, 'facettes': {facette: {valeur: nombre}}}
+    """
+    filtres: Dict[str, Any] = {facette: request.args.get(facette) for facette in FACETTES if request.args.get(facette)}
+    if 'millesime' in filtres:
+        try:
+            filtres['millesime'] = int(filtres['millesime'])
+        except ValueError:
+            return jsonify({'error': 'Millésime invalide'}), 400
+
+    db_session: SessionBdDType = SessionBdD()
+    try:
+        instantane = cache_catalogue.obtenir(db_session)
+    finally:
+        db_session.close()
+
+    # Le catalogue n'a pas changé depuis la dernière réponse du navigateur : 304 sans calcul
+    etag = etag_catalogue(instantane, filtres)
+    if request.if_none_match.contains(etag):
+        reponse = Response(status=304)
+    else:
+        produits, facettes = filtrer_catalogue(instantane, filtres)
+        reponse = jsonify({
+            'produits': [produit._asdict() | {'prix_unitaire_ht': str(produit.prix_unitaire_ht)}
+                         for produit in produits],
+            'total': len(produits),
+            'facettes': facettes
+        })
+    reponse.set_etag(etag)
+    reponse.headers['Cache-Control'] = 'private, no-cache'
+    return reponse
@@ -28,14 +28,20 @@ Auteur : Rémi Verschuur - Module CRM
 Version : 1.0
 """
 
-from flask import Blueprint, render_template, jsonify, request, redirect, url_for, Request, session
+from flask import (Blueprint, render_template, jsonify, request, redirect, url_for, Request, session,
+                   Response, stream_with_context)
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session as SessionBdDType, joinedload
-from sqlalchemy import or_, func
+from sqlalchemy.sql.elements import ColumnElement
 from app_acfc.modeles import SessionBdD, Client, Part, Pro, Telephone, Mail, Commande, Facture, Adresse
-from typing import List, Dict
+from typing import Any, Iterator, List, Dict, Tuple
 from app_acfc.habilitations import validate_habilitation, CLIENTS
+from app_acfc.recherche import (rechercher_clients, filtre_recherche, SOURCES, SOURCE_TOUS, SOURCE_PART,
+                                SOURCE_PRO, LIBELLES_SOURCES, TAILLE_PAGE_RECHERCHE, TAILLE_PAGE_RECHERCHE_MAX)
+from app_acfc.pagination import encoder_curseur, decoder_curseur, apres_curseur
 from logs.logger import acfc_log, ERROR, DEBUG
 from datetime import datetime
+import json
 import logging
 
 # ================================================================
@@ -64,6 +70,22 @@ LOG_CLIENTS_FILE = 'clients.log'
 # Pages de redirection
 CLIENT_DETAIL = 'clients.get_client'
 
+# Pagination de la liste des clients (/clients/all_clients)
+CLIENTS_PAGE_SIZE = 50
+CLIENTS_MAX_PAGE_SIZE = 500
+CLIENTS_STREAM_BATCH = 500
+
+# Historique des commandes et factures de la fiche client (pages suivantes chargées à la demande)
+CLIENT_HISTORY_PAGE_SIZE = 20
+
+# Onglets de la fiche client chargés à la demande (voir client_onglet)
+ONGLETS_CLIENT = ('telephones', 'emails', 'adresses', 'commandes', 'factures')
+ONGLETS_CONTACTS: Dict[str, Tuple[Any, str]] = {
+    'telephones': (Telephone, 'telephones'),
+    'emails': (Mail, 'mails'),
+    'adresses': (Adresse, 'adresses'),
+}
+
 # Configuration page de création/modification de client
 CLIENT_FORM: Dict[str, str] = {
     'title': TITLE_NEW_CLIENT,
@@ -171,6 +193,75 @@ def create_or_modify_pro(request: Request, client: Client, db_session: SessionBd
     db_session.add(pro) if type_test == 'create' else db_session.merge(pro)
 
 
+def filtres_liste_clients(request: Request) -> List[ColumnElement[bool]]:
+    """
+    Construit les filtres de la liste des clients depuis la query string.
+
+    Args:
+        request (Request): Objet de requête Flask (paramètres search, type, status)
+
+    Returns:
+        List[ColumnElement[bool]]: Filtres SQL sur les clients
+    """
+    filtres: List[ColumnElement[bool]] = []
+
+    status = request.args.get('status', 'actif')
+    if status != 'tous':
+        filtres.append(Client.is_active == (status != 'inactif'))
+
+    type_client = request.args.get('type', type=int)
+    if type_client in (1, 2):
+        filtres.append(Client.type_client == type_client)
+
+    search = request.args.get('search', '').strip()
+    if len(search) >= 3:
+        filtres.append(filtre_recherche(search, (SOURCE_PART, SOURCE_PRO)))
+
+    return filtres
+
+def generer_clients_ndjson(filtres: List[ColumnElement[bool]], after: int = 0) -> Iterator[str]:
+    """
+    Génère les clients filtrés au format NDJSON, par lots parcourus par curseur.
+
+    Chaque lot est une requête bornée lue avec yield_per, puis la session est vidée :
+    la mémoire du worker reste bornée quelle que soit la taille de la base (le connecteur
+    MySQL tamponne le résultat complet d'une requête, d'où le découpage en lots).
+
+    Args:
+        filtres (List[ColumnElement[bool]]): Filtres SQL sur les clients
+        after (int): Id à partir duquel reprendre l'export
+
+    Yields:
+        str: Un client sérialisé en JSON suivi d'un saut de ligne
+    """
+    db_session: SessionBdDType = SessionBdD()
+    try:
+        dernier_id = after
+        while True:
+            nb_clients = 0
+            requete = (
+                select(Client)
+                .options(*Client.options_to_dict())
+                .where(*filtres, Client.id > dernier_id)
+                .order_by(Client.id)
+                .limit(CLIENTS_STREAM_BATCH)
+                .execution_options(yield_per=CLIENTS_STREAM_BATCH)
+            )
+            for client in db_session.execute(requete).scalars():
+                yield json.dumps(client.to_dict(), ensure_ascii=False) + '\n'
+                dernier_id = client.id
+                nb_clients += 1
+            db_session.expunge_all()
+            if nb_clients < CLIENTS_STREAM_BATCH:
+                break
+    except Exception as e:
+        acfc_log.log_to_file(ERROR, f"Erreur lors de l'export des clients : {str(e)}",
+                             specific_logger=LOG_CLIENTS_FILE, zone_log=LOG_CLIENTS_FILE)
+        raise
+    finally:
+        db_session.close()
+
+
 # ================================================================
 # ROUTES - INTERFACE DE RECHERCHE CLIENTS
 # ================================================================
@@ -208,108 +299,59 @@ def recherche_avancee():
     """
     API REST : Recherche avancée de clients.
     
-    Effectue une recherche dans différents champs selon le type spécifié.
+    Effectue une recherche dans différents champs selon le type spécifié,
+    ou dans tous les champs à la fois (type 'tous', une seule requête).
     Supporte la recherche dans : nom, email, téléphone, adresse.
+    Les clients candidats sont d'abord sélectionnés par l'index de trigrammes
+    (05_index_recherche), puis confirmés par le filtre ILIKE. Le tri, le
+    dédoublonnage et la pagination sont réalisés en SQL (voir app_acfc/recherche.py).
     
     Query Parameters:
         - q (str): Terme de recherche (minimum 3 caractères)
-        - type (str): Type de recherche ('part', 'pro', 'mail', 'telephone', 'adresse')
+        - type (str): Type de recherche ('tous', 'part', 'pro', 'mail', 'telephone', 'adresse')
+        - offset (int): Nombre de résultats déjà affichés (défaut: 0)
+        - limit (int): Nombre de résultats par page (défaut: 20, max: 100)
         
     Returns:
-        JSON: Liste des clients correspondants avec nom_affichage, code_postal, ville, type
+        JSON: {
+            "clients": [{nom_affichage, code_postal, ville, type..., champ_correspondant,
+                         champ_correspondant_libelle}, ...],
+            "has_more": true si d'autres résultats existent,
+            "next_offset": offset de la page suivante ou null
+        }
     """
     # Récupération des paramètres
     search_term = request.args.get('q', '').strip()
-    search_type = request.args.get('type', 'part').strip()
+    search_type = request.args.get('type', SOURCE_TOUS).strip()
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', TAILLE_PAGE_RECHERCHE, type=int), 1), TAILLE_PAGE_RECHERCHE_MAX)
+    resultats_vides = {'clients': [], 'has_more': False, 'next_offset': None}
     
-    # Validation longueur minimum
-    if len(search_term) < 3:
-        return jsonify([])
+    # Validation longueur minimum et type de recherche
+    if len(search_term) < 3 or (search_type not in SOURCES and search_type != SOURCE_TOUS):
+        return jsonify(resultats_vides)
+    sources = SOURCES if search_type == SOURCE_TOUS else (search_type,)
     
     db_session: SessionBdDType = SessionBdD()
     
     try:
-        clients = []
-        
-        if search_type == 'part':
-            # Recherche dans les particuliers (prénom + nom)
-            clients = (
-                db_session.query(Client)
-                .join(Client.part)
-                .filter(
-                    Client.is_active == True,
-                    or_(
-                        Part.prenom.ilike(f'%{search_term}%'),
-                        Part.nom.ilike(f'%{search_term}%'),
-                        func.concat(Part.prenom, ' ', Part.nom).ilike(f'%{search_term}%')
-                    )
-                )
-                .all()
-            )
-            
-        elif search_type == 'pro':
-            # Recherche dans les professionnels (raison sociale)
-            clients = (
-                db_session.query(Client)
-                .join(Client.pro)
-                .filter(
-                    Client.is_active == True,
-                    Pro.raison_sociale.ilike(f'%{search_term}%')
-                )
-                .all()
-            )
-            
-        elif search_type == 'mail':
-            # Recherche par email
-            clients = (
-                db_session.query(Client)
-                .join(Client.mails)
-                .filter(
-                    Client.is_active == True,
-                    Mail.mail.ilike(f'%{search_term}%')
-                )
-                .distinct()
-                .all()
-            )
-            
-        elif search_type == 'telephone':
-            # Recherche par téléphone
-            clients = (
-                db_session.query(Client)
-                .join(Client.tels)
-                .filter(
-                    Client.is_active == True,
-                    Telephone.telephone.ilike(f'%{search_term}%')
-                )
-                .distinct()
-                .all()
-            )
-            
-        elif search_type == 'adresse':
-            # Recherche par adresse (adresse, code postal ou ville)
-            clients = (
-                db_session.query(Client)
-                .join(Client.adresses)
-                .filter(
-                    Client.is_active == True,
-                    Adresse.is_active == True,
-                    or_(
-                        Adresse.adresse_l1.ilike(f'%{search_term}%'),
-                        Adresse.adresse_l2.ilike(f'%{search_term}%'),
-                        Adresse.code_postal.ilike(f'%{search_term}%'),
-                        Adresse.ville.ilike(f'%{search_term}%')
-                    )
-                )
-                .distinct()
-                .all()
-            )
+        resultats, has_more = rechercher_clients(db_session, search_term, sources, offset, limit)
         
-        # Conversion en dictionnaire et retour
-        return jsonify([client.to_dict() for client in clients[:20]])  # Limite à 20 résultats
+        # Conversion en dictionnaire (avec le champ ayant permis de trouver le client) et retour
+        clients = [
+            client.to_dict() | {'champ_correspondant': source,
+                                'champ_correspondant_libelle': LIBELLES_SOURCES[source]}
+            for client, source in resultats
+        ]
+        return jsonify({
+            'clients': clients,
+            'has_more': has_more,
+            'next_offset': offset + len(clients) if has_more else None
+        })
         
     except Exception as e:
         acfc_log.log_to_file(ERROR, f"Erreur lors de la recherche avancée : {str(e)}")
-        return jsonify([])
+        return jsonify(resultats_vides)
     finally:
         db_session.close()
 
@@ -320,47 +362,69 @@ def get_clients():
     API REST : Récupération de la liste des clients.
     
     Endpoint JSON pour alimenter les interfaces dynamiques (DataTables, AutoComplete, etc.).
-    Supporte les paramètres de pagination, tri et filtrage via query string.
+    Supporte la pagination par curseur (id client croissant), le filtrage via query string
+    et un mode flux NDJSON pour les exports complets à mémoire bornée.
     
     Query Parameters:
-        - page (int): Numéro de page (défaut: 1)
-        - limit (int): Nombre d'éléments par page (défaut: 50)
-        - search (str): Terme de recherche libre
+        - after (int): Curseur, id du dernier client de la page précédente (défaut: 0)
+        - limit (int): Nombre d'éléments par page (défaut: 50, max: 500)
+        - search (str): Terme de recherche libre sur le nom (minimum 3 caractères)
         - type (int): Filtrage par type client (1=Particulier, 2=Professionnel)
-        - status (bool): Filtrage par statut actif/inactif
+        - status (str): Statut 'actif' (défaut), 'inactif' ou 'tous'
+        - format (str): 'ndjson' pour recevoir tous les clients en flux, un objet JSON par ligne
         
     Returns:
-        JSON: Liste des clients avec métadonnées de pagination
+        JSON: Page de clients avec métadonnées de pagination
         
     Format de réponse:
         {
             "clients": [...],
-            "total": 150,
-            "page": 1,
-            "pages": 3,
-            "per_page": 50
+            "total": 150,           (première page uniquement, sinon null)
+            "per_page": 50,
+            "has_more": true,
+            "next_cursor": 50       (valeur du paramètre after de la page suivante, ou null)
         }
-        
-    Note: 
-        Actuellement retourne des données de test. À connecter avec la base
-        de données via les modèles SQLAlchemy (Client, Part, Pro).
     """
-    # Ouverture d'une session vers la base de données
-    db_session: SessionBdDType = SessionBdD()
+    # Récupération des paramètres
+    after = max(request.args.get('after', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', CLIENTS_PAGE_SIZE, type=int), 1), CLIENTS_MAX_PAGE_SIZE)
+    filtres = filtres_liste_clients(request)
 
-    # Recherche de la liste de clients
-    clients: List[Client] = (
-        db_session.query(Client)
-        .filter(Client.is_active == True)
-        .all()
-    )
+    # Mode flux : export complet sans charger toute la base en mémoire
+    if request.args.get('format') == 'ndjson':
+        return Response(stream_with_context(generer_clients_ndjson(filtres, after)),
+                        mimetype='application/x-ndjson')
 
-    # Conversion en dictionnaire pour le retour
-    clients_dict = [c.to_dict() for c in clients]
+    # Ouverture d'une session vers la base de données
+    db_session: SessionBdDType = SessionBdD()
 
-    # Fermeture de la session et retour de la route
-    db_session.close()
-    return jsonify(clients_dict)
+    try:
+        # Page de clients (une ligne de plus pour savoir s'il reste des clients)
+        clients: List[Client] = list(db_session.execute(
+            select(Client)
+            .options(*Client.options_to_dict())
+            .where(*filtres, Client.id > after)
+            .order_by(Client.id)
+            .limit(limit + 1)
+        ).scalars())
+        has_more = len(clients) > limit
+        clients = clients[:limit]
+
+        # Total uniquement pour la première page
+        total: int | None = None
+        if after == 0:
+            total = db_session.execute(select(func.count(Client.id)).where(*filtres)).scalar_one()
+
+        return jsonify({
+            'clients': [c.to_dict() for c in clients],
+            'total': total,
+            'per_page': limit,
+            'has_more': has_more,
+            'next_cursor': clients[-1].id if has_more else None
+        })
+    finally:
+        # Fermeture de la session
+        db_session.close()
 
 @clients_bp.route('/list')
 @validate_habilitation(CLIENTS)
@@ -383,47 +447,175 @@ def client_list():
 @validate_habilitation(CLIENTS)
 def get_client(id_client: int):
     """
-    Route de récupération d'un client et de tout son contexte par son ID.
-    Contexte du client :
-        - Téléphones
-        - Mails
-        - Commandes
-        - Factures
-    Pour le moment, retour sous forme de dictionnaire, mais par la suite, intégration dans une page.
+    Route d'affichage de la fiche d'un client.
+
+    Seuls le client, sa fiche particulier/professionnel et les compteurs des onglets sont
+    chargés ici. Le contenu de chaque onglet (téléphones, mails, adresses, commandes,
+    factures) est chargé à son ouverture par la page (voir client_onglet).
     """
     # Ouverture d'une session vers la base de données
     db_session: SessionBdDType = SessionBdD()
 
-    # Recherche du client par ID avec eager loading
-    client: Client | None = db_session.query(Client).options(
-        joinedload(Client.part),
-        joinedload(Client.pro),
-        joinedload(Client.tels),
-        joinedload(Client.mails),
-        joinedload(Client.adresses),
-        joinedload(Client.commandes),
-        joinedload(Client.factures)
-    ).get(id_client)
-    acfc_log.log_to_file(DEBUG, f'{client}')
+    try:
+        client: Client | None = db_session.get(Client, id_client, options=[
+            joinedload(Client.part),
+            joinedload(Client.pro)
+        ])
+        acfc_log.log_to_file(DEBUG, '%s', client)
 
-    # Récupération du contexte du client et retour
-    if client:
+        if not client:
+            return jsonify({"error": ERROR_CLIENT_NOT_FOUND}), 404
+
+        # Récupération du contexte du client et retour
         part = client.part
         pro = client.pro
-        phones: List[Telephone] = client.tels
-        mails: List[Mail] = client.mails
-        addresses: List[Adresse] = client.adresses
-        orders: List[Commande] = client.commandes
-        bills: List[Facture] = client.factures
+        compteurs = compter_contexte_client(db_session, client.id)
         nom_affichage = client.nom_affichage
-        db_session.close()
         return render_template(CLIENT_PARAM_PAGE['page'],
                                title=CLIENT_PARAM_PAGE['title'],
                                context=CLIENT_PARAM_PAGE['context'],
-                               objects=[client, part, pro, addresses, phones, mails, orders, bills, nom_affichage])
-    else:
+                               objects=[client, part, pro, compteurs, nom_affichage])
+    finally:
         db_session.close()
-        return jsonify({"error": ERROR_CLIENT_NOT_FOUND}), 404
+
+def compter_contexte_client(db_session: SessionBdDType, id_client: int) -> Dict[str, int]:
+    """
+    Compteurs affichés sur les onglets de la fiche client, calculés en une seule requête.
+
+    Returns:
+        Dict[str, int]: telephones, telephones_principaux, emails, emails_principaux, adresses,
+                        adresses_principales, commandes, commandes_en_cours, factures
+    """
+    def compter(modele: Any, *criteres: ColumnElement[bool]):
+        return select(func.count(modele.id)).where(modele.id_client == id_client, *criteres).scalar_subquery()
+
+    compteurs = {
+        'telephones': compter(Telephone),
+        'telephones_principaux': compter(Telephone, Telephone.is_principal == True),
+        'emails': compter(Mail),
+        'emails_principaux': compter(Mail, Mail.is_principal == True),
+        'adresses': compter(Adresse),
+        'adresses_principales': compter(Adresse, Adresse.is_principal == True),
+        'commandes': compter(Commande),
+        'commandes_en_cours': compter(Commande, Commande.is_expedie == False, Commande.is_annulee == False),
+        'factures': compter(Facture),
+    }
+    ligne = db_session.execute(select(*(valeur.label(nom) for nom, valeur in compteurs.items()))).one()
+    return {nom: valeur or 0 for nom, valeur in ligne._mapping.items()}
+
+def page_historique(db_session: SessionBdDType, modele: Any, colonne_date: Any, id_client: int,
+                    limit: int = CLIENT_HISTORY_PAGE_SIZE, after: Tuple[Any, int] | None = None) -> Dict[str, Any]:
+    """
+    Page de l'historique (commandes ou factures) d'un client, de la plus récente à la plus ancienne.
+
+    Args:
+        db_session (SessionBdDType): Session de base de données
+        modele: Commande ou Facture
+        colonne_date: Colonne de date du tri (date_commande, date_facturation)
+        id_client (int): Identifiant du client
+        limit (int): Nombre de lignes de la page
+        after (Tuple[date, int] | None): Curseur décodé de la dernière ligne de la page précédente
+
+    Returns:
+        Dict[str, Any]: {'items': lignes de la page, 'next_cursor': curseur de la page suivante ou None}
+    """
+    requete = select(modele).where(modele.id_client == id_client)
+    if after:
+        requete = requete.where(apres_curseur(colonne_date, modele.id, after))
+    requete = requete.order_by(colonne_date.desc(), modele.id.desc()).limit(limit + 1)
+
+    # Une ligne de plus que la page indique l'existence d'une page suivante
+    items = list(db_session.scalars(requete))
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        dernier = items[-1]
+        next_cursor = encoder_curseur(getattr(dernier, colonne_date.key), dernier.id)
+    return {'items': items, 'next_cursor': next_cursor}
+
+def reponse_historique(modele: Any, colonne_date: Any, id_client: int, fragment: str, nom_liste: str):
+    """
+    Rendu d'une page suivante de l'historique d'un client sous forme de lignes HTML.
+    Le curseur de la page suivante est transmis dans l'en-tête X-Next-Cursor (vide en fin d'historique).
+    """
+    after = request.args.get('after')
+    curseur = decoder_curseur(after)
+    if after and curseur is None:
+        return jsonify({"error": "Curseur invalide"}), 400
+
+    db_session: SessionBdDType = SessionBdD()
+    try:
+        page = page_historique(db_session, modele, colonne_date, id_client, after=curseur)
+        html = render_template(fragment, **{nom_liste: page['items']})
+    except Exception as e:
+        acfc_log.log_to_file(ERROR, f"Erreur lors du chargement de l'historique du client {id_client}: {str(e)}",
+                             specific_logger=LOG_CLIENTS_FILE, zone_log=LOG_CLIENTS_FILE)
+        return jsonify({"error": "Erreur lors du chargement de l'historique"}), 500
+    finally:
+        db_session.close()
+
+    reponse = Response(html, mimetype='text/html')
+    reponse.headers['X-Next-Cursor'] = page['next_cursor'] or ''
+    return reponse
+
+@clients_bp.route('/<int:id_client>/commandes/historique')
+@validate_habilitation(CLIENTS)
+def client_commandes_historique(id_client: int):
+    """Page suivante de l'historique des commandes d'un client (paramètre after = curseur)."""
+    return reponse_historique(Commande, Commande.date_commande, id_client,
+                              'clients/fragments/commandes_lignes.html', 'commandes')
+
+@clients_bp.route('/<int:id_client>/factures/historique')
+@validate_habilitation(CLIENTS)
+def client_factures_historique(id_client: int):
+    """Page suivante de l'historique des factures d'un client (paramètre after = curseur)."""
+    return reponse_historique(Facture, Facture.date_facturation, id_client,
+                              'clients/fragments/factures_lignes.html', 'factures')
+
+def contenu_onglet(db_session: SessionBdDType, onglet: str, id_client: int) -> Dict[str, Any]:
+    """
+    Données d'un onglet de la fiche client, transmises au fragment correspondant.
+
+    Returns:
+        Dict[str, Any]: Variables du template clients/fragments/onglet_<onglet>.html
+    """
+    if onglet == 'commandes':
+        return {'page': page_historique(db_session, Commande, Commande.date_commande, id_client)}
+    if onglet == 'factures':
+        return {'page': page_historique(db_session, Facture, Facture.date_facturation, id_client)}
+    modele, nom_liste = ONGLETS_CONTACTS[onglet]
+    contacts = db_session.scalars(
+        select(modele).where(modele.id_client == id_client).order_by(modele.is_principal.desc(), modele.id)
+    ).all()
+    return {nom_liste: contacts}
+
+@clients_bp.route('/<int:id_client>/onglets/<onglet>')
+@validate_habilitation(CLIENTS)
+def client_onglet(id_client: int, onglet: str):
+    """
+    Fragment HTML d'un onglet de la fiche client (telephones, emails, adresses, commandes, factures).
+
+    La réponse porte un ETag : le navigateur la revalide (If-None-Match) et reçoit un 304
+    sans contenu lorsque l'onglet n'a pas changé.
+    """
+    if onglet not in ONGLETS_CLIENT:
+        return jsonify({"error": "Onglet inconnu"}), 404
+
+    db_session: SessionBdDType = SessionBdD()
+    try:
+        html = render_template(f'clients/fragments/onglet_{onglet}.html', id_client=id_client,
+                               **contenu_onglet(db_session, onglet, id_client))
+    except Exception as e:
+        acfc_log.log_to_file(ERROR, f"Erreur lors du chargement de l'onglet {onglet} du client {id_client}: {str(e)}",
+                             specific_logger=LOG_CLIENTS_FILE, zone_log=LOG_CLIENTS_FILE)
+        return jsonify({"error": "Erreur lors du chargement de l'onglet"}), 500
+    finally:
+        db_session.close()
+
+    reponse = Response(html, mimetype='text/html')
+    reponse.headers['Cache-Control'] = 'private, no-cache'
+    reponse.add_etag()
+    return reponse.make_conditional(request)
 
 @clients_bp.route('/<id_client>/commandes/en-cours')
 @validate_habilitation(CLIENTS)
@@ -9,6 +9,7 @@ Fonctionnalités principales :
 - Création de commandes à partir de la fiche client
 - Sélection de produits du catalogue avec filtres
 - Gestion des états (facturation, expédition)
+- API JSON de facturation, d'expédition et d'annulation par lot
 - Calcul automatique des montants
 
 Auteur : Développement ACFC
@@ -17,11 +18,19 @@ Version : 1.0
 
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
 from datetime import datetime, date
+from decimal import Decimal
+from sqlalchemy import select
 from sqlalchemy.orm import Session as SessionBdDType
 from app_acfc.modeles import SessionBdD, Commande, DevisesFactures, Catalogue, Client
 from app_acfc.habilitations import validate_habilitation, CLIENTS
-from logs.logger import acfc_log, ERROR, DEBUG
-from typing import List, Dict, Optional, Any
+from app_acfc.indicateurs import rafraichir_ventes_journalieres, cle_ventes
+from app_acfc.cache import invalider_cache_commandes
+from app_acfc.cache_catalogue import cache_catalogue
+from app_acfc.lignes_commande import calculer_diff, appliquer_diff, references_hors_catalogue, LignesFactureesError
+from app_acfc.montants import en_decimal, totaux_commande, montant_lignes_commande, PRECISION_LIGNE, ZERO
+from app_acfc.etats_commandes import appliquer_transition, valeurs_transition, identifiants_lot
+from logs.logger import acfc_log, ERROR, WARNING, DEBUG
+from typing import List, Dict, Optional, Any, Tuple
 
 # Création du blueprint
 commandes_bp = Blueprint(name='commandes',
@@ -46,14 +55,14 @@ def nouvelle_commande(id_client: int):
         
         if request.method == 'POST':
             action = request.form.get('action', 'save')
-            acfc_log.log_to_file(level=DEBUG, message=f'Action reçue: {action}', zone_log=LOG_FILE_COMMANDES)
+            acfc_log.log_to_file(DEBUG, 'Action reçue: %s', action, zone_log=LOG_FILE_COMMANDES)
             
             # Actions spéciales pour facturation et expédition
             if action in ['facturer', 'expedier']:
                 return handle_special_action(client=client, commande=None, action=action, form_data=request.form, session_db=session_db)
             
             # Sauvegarde de commande (toutes les autres actions)
-            acfc_log.log_to_file(level=DEBUG, message='Sauvegarde de la commande en cours', zone_log=LOG_FILE_COMMANDES)
+            acfc_log.log_to_file(DEBUG, 'Sauvegarde de la commande en cours', zone_log=LOG_FILE_COMMANDES)
             return save_commande(client=client, commande=None, form_data=request.form, session_db=session_db)
 
         # GET - Afficher le formulaire
@@ -107,29 +116,26 @@ def render_commande_form(client: Client, commande: Optional[Commande], session_d
         # Récupérer l'année en cours pour les filtres par défaut
         current_year = datetime.now().year
         
-        # Récupérer TOUT le catalogue - filtrage côté JavaScript
-        catalogue_complet = session_db.query(Catalogue).order_by(Catalogue.id.desc()).all()
-        acfc_log.log_to_file(level=DEBUG, message=f'Catalogue complet chargé: {len(catalogue_complet)} produits', zone_log=LOG_FILE_COMMANDES)
-        
-        # Récupérer les valeurs distinctes pour les filtres
-        millesimes = session_db.query(Catalogue.millesime).distinct().filter(Catalogue.millesime.isnot(None)).order_by(Catalogue.millesime.desc()).all()
-        millesimes = [m[0] for m in millesimes if m[0]]
-        
-        types_produit = session_db.query(Catalogue.type_produit).distinct().filter(Catalogue.type_produit.isnot(None)).order_by(Catalogue.type_produit).all()
-        types_produit = [t[0] for t in types_produit if t[0]]
-        
-        geographies = session_db.query(Catalogue.geographie).distinct().filter(Catalogue.geographie.isnot(None)).order_by(Catalogue.geographie).all()
-        geographies = [g[0] for g in geographies if g[0]]
-        
-        acfc_log.log_to_file(level=DEBUG, message=f'Valeurs distinctes pour les filtres: millésimes={millesimes}, types_produit={types_produit}, geographies={geographies}', zone_log=LOG_FILE_COMMANDES)
+        # Catalogue et valeurs des filtres depuis l'instantané en mémoire - filtrage côté JavaScript
+        catalogue = cache_catalogue.obtenir(session_db)
+        catalogue_complet = catalogue.produits
+        millesimes = catalogue.millesimes
+        types_produit = catalogue.types_produit
+        geographies = catalogue.geographies
+        acfc_log.log_to_file(DEBUG, 'Catalogue chargé depuis l\'instantané: %s produits', len(catalogue_complet), zone_log=LOG_FILE_COMMANDES)
+
         # Si on modifie une commande, récupérer les produits déjà sélectionnés
         produits_commande: Dict[int, Any] = {}
         produits_id_commandes: List[int] = []
         if commande:
+            # Les lignes ne portent que la référence produit : appariement via l'instantané du catalogue
+            id_par_reference = {produit.ref_auto: produit.id for produit in catalogue.produits}
             devises = session_db.query(DevisesFactures).filter(DevisesFactures.id_commande == commande.id).all()
             for devise in devises:
-                produits_commande[devise.id_catalogue] = devise
-                produits_id_commandes.append(devise.id_catalogue)
+                produit_id = id_par_reference.get(devise.reference)
+                if produit_id is not None:
+                    produits_commande[produit_id] = devise
+                    produits_id_commandes.append(produit_id)
         else:
             # Pour une nouvelle commande, restaurer les sélections temporaires
             temp_produits = session.get('temp_produits_selectionnes', [])
@@ -147,12 +153,12 @@ def render_commande_form(client: Client, commande: Optional[Commande], session_d
                 
                 produits_commande[produit_id_int] = TempDevise()
             
-            acfc_log.log_to_file(level=DEBUG, message=f'Sélections temporaires restaurées: {temp_produits}', zone_log=LOG_FILE_COMMANDES)
+            acfc_log.log_to_file(DEBUG, 'Sélections temporaires restaurées: %s', temp_produits, zone_log=LOG_FILE_COMMANDES)
         
         # Déterminer le sous-contexte
         sub_context = 'form'
         form_sub_context = 'create' if commande is None else 'edit'
-        acfc_log.log_to_file(level=DEBUG, message=f'Sous-contexte de commande: {sub_context}', zone_log=LOG_FILE_COMMANDES)
+        acfc_log.log_to_file(DEBUG, 'Sous-contexte de commande: %s', sub_context, zone_log=LOG_FILE_COMMANDES)
 
         return render_template('base.html',
                                context='commandes',
@@ -196,7 +202,7 @@ def handle_filters(client: Client, commande: Optional[Commande], form_data: Any,
                 if form_data.get(prix_key):
                     temp_data[prix_key] = form_data.get(prix_key)
             session['temp_commande_data'] = temp_data
-            acfc_log.log_to_file(level=DEBUG, message=f'Sélections temporaires sauvées: {produits_selectionnes}', zone_log=LOG_FILE_COMMANDES)
+            acfc_log.log_to_file(DEBUG, 'Sélections temporaires sauvées: %s', produits_selectionnes, zone_log=LOG_FILE_COMMANDES)
         
         if action == 'clear_filters':
             # Remettre les filtres par défaut
@@ -229,10 +235,12 @@ def handle_special_action(client: Client, commande: Optional[Commande], action:
             # Marquer comme facturée
             commande.is_facture = True
             commande.date_facturation = datetime.strptime(form_data.get('date_facturation'), '%Y-%m-%d').date()
+            rafraichir_ventes_journalieres(session_db, [cle_ventes(commande)])
             session_db.commit()
+            invalider_cache_commandes()
             
             flash(f'Commande #{commande.id} facturée avec succès', 'success')
-            acfc_log.log_to_file(level=DEBUG, message=f'Commande {commande.id} facturée', zone_log=LOG_FILE_COMMANDES)
+            acfc_log.log_to_file(DEBUG, 'Commande %s facturée', commande.id, zone_log=LOG_FILE_COMMANDES)
             
         elif action == 'expedier':
             # Pour une nouvelle commande, il faut d'abord la sauvegarder
@@ -257,9 +265,10 @@ def handle_special_action(client: Client, commande: Optional[Commande], action:
                 commande.id_suivi = f'{mode_expedition.replace("_", " ").title()}'
             
             session_db.commit()
+            invalider_cache_commandes()
             
             flash(f'Commande #{commande.id} expédiée avec succès', 'success')
-            acfc_log.log_to_file(level=DEBUG, message=f'Commande {commande.id} expédiée', zone_log=LOG_FILE_COMMANDES)
+            acfc_log.log_to_file(DEBUG, 'Commande %s expédiée', commande.id, zone_log=LOG_FILE_COMMANDES)
         
         return redirect(url_for(DETAIL_CLIENT, id_client=client.id))
         
@@ -274,19 +283,20 @@ def save_commande(client: Client, commande: Optional[Commande], form_data: Any,
     """Sauvegarder une commande (création ou modification)"""
     try:
         is_new = commande is None
+        cles_ventes = [] if is_new else [cle_ventes(commande)]  # Clé de cumul avant modification
         
         if is_new:
             commande = Commande()
             commande.id_client = client.id
         
         # Récupérer les données du formulaire
-        acfc_log.log_to_file(level=DEBUG, message='Récupération des données du formulaire pour sauvegarde de commande', zone_log=LOG_FILE_COMMANDES)
+        acfc_log.log_to_file(DEBUG, 'Récupération des données du formulaire pour sauvegarde de commande', zone_log=LOG_FILE_COMMANDES)
         commande.date_commande = datetime.strptime(form_data.get('date_commande'), '%Y-%m-%d').date()
         commande.descriptif = form_data.get('descriptif', '')
         commande.id_adresse = int(form_data.get('id_adresse')) if form_data.get('id_adresse') else None
         
         # États de la commande
-        acfc_log.log_to_file(level=DEBUG, message='Mise à jour des états de la commande', zone_log=LOG_FILE_COMMANDES)
+        acfc_log.log_to_file(DEBUG, 'Mise à jour des états de la commande', zone_log=LOG_FILE_COMMANDES)
         commande.is_facture = 'is_facture' in form_data
         commande.is_expedie = 'is_expedie' in form_data
         
@@ -306,84 +316,129 @@ def save_commande(client: Client, commande: Optional[Commande], form_data: Any,
         # Sauvegarder la commande pour obtenir l'ID
         if is_new:
             session_db.add(commande)
-            acfc_log.log_to_file(level=DEBUG, message='Nouvelle commande ajoutée à la session', zone_log=LOG_FILE_COMMANDES)
+            acfc_log.log_to_file(DEBUG, 'Nouvelle commande ajoutée à la session', zone_log=LOG_FILE_COMMANDES)
             session_db.flush()  # Pour obtenir l'ID
-            acfc_log.log_to_file(level=DEBUG, message=f'ID de la nouvelle commande: {commande.id}', zone_log=LOG_FILE_COMMANDES)
+            acfc_log.log_to_file(DEBUG, 'ID de la nouvelle commande: %s', commande.id, zone_log=LOG_FILE_COMMANDES)
 
         # Traiter les produits sélectionnés
-        produits_selectionnes = form_data.getlist('produits_selectionnes')
-        acfc_log.log_to_file(level=DEBUG, message=f'Produits sélectionnés: {produits_selectionnes}', zone_log=LOG_FILE_COMMANDES)
+        produits_selectionnes = [int(produit_id) for produit_id in form_data.getlist('produits_selectionnes')]
+        acfc_log.log_to_file(DEBUG, 'Produits sélectionnés: %s', produits_selectionnes, zone_log=LOG_FILE_COMMANDES)
+
+        # Résolution de tous les produits en une requête
+        produits = charger_produits(session_db, produits_selectionnes)
+        lignes, montant_total = construire_lignes_commande(commande.id, produits_selectionnes, produits, form_data)
+
+        # Écriture des seules lignes ajoutées, modifiées ou retirées
+        existantes = [] if is_new else session_db.scalars(
+            select(DevisesFactures).where(DevisesFactures.id_commande == commande.id).order_by(DevisesFactures.id)
+        ).all()
+        # Lignes dont la référence n'est plus au catalogue : absentes du formulaire, donc conservées
+        hors_catalogue = references_hors_catalogue(
+            existantes, {produit.ref_auto for produit in cache_catalogue.obtenir(session_db).produits}
+        ) if existantes else set()
+        diff = calculer_diff(existantes, lignes, hors_catalogue)
+        appliquer_diff(session_db, diff)
+        if diff.conservees:
+            # Les lignes conservées comptent dans le montant de la commande
+            _, montant_total = totaux_commande([*lignes, *({'qte': ligne.qte, 'prix_unitaire': ligne.prix_unitaire,
+                                                            'remise': ligne.remise} for ligne in diff.conservees)])
+        acfc_log.log_to_file(DEBUG, 'Lignes de la commande %s: %s ajoutée(s), %s modifiée(s), %s supprimée(s), %s inchangée(s)',
+                             commande.id, len(diff.insertions), len(diff.mises_a_jour), len(diff.suppressions),
+                             diff.inchangees, zone_log=LOG_FILE_COMMANDES)
+        
+        # Rapprochement du montant calculé avec les prix_total générés par la base
+        montant_base = montant_lignes_commande(session_db, commande.id)
+        if montant_base != montant_total:
+            acfc_log.log_to_file(level=WARNING, message=f'Commande {commande.id}: montant calculé {montant_total} différent '
+                                 f'du total des lignes en base {montant_base}, total des lignes retenu', zone_log=LOG_FILE_COMMANDES)
+            montant_total = montant_base
 
-        if not is_new:
-            # Supprimer les anciens produits
-            session_db.query(DevisesFactures).filter(DevisesFactures.id_commande == commande.id).delete()
-        
-        montant_total = 0.0
-        
-        for produit_id in produits_selectionnes:
-            produit_id = int(produit_id)
-            qte_key = f'qte_{produit_id}'
-            prix_key = f'prix_{produit_id}'  # Nouveau: prix personnalisé
-            qte = int(form_data.get(qte_key, 1))
-            
-            # Récupérer les infos du produit
-            produit = session_db.query(Catalogue).filter(Catalogue.id == produit_id).first()
-            if produit:
-                devise = DevisesFactures()
-                devise.id_commande = commande.id
-                devise.id_catalogue = produit_id
-                devise.reference = produit.ref_auto
-                devise.designation = produit.des_auto
-                devise.qte = qte
-                
-                # Utiliser le prix personnalisé si fourni, sinon le prix du catalogue
-                prix_personnalise = form_data.get(prix_key)
-                if prix_personnalise:
-                    devise.prix_unitaire = float(prix_personnalise)
-                else:
-                    devise.prix_unitaire = float(produit.prix_unitaire_ht)
-                
-                devise.remise = 0.0  # Pas de remise par défaut
-                # Ne pas assigner prix_total - il est calculé automatiquement par la base
-                
-                # Calculer le montant total côté application pour l'affichage
-                prix_ligne = devise.qte * devise.prix_unitaire * (1 - devise.remise)
-                montant_total += prix_ligne
-                
-                session_db.add(devise)
-                acfc_log.log_to_file(level=DEBUG, message=f'Produit ajouté à la commande: {devise.designation}, QTE: {devise.qte}, Prix Unitaire: {devise.prix_unitaire}, Prix calculé: {prix_ligne}', zone_log=LOG_FILE_COMMANDES)
-        
         # Mettre à jour le montant total
         commande.montant = montant_total
-        acfc_log.log_to_file(level=DEBUG, message=f'Montant total de la commande mis à jour: {commande.montant}', zone_log=LOG_FILE_COMMANDES)
+        acfc_log.log_to_file(DEBUG, 'Montant total de la commande mis à jour: %s', commande.montant, zone_log=LOG_FILE_COMMANDES)
+        
+        # Mise à jour du cumul journalier des ventes (ancienne et nouvelle clé)
+        cles_ventes.append(cle_ventes(commande))
+        rafraichir_ventes_journalieres(session_db, cles_ventes)
         
         # Sauvegarder tout
         session_db.commit()
-        acfc_log.log_to_file(level=DEBUG, message='Commande et produits sauvegardés avec succès', zone_log=LOG_FILE_COMMANDES)
+        invalider_cache_commandes()
+        acfc_log.log_to_file(DEBUG, 'Commande et produits sauvegardés avec succès', zone_log=LOG_FILE_COMMANDES)
         
         # Nettoyer les données temporaires après succès
         if is_new:
             session.pop('temp_produits_selectionnes', None)
             session.pop('temp_commande_data', None)
-            acfc_log.log_to_file(level=DEBUG, message='Données temporaires nettoyées', zone_log=LOG_FILE_COMMANDES)
+            acfc_log.log_to_file(DEBUG, 'Données temporaires nettoyées', zone_log=LOG_FILE_COMMANDES)
         
         # Message de succès
         if is_new:
             flash(f'Commande créée avec succès pour {client.nom_affichage}', 'success')
-            acfc_log.log_to_file(level=DEBUG, message=f'Nouvelle commande créée (ID: {commande.id}) pour le client {client.nom_affichage}', zone_log=LOG_FILE_COMMANDES)
+            acfc_log.log_to_file(DEBUG, 'Nouvelle commande créée (ID: %s) pour le client %s', commande.id, client.nom_affichage, zone_log=LOG_FILE_COMMANDES)
         else:
             flash(f'Commande #{commande.id} modifiée avec succès', 'success')
-            acfc_log.log_to_file(level=DEBUG, message=f'Commande {commande.id} modifiée pour le client {client.nom_affichage}', zone_log=LOG_FILE_COMMANDES)
+            acfc_log.log_to_file(DEBUG, 'Commande %s modifiée pour le client %s', commande.id, client.nom_affichage, zone_log=LOG_FILE_COMMANDES)
 
         # Rediriger vers la fiche client
         return redirect(url_for('clients.get_client', id_client=client.id))
         
+    except LignesFactureesError as e:
+        session_db.rollback()
+        acfc_log.log_to_file(level=ERROR, message=f"Sauvegarde de commande refusée: {str(e)}", zone_log=LOG_FILE_COMMANDES)
+        flash('Les produits déjà facturés ne peuvent pas être modifiés ni retirés de la commande', 'error')
+        return render_commande_form(client, commande, session_db)
     except Exception as e:
         session_db.rollback()
-        acfc_log.log_to_file(level=ERROR, message=f"Erreur lors de la sauvegarde de commande: {str(e)}", zone_log=LOG_FILE_COMMANDES)
+        acfc_log.log_to_file(level=ERROR, message=f"Erreur lors de la sauvegarde de commande: {str(e)}", zone_log=LOG_FILE_COMMANDES,
+                             exc_info=True)
         return render_commande_form(client, commande, session_db)
 
 
+def charger_produits(session_db: SessionBdDType, produits_ids: List[int]) -> Dict[int, Catalogue]:
+    """Produits du catalogue indexés par identifiant, chargés en une seule requête IN."""
+    if not produits_ids:
+        return {}
+    return {produit.id: produit
+            for produit in session_db.scalars(select(Catalogue).where(Catalogue.id.in_(set(produits_ids))))}
+
+
+def construire_lignes_commande(id_commande: int, produits_selectionnes: List[int], produits: Dict[int, Catalogue],
+                               form_data: Any) -> Tuple[List[Dict[str, Any]], Decimal]:
+    """
+    Construit les lignes DevisesFactures d'une commande à partir du formulaire.
+
+    Les prix sont convertis en Decimal à la précision de la colonne et le montant est
+    calculé avec les règles d'arrondi de la base (voir montants.py).
+
+    Args:
+        id_commande (int): Identifiant de la commande
+        produits_selectionnes (List[int]): Identifiants des produits cochés, dans l'ordre du formulaire
+        produits (Dict[int, Catalogue]): Produits résolus (voir charger_produits), les absents sont ignorés
+        form_data (Any): Formulaire (champs qte_<id> et prix_<id>)
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Decimal]: Valeurs des lignes à insérer et montant total de la commande
+    """
+    lignes: List[Dict[str, Any]] = []
+    for produit_id in produits_selectionnes:
+        produit = produits.get(produit_id)
+        if produit is None:
+            continue
+
+        # Utiliser le prix personnalisé si fourni, sinon le prix du catalogue
+        prix_personnalise = form_data.get(f'prix_{produit_id}')
+        prix_unitaire = en_decimal(prix_personnalise or produit.prix_unitaire_ht, PRECISION_LIGNE)
+
+        # prix_total et remise_euro sont calculés par la base (colonnes générées)
+        lignes.append({'id_commande': id_commande, 'reference': produit.ref_auto, 'designation': produit.des_auto,
+                       'qte': int(form_data.get(f'qte_{produit_id}', 1)), 'prix_unitaire': prix_unitaire,
+                       'remise': ZERO})  # Pas de remise par défaut
+
+    _, montant_total = totaux_commande(lignes)
+    return lignes, montant_total
+
+
 @commandes_bp.route('/client/<int:id_client>/commandes/<int:id_commande>/annuler', methods=['POST'])
 @validate_habilitation(CLIENTS)
 def annuler_commande(id_commande: int, id_client: int):
@@ -408,9 +463,11 @@ def annuler_commande(id_commande: int, id_client: int):
         
         # Marquer la commande comme annulée
         commande.is_annulee = True
+        rafraichir_ventes_journalieres(session_db, [cle_ventes(commande)])
         session_db.commit()
+        invalider_cache_commandes()
         
-        acfc_log.log_to_file(level=DEBUG, message=f'Commande {id_commande} annulée par utilisateur', zone_log=LOG_FILE_COMMANDES)
+        acfc_log.log_to_file(DEBUG, 'Commande %s annulée par utilisateur', id_commande, zone_log=LOG_FILE_COMMANDES)
         
         return redirect(url_for(DETAIL_CLIENT, id_client=id_client))
         
@@ -479,3 +536,71 @@ def get_client_adresses(id_client: int):
         return jsonify({'error': 'Erreur lors de la récupération des adresses'}), 500
     finally:
         if 'session_db' in locals(): session_db.close()
+
+
+# ====================================================================
+# API DES CHANGEMENTS D'ÉTAT EN LOT (AJAX)
+# ====================================================================
+
+# Blueprint distinct : les appels de commandes.js sont adressés à /api/commandes/...
+commandes_api_bp = Blueprint(name='commandes_api',
+                             import_name=__name__,
+                             url_prefix='/api/commandes')
+
+
+def executer_transition(action: str, ids: Any, donnees: Dict[str, Any]):
+    """
+    Applique une transition d'état à un lot de commandes et retourne la réponse JSON.
+
+    La réponse porte le résultat de chaque commande ; success est vrai si toutes
+    les commandes demandées ont été modifiées.
+    """
+    try:
+        ids_lot = identifiants_lot(ids)
+        valeurs = valeurs_transition(action, donnees)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    session_db = SessionBdD()
+    try:
+        resultats, nb_modifiees = appliquer_transition(session_db, action, ids_lot, valeurs)
+        session_db.commit()
+        if nb_modifiees:
+            invalider_cache_commandes()
+        acfc_log.log_to_file(DEBUG, 'Transition %s : %s/%s commande(s) modifiée(s)', action, nb_modifiees, len(ids_lot), zone_log=LOG_FILE_COMMANDES)
+        return jsonify({'success': nb_modifiees == len(ids_lot), 'nb_modifiees': nb_modifiees, 'resultats': resultats})
+    except Exception as e:
+        session_db.rollback()
+        acfc_log.log_to_file(level=ERROR, message=f'Erreur lors de la transition {action} des commandes {ids_lot}: {str(e)}', zone_log=LOG_FILE_COMMANDES)
+        return jsonify({'success': False, 'error': f'Erreur lors de l\'action {action}'}), 500
+    finally:
+        session_db.close()
+
+
+@commandes_api_bp.route('/bulk-update', methods=['POST'])
+@validate_habilitation(CLIENTS)
+def bulk_update():
+    """Facturer, expédier ou annuler un lot de commandes : {'action', 'commande_ids', ...}"""
+    donnees = request.get_json(silent=True) or {}
+    return executer_transition(donnees.get('action', ''), donnees.get('commande_ids'), donnees)
+
+
+@commandes_api_bp.route('/<int:id_commande>/generate-facture', methods=['POST'])
+@validate_habilitation(CLIENTS)
+def generate_facture(id_commande: int):
+    """Facturer une commande : {'date_facturation'}"""
+    return executer_transition('facture', [id_commande], request.get_json(silent=True) or {})
+
+
+@commandes_api_bp.route('/<int:id_commande>/mark-expedie', methods=['POST'])
+@validate_habilitation(CLIENTS)
+def mark_expedie(id_commande: int):
+    """Marquer une commande comme expédiée : {'date_expedition', 'id_suivi'}"""
+    return executer_transition('expedie', [id_commande], request.get_json(silent=True) or {})
+
+
+@commandes_api_bp.route('/<int:id_commande>', methods=['DELETE'])
+@validate_habilitation(CLIENTS)
+def delete_commande(id_commande: int):
+    """Annuler une commande (soft delete, comme annuler_commande)"""
+    return executer_transition('annule', [id_commande], {})
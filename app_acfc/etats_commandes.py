@@ -0,0 +1,181 @@
+"""
+ACFC - Changements d'État des Commandes en Lot
+==============================================
+
+Module des transitions d'état des commandes (11_commandes) appliquées à un lot
+de commandes dans une seule transaction :
+
+- facture : commande non annulée et non facturée -> is_facture, date_facturation
+- expedie : commande facturée, non annulée et non expédiée -> is_expedie,
+  date_expedition, id_suivi
+- annule  : commande non annulée et non expédiée -> is_annulee (soft delete)
+
+Les règles sont celles des actions unitaires du formulaire de commande
+(handle_special_action, annuler_commande). Les commandes du lot sont lues et
+verrouillées en une requête (SELECT ... FOR UPDATE), l'éligibilité est évaluée
+commande par commande, puis les commandes éligibles sont modifiées par un seul
+UPDATE ... WHERE id IN (...). Chaque commande du lot reçoit un résultat
+(modifiée, refusée avec le motif, introuvable).
+
+Auteur : ACFC Development Team
+Version : 1.0
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session as SessionBdDType
+from app_acfc.modeles import Commande
+from app_acfc.indicateurs import rafraichir_ventes_journalieres
+
+# ====================================================================
+# RÈGLES DE TRANSITION
+# ====================================================================
+
+# Nombre maximal de commandes traitées par requête
+TAILLE_MAX_LOT = 500
+
+# Statuts des résultats par commande
+MODIFIEE = 'modifiee'
+REFUSEE = 'refusee'
+INTROUVABLE = 'introuvable'
+
+@dataclass(frozen=True)
+class RegleTransition:
+    """
+    Conditions d'une transition d'état.
+
+    Attributes:
+        conditions: (attribut, valeur attendue, motif du refus) vérifiés dans l'ordre
+        rafraichit_ventes: La transition modifie les cumuls de ventes (commandes facturées non annulées)
+    """
+    conditions: Tuple[Tuple[str, bool, str], ...]
+    rafraichit_ventes: bool
+
+TRANSITIONS: Dict[str, RegleTransition] = {
+    'facture': RegleTransition(
+        conditions=(('is_annulee', False, 'Commande annulée'),
+                    ('is_facture', False, 'Commande déjà facturée')),
+        rafraichit_ventes=True),
+    'expedie': RegleTransition(
+        conditions=(('is_annulee', False, 'Commande annulée'),
+                    ('is_facture', True, 'La commande doit être facturée avant d\'être expédiée'),
+                    ('is_expedie', False, 'Commande déjà expédiée')),
+        rafraichit_ventes=False),
+    'annule': RegleTransition(
+        conditions=(('is_annulee', False, 'Commande déjà annulée'),
+                    ('is_expedie', False, 'Impossible d\'annuler une commande déjà expédiée')),
+        rafraichit_ventes=True),
+}
+
+# ====================================================================
+# PRÉPARATION DE LA DEMANDE
+# ====================================================================
+
+def _date_saisie(valeur: Any) -> date:
+    """Date au format AAAA-MM-JJ (date du jour si absente)."""
+    if not valeur:
+        return date.today()
+    try:
+        return datetime.strptime(str(valeur), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"Date invalide : {valeur!r}")
+
+def valeurs_transition(action: str, donnees: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Colonnes écrites par une transition à partir des données de la requête.
+
+    Args:
+        action (str): Transition demandée (clé de TRANSITIONS)
+        donnees (Mapping[str, Any]): Corps JSON (date_facturation, date_expedition, id_suivi)
+
+    Raises:
+        ValueError: Si l'action est inconnue ou une date invalide
+    """
+    if action == 'facture':
+        return {'is_facture': True, 'date_facturation': _date_saisie(donnees.get('date_facturation'))}
+    if action == 'expedie':
+        return {'is_expedie': True, 'date_expedition': _date_saisie(donnees.get('date_expedition')),
+                'id_suivi': (str(donnees.get('id_suivi') or '').strip() or None)}
+    if action == 'annule':
+        return {'is_annulee': True}
+    raise ValueError(f"Action inconnue : {action!r}")
+
+def identifiants_lot(valeurs: Any) -> List[int]:
+    """
+    Identifiants de commandes d'un lot, dédoublonnés dans l'ordre de la demande.
+
+    Raises:
+        ValueError: Si la liste est vide, trop longue ou contient un identifiant non entier
+    """
+    if not isinstance(valeurs, list) or not valeurs:
+        raise ValueError("Aucune commande sélectionnée")
+    try:
+        ids = list(dict.fromkeys(int(valeur) for valeur in valeurs))
+    except (TypeError, ValueError):
+        raise ValueError("Identifiant de commande invalide")
+    if len(ids) > TAILLE_MAX_LOT:
+        raise ValueError(f"Un lot est limité à {TAILLE_MAX_LOT} commandes")
+    return ids
+
+# ====================================================================
+# APPLICATION DU LOT
+# ====================================================================
+
+def appliquer_transition(db_session: SessionBdDType, action: str, ids: Iterable[int],
+                         valeurs: Mapping[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Applique une transition à un lot de commandes dans la transaction courante.
+
+    Args:
+        db_session (SessionBdDType): Session de base de données (commit à la charge de l'appelant)
+        action (str): Transition demandée (clé de TRANSITIONS)
+        ids (Iterable[int]): Identifiants des commandes
+        valeurs (Mapping[str, Any]): Colonnes à écrire (voir valeurs_transition)
+
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: Résultat par commande ({'id', 'statut', 'message'})
+        et nombre de commandes modifiées
+    """
+    regle = TRANSITIONS[action]
+    ids = list(ids)
+    lignes = db_session.execute(
+        select(Commande.id, Commande.date_commande, Commande.id_client,
+               Commande.is_annulee, Commande.is_facture, Commande.is_expedie)
+        .where(Commande.id.in_(ids))
+        .with_for_update()
+    ).all()
+    par_id = {ligne.id: ligne for ligne in lignes}
+
+    resultats: List[Dict[str, Any]] = []
+    eligibles: List[int] = []
+    cles: List[Tuple[date, int]] = []
+    for id_commande in ids:
+        ligne = par_id.get(id_commande)
+        if ligne is None:
+            resultats.append({'id': id_commande, 'statut': INTROUVABLE, 'message': 'Commande non trouvée'})
+            continue
+        motif = next((motif for attribut, attendu, motif in regle.conditions
+                      if bool(getattr(ligne, attribut)) != attendu), None)
+        if motif is not None:
+            resultats.append({'id': id_commande, 'statut': REFUSEE, 'message': motif})
+            continue
+        eligibles.append(id_commande)
+        cles.append((ligne.date_commande, ligne.id_client))
+        resultats.append({'id': id_commande, 'statut': MODIFIEE, 'message': None})
+
+    if not eligibles:
+        return resultats, 0
+
+    # Les conditions sont rejouées dans le WHERE : l'UPDATE ne touche que des commandes éligibles
+    nb_modifiees = db_session.execute(
+        update(Commande)
+        .where(Commande.id.in_(eligibles),
+               *(getattr(Commande, attribut) == attendu for attribut, attendu, _ in regle.conditions))
+        .values(**valeurs)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if regle.rafraichit_ventes:
+        rafraichir_ventes_journalieres(db_session, cles)
+    return resultats, nb_modifiees
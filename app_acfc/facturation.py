@@ -0,0 +1,242 @@
+"""
+ACFC - Génération des Factures par Lot
+======================================
+
+Job de facturation des commandes facturées (is_facture) non annulées qui n'ont
+pas encore de facture (13_factures) :
+
+- une facture par commande : client, adresse (celle de la commande, à défaut
+  l'adresse principale active du client), date de facturation et montant
+- rattachement des lignes de la commande à la facture (12_devises_factures.id_facture)
+  en un seul UPDATE par lot
+- identifiants fiscaux attribués après le flush, en un seul UPDATE par lot
+  (voir attribuer_ids_fiscaux dans modeles.py)
+
+Les commandes sont traitées par lots, chaque lot dans sa propre transaction :
+un lot en erreur est annulé et journalisé sans bloquer les suivants. Le bilan
+retourné indique le nombre de factures créées, les lots et le débit.
+
+Exécution directe ou via la file RQ 'facturation' (Redis) :
+```bash
+python -m app_acfc.facturation --generer                         # Toutes les commandes à facturer
+python -m app_acfc.facturation --generer --jusqu-au 2026-09-30   # Facturées jusqu'à cette date
+python -m app_acfc.facturation --generer --file                  # Mise en file pour un worker RQ
+```
+
+Les jobs mis en file sont exécutés par le service acfc-facturation de docker-compose.yml
+(worker RQ de la file 'facturation', construit avec l'image de l'application).
+
+Configuration (variables d'environnement) :
+- FACTURATION_TAILLE_LOT : nombre de commandes par transaction (défaut: 200)
+- REDIS_HOST, REDIS_PORT, REDIS_DB : connexion Redis de la file RQ
+
+Auteur : ACFC Development Team
+Version : 1.0
+"""
+
+from argparse import ArgumentParser
+from datetime import date, datetime
+from os import getenv
+from time import perf_counter
+from typing import Any, Dict, List, Sequence, Tuple
+from sqlalchemy import Row, select, update, exists
+from sqlalchemy.orm import Session as SessionBdDType
+from app_acfc.modeles import SessionBdD, Adresse, Commande, DevisesFactures, Facture
+from logs.logger import acfc_log, ERROR, INFO
+
+try:
+    from redis import Redis
+    from rq import Queue
+except ImportError:  # File RQ optionnelle : la génération directe reste disponible
+    Redis = None
+    Queue = None
+
+# ====================================================================
+# CONSTANTES
+# ====================================================================
+
+TAILLE_LOT_FACTURATION = int(getenv('FACTURATION_TAILLE_LOT', '200'))
+FILE_FACTURATION = 'facturation'
+LOG_FILE_FACTURATION = 'facturation.log'
+
+# ====================================================================
+# SÉLECTION DES COMMANDES
+# ====================================================================
+
+def commandes_a_facturer(db_session: SessionBdDType, apres_id: int, taille: int,
+                         jusqu_au: date | None = None) -> Sequence[Row[Any]]:
+    """
+    Lot suivant des commandes facturées, non annulées et sans facture, par identifiant croissant.
+
+    Les commandes du lot sont verrouillées (SELECT ... FOR UPDATE) : deux jobs simultanés
+    ne peuvent pas facturer la même commande.
+
+    Args:
+        db_session (SessionBdDType): Session de base de données
+        apres_id (int): Dernier identifiant du lot précédent (0 pour le premier lot)
+        taille (int): Nombre maximal de commandes
+        jusqu_au (date | None): Dernière date de facturation retenue (toutes si None)
+    """
+    requete = (
+        select(Commande.id, Commande.id_client, Commande.id_adresse, Commande.date_facturation, Commande.montant)
+        .where(Commande.is_facture == True, Commande.is_annulee == False, Commande.id > apres_id,
+               ~exists().where(Facture.id_commande == Commande.id))
+        .order_by(Commande.id)
+        .limit(taille)
+        .with_for_update()
+    )
+    if jusqu_au is not None:
+        requete = requete.where(Commande.date_facturation <= jusqu_au)
+    return db_session.execute(requete).all()
+
+def adresses_facturation(db_session: SessionBdDType, ids_clients: Sequence[int]) -> Dict[int, int]:
+    """Adresse par défaut de chaque client : principale active, à défaut la première active."""
+    adresses: Dict[int, int] = {}
+    for id_client, id_adresse in db_session.execute(
+        select(Adresse.id_client, Adresse.id)
+        .where(Adresse.id_client.in_(ids_clients), Adresse.is_active == True)
+        .order_by(Adresse.is_principal.desc(), Adresse.id)
+    ):
+        adresses.setdefault(id_client, id_adresse)
+    return adresses
+
+# ====================================================================
+# FACTURATION D'UN LOT
+# ====================================================================
+
+def facturer_lot(db_session: SessionBdDType, commandes: Sequence[Row[Any]]) -> Tuple[int, List[int]]:
+    """
+    Crée les factures d'un lot de commandes et y rattache leurs lignes.
+
+    Args:
+        db_session (SessionBdDType): Session de base de données (commit à la charge de l'appelant)
+        commandes (Sequence[Row[Any]]): Commandes retournées par commandes_a_facturer()
+
+    Returns:
+        Tuple[int, List[int]]: Nombre de factures créées et commandes ignorées faute d'adresse
+    """
+    sans_adresse = [commande.id_client for commande in commandes if commande.id_adresse is None]
+    adresses = adresses_facturation(db_session, sorted(set(sans_adresse))) if sans_adresse else {}
+
+    factures: List[Facture] = []
+    ignorees: List[int] = []
+    for commande in commandes:
+        id_adresse = commande.id_adresse or adresses.get(commande.id_client)
+        if id_adresse is None:
+            ignorees.append(commande.id)
+            continue
+        factures.append(Facture(id_client=commande.id_client, id_commande=commande.id, id_adresse=id_adresse,
+                                date_facturation=commande.date_facturation or date.today(),
+                                montant_facture=commande.montant))
+    if not factures:
+        return 0, ignorees
+
+    db_session.add_all(factures)
+    db_session.flush()
+
+    # Rattachement des lignes : une seule requête pour toutes les commandes du lot
+    db_session.execute(
+        update(DevisesFactures)
+        .where(DevisesFactures.id_commande.in_([facture.id_commande for facture in factures]),
+               DevisesFactures.id_facture.is_(None))
+        .values(id_facture=select(Facture.id).where(Facture.id_commande == DevisesFactures.id_commande)
+                .scalar_subquery())
+        .execution_options(synchronize_session=False)
+    )
+    return len(factures), ignorees
+
+# ====================================================================
+# JOB DE FACTURATION
+# ====================================================================
+
+def generer_factures(taille_lot: int = TAILLE_LOT_FACTURATION, jusqu_au: date | None = None) -> Dict[str, Any]:
+    """
+    Facture toutes les commandes en attente, lot par lot (une transaction par lot).
+
+    Fonction exécutable directement ou par un worker RQ (voir planifier_generation_factures).
+
+    Args:
+        taille_lot (int): Nombre de commandes par transaction
+        jusqu_au (date | None): Dernière date de facturation retenue (toutes si None)
+
+    Returns:
+        Dict[str, Any]: factures, lots, lots_en_erreur, sans_adresse, duree_s, factures_par_s
+    """
+    debut = perf_counter()
+    bilan: Dict[str, Any] = {'factures': 0, 'lots': 0, 'lots_en_erreur': 0, 'sans_adresse': []}
+    apres_id = 0
+    db_session: SessionBdDType = SessionBdD()
+    try:
+        while True:
+            commandes = commandes_a_facturer(db_session, apres_id, taille_lot, jusqu_au)
+            if not commandes:
+                break
+            apres_id = commandes[-1].id
+            bilan['lots'] += 1
+            try:
+                nb_factures, ignorees = facturer_lot(db_session, commandes)
+                db_session.commit()
+                bilan['factures'] += nb_factures
+                bilan['sans_adresse'].extend(ignorees)
+            except Exception as e:
+                db_session.rollback()
+                bilan['lots_en_erreur'] += 1
+                acfc_log.log_to_file(level=ERROR, message=f'Erreur de facturation du lot {commandes[0].id}-{apres_id}: {str(e)}', zone_log=LOG_FILE_FACTURATION)
+    finally:
+        db_session.close()
+
+    duree = perf_counter() - debut
+    bilan['duree_s'] = round(duree, 3)
+    bilan['factures_par_s'] = round(bilan['factures'] / duree, 1) if duree > 0 else 0.0
+    acfc_log.log_to_file(level=INFO, message=f'Facturation par lot : {bilan}', zone_log=LOG_FILE_FACTURATION)
+
+    # Le worker RQ exécute le job dans un processus fils terminé par os._exit() : les
+    # vidages atexit des logs ne s'y exécutent pas, les entrées en file sont écrites ici
+    acfc_log.registre.vider()
+    if acfc_log.expediteur is not None:
+        acfc_log.expediteur.vider()
+    return bilan
+
+def planifier_generation_factures(taille_lot: int = TAILLE_LOT_FACTURATION, jusqu_au: date | None = None) -> str:
+    """
+    Met le job de facturation dans la file RQ 'facturation'.
+
+    Returns:
+        str: Identifiant du job RQ
+
+    Raises:
+        RuntimeError: Si les paquets redis et rq ne sont pas installés
+    """
+    if Queue is None or Redis is None:
+        raise RuntimeError("Les paquets 'redis' et 'rq' sont requis pour la file de facturation")
+    connexion = Redis(host=getenv('REDIS_HOST', 'acfc-redis'), port=int(getenv('REDIS_PORT', '6379')),
+                      db=int(getenv('REDIS_DB', '0')))
+    job = Queue(FILE_FACTURATION, connection=connexion).enqueue(generer_factures, taille_lot, jusqu_au,
+                                                                job_timeout=3600)
+    return job.id
+
+# ====================================================================
+# POINT D'ENTRÉE EN LIGNE DE COMMANDE
+# ====================================================================
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Génération des factures des commandes facturées ACFC")
+    parser.add_argument('--generer', action='store_true', help="Créer les factures des commandes en attente")
+    parser.add_argument('--jusqu-au', type=lambda valeur: datetime.strptime(valeur, '%Y-%m-%d').date(),
+                        default=None, help="Dernière date de facturation retenue (AAAA-MM-JJ)")
+    parser.add_argument('--taille-lot', type=int, default=TAILLE_LOT_FACTURATION,
+                        help="Nombre de commandes par transaction")
+    parser.add_argument('--file', action='store_true', help="Mettre le job dans la file RQ au lieu de l'exécuter")
+    args = parser.parse_args()
+
+    if not args.generer:
+        parser.print_help()
+    elif args.file:
+        print(f"Job de facturation en file : {planifier_generation_factures(args.taille_lot, args.jusqu_au)}")
+    else:
+        resultat = generer_factures(args.taille_lot, args.jusqu_au)
+        print(f"{resultat['factures']} facture(s) créée(s) en {resultat['lots']} lot(s), "
+              f"{resultat['duree_s']} s ({resultat['factures_par_s']} factures/s)")
+        if resultat['sans_adresse']:
+            print(f"Commandes sans adresse (non facturées) : {resultat['sans_adresse']}")
+        raise SystemExit(1 if resultat['lots_en_erreur'] else 0)
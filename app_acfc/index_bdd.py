@@ -0,0 +1,229 @@
+"""
+ACFC - Index de Performance et Vérification des Plans d'Exécution
+=================================================================
+
+Module de gestion des index composites déclarés sur les modèles (commandes,
+lignes de devis/factures, factures, contacts) et de vérification des plans
+d'exécution des requêtes critiques de l'application.
+
+Les index sont déclarés dans les modèles (__table_args__) et créés par
+Base.metadata.create_all() sur une base neuve. Sur une base existante :
+```bash
+python -m app_acfc.index_bdd --appliquer      # Crée les index manquants, remplit l'index de recherche vide
+python -m app_acfc.index_bdd --verifier       # EXPLAIN des requêtes critiques
+```
+
+La vérification échoue (code de sortie 1) si une requête critique parcourt
+intégralement une table (type=ALL dans le plan EXPLAIN de MariaDB).
+
+Auteur : ACFC Development Team
+Version : 1.0
+"""
+
+from argparse import ArgumentParser
+from datetime import date
+from typing import Any, Dict, Iterable, List, Mapping
+from sqlalchemy import Select, Table, select, text, and_, or_, tuple_
+from sqlalchemy.orm import Session as SessionBdDType
+from sqlalchemy.sql.functions import func
+from app_acfc.modeles import (SessionBdD, engine, Mail, Telephone, Adresse,
+                              Commande, DevisesFactures, Facture, VentesJournalieres)
+from app_acfc.indicateurs import MoteurIndicateurs, FILTRE_VENTES
+from app_acfc.recherche import index_recherche_rempli, reconstruire_index_recherche
+
+# ====================================================================
+# CONSTANTES
+# ====================================================================
+
+# Tables portant des index de performance gérés par ce module
+TABLES_INDEXEES: List[Table] = [
+    Mail.__table__, Telephone.__table__, Adresse.__table__,
+    Commande.__table__, DevisesFactures.__table__, Facture.__table__
+]
+
+# En dessous de ce nombre de lignes estimées, l'optimiseur préfère légitimement
+# le parcours complet : le plan n'est pas signalé
+SEUIL_LIGNES_DEFAUT = 100
+
+# Valeurs représentatives utilisées pour expliquer les requêtes
+_JOUR = date(2025, 1, 1)
+_ID = 1
+
+# ====================================================================
+# REQUÊTES CRITIQUES
+# ====================================================================
+
+def requetes_critiques(reference: date = _JOUR) -> Dict[str, Select[Any]]:
+    """
+    Requêtes les plus fréquentes de l'application, reproduites avec des paramètres représentatifs.
+
+    Returns:
+        Dict[str, Select[Any]]: Nom de la requête -> requête SELECT
+    """
+    en_cours = and_(Commande.is_annulee == False,
+                    or_(Commande.is_facture == False, Commande.is_expedie == False))
+    return {
+        # Tableau de bord (application.py)
+        'indicateurs_commerciaux': MoteurIndicateurs().construire_requete(reference),
+        'commandes_en_cours': (
+            select(Commande.id, Commande.date_commande, Commande.montant)
+            .where(en_cours)
+            .order_by(Commande.date_commande.desc(), Commande.id.desc())
+            .limit(21)
+        ),
+        'commandes_en_cours_client': (
+            select(Commande.id, Commande.date_commande, Commande.montant)
+            .where(en_cours, Commande.id_client == _ID)
+            .order_by(Commande.date_commande.desc(), Commande.id.desc())
+            .limit(21)
+        ),
+        # Cumul journalier des ventes (indicateurs.py)
+        'reconstruction_ventes': (
+            select(Commande.date_commande, Commande.id_client, func.count(Commande.id), func.sum(Commande.montant))
+            .where(*FILTRE_VENTES, Commande.date_commande >= reference)
+            .group_by(Commande.date_commande, Commande.id_client)
+        ),
+        'rafraichissement_ventes': (
+            select(Commande.date_commande, Commande.id_client, func.count(Commande.id), func.sum(Commande.montant))
+            .where(*FILTRE_VENTES, tuple_(Commande.date_commande, Commande.id_client).in_([(reference, _ID)]))
+            .group_by(Commande.date_commande, Commande.id_client)
+        ),
+        # Fiche client et commandes (clients.py, commandes.py)
+        'commandes_client': (
+            select(Commande.id).where(Commande.id_client == _ID).order_by(Commande.date_commande.desc())
+        ),
+        'factures_client': (
+            select(Facture.id).where(Facture.id_client == _ID).order_by(Facture.date_facturation.desc())
+        ),
+        'factures_periode': (
+            select(func.count(Facture.id)).where(Facture.date_facturation >= reference)
+        ),
+        'lignes_commande': select(DevisesFactures.id).where(DevisesFactures.id_commande == _ID),
+        'lignes_facture': select(DevisesFactures.id).where(DevisesFactures.id_facture == _ID),
+        'adresses_actives_client': (
+            select(Adresse.id).where(Adresse.id_client == _ID, Adresse.is_active == True)
+        ),
+        'clients_par_email': select(Mail.id_client).where(Mail.mail.like('contact%')),
+        'clients_par_telephone': select(Telephone.id_client).where(Telephone.telephone.like('06%')),
+        'clients_par_code_postal': select(Adresse.id_client).where(Adresse.code_postal.like('75%')),
+        'cumul_ventes_periode': (
+            select(func.sum(VentesJournalieres.montant_total)).where(VentesJournalieres.jour >= reference)
+        ),
+    }
+
+# ====================================================================
+# ANALYSE DES PLANS D'EXÉCUTION
+# ====================================================================
+
+def analyser_plan(lignes: Iterable[Mapping[str, Any]], seuil_lignes: int = SEUIL_LIGNES_DEFAUT) -> List[str]:
+    """
+    Détecte les parcours complets de table dans un plan EXPLAIN MariaDB.
+
+    Args:
+        lignes (Iterable[Mapping[str, Any]]): Lignes du résultat EXPLAIN
+        seuil_lignes (int): Nombre de lignes estimées en dessous duquel un parcours complet est toléré
+
+    Returns:
+        List[str]: Description des parcours complets détectés (vide si le plan est correct)
+    """
+    anomalies: List[str] = []
+    for ligne in lignes:
+        if str(ligne.get('type') or '').upper() != 'ALL':
+            continue
+        nb_lignes = int(ligne.get('rows') or 0)
+        if nb_lignes < seuil_lignes:
+            continue
+        anomalies.append(f"parcours complet de {ligne.get('table')} (~{nb_lignes} lignes, "
+                         f"index possibles : {ligne.get('possible_keys') or 'aucun'})")
+    return anomalies
+
+def expliquer(db_session: SessionBdDType, requete: Select[Any]) -> List[Dict[str, Any]]:
+    """Exécute EXPLAIN sur une requête compilée avec ses paramètres et retourne le plan."""
+    sql = requete.compile(dialect=db_session.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    resultat = db_session.execute(text(f'EXPLAIN {sql}'))
+    return [dict(ligne) for ligne in resultat.mappings()]
+
+def verifier_plans(db_session: SessionBdDType, seuil_lignes: int = SEUIL_LIGNES_DEFAUT) -> Dict[str, List[str]]:
+    """
+    Vérifie le plan d'exécution de chaque requête critique.
+
+    Args:
+        db_session (SessionBdDType): Session de base de données
+        seuil_lignes (int): Voir analyser_plan()
+
+    Returns:
+        Dict[str, List[str]]: Nom de la requête -> anomalies détectées (requêtes correctes incluses, liste vide)
+    """
+    return {nom: analyser_plan(expliquer(db_session, requete), seuil_lignes)
+            for nom, requete in requetes_critiques().items()}
+
+def appliquer_index() -> List[str]:
+    """
+    Crée les index déclarés sur les modèles qui n'existent pas encore en base.
+
+    Returns:
+        List[str]: Noms des index présents après exécution
+    """
+    noms: List[str] = []
+    with engine.begin() as connexion:
+        for table in TABLES_INDEXEES:
+            for index in sorted(table.indexes, key=lambda i: str(i.name)):
+                index.create(bind=connexion, checkfirst=True)
+                noms.append(f'{table.name}.{index.name}')
+    return noms
+
+def remplir_index_recherche() -> int | None:
+    """
+    Construit l'index de recherche des clients (05_index_recherche) s'il est vide.
+
+    Returns:
+        int | None: Nombre de clients indexés, None si l'index était déjà rempli
+    """
+    db_session: SessionBdDType = SessionBdD()
+    try:
+        if index_recherche_rempli(db_session):
+            return None
+        nb_clients = reconstruire_index_recherche(db_session)
+        db_session.commit()
+        return nb_clients
+    except Exception:
+        db_session.rollback()
+        raise
+    finally:
+        db_session.close()
+
+# ====================================================================
+# POINT D'ENTRÉE EN LIGNE DE COMMANDE
+# ====================================================================
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Index de performance de la base ACFC")
+    parser.add_argument('--appliquer', action='store_true',
+                        help="Créer les index déclarés manquants et remplir l'index de recherche vide")
+    parser.add_argument('--verifier', action='store_true', help="Vérifier les plans EXPLAIN des requêtes critiques")
+    parser.add_argument('--seuil-lignes', type=int, default=SEUIL_LIGNES_DEFAUT,
+                        help="Nombre de lignes estimées en dessous duquel un parcours complet est toléré")
+    args = parser.parse_args()
+
+    if not (args.appliquer or args.verifier):
+        parser.print_help()
+        raise SystemExit(0)
+
+    if args.appliquer:
+        for nom in appliquer_index():
+            print(f"Index présent : {nom}")
+        nb_clients = remplir_index_recherche()
+        if nb_clients is not None:
+            print(f"Index de recherche construit : {nb_clients} client(s)")
+
+    if args.verifier:
+        db_session: SessionBdDType = SessionBdD()
+        try:
+            resultats = verifier_plans(db_session, args.seuil_lignes)
+        finally:
+            db_session.close()
+        for nom, anomalies in resultats.items():
+            print(f"{'ÉCHEC' if anomalies else 'OK':<6}{nom}")
+            for anomalie in anomalies:
+                print(f"      - {anomalie}")
+        raise SystemExit(1 if any(resultats.values()) else 0)
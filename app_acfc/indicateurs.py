@@ -0,0 +1,325 @@
+"""
+ACFC - Moteur d'Indicateurs Commerciaux
+=======================================
+
+Module de calcul des indicateurs commerciaux affichés sur le tableau de bord.
+
+Tous les indicateurs sont calculés en un seul parcours de la table de cumul
+journalier des ventes (14_ventes_journalieres) grâce à l'agrégation conditionnelle
+(SUM/AVG/COUNT sur des expressions CASE) : une seule requête SQL est émise, quel
+que soit le nombre d'indicateurs déclarés.
+
+La table de cumul est maintenue par les chemins de mutation des commandes
+(facturation, modification, annulation) et peut être reconstruite :
+```bash
+python -m app_acfc.indicateurs --reconstruire
+python -m app_acfc.indicateurs --reconstruire --depuis 2025-01-01
+```
+
+Ajout d'un indicateur au tableau de bord : le déclarer dans le tuple
+INDICATEURS_COMMERCIAUX de ce module, lu une seule fois à la construction de
+moteur_indicateurs (une modification ultérieure du tuple est sans effet) :
+```python
+INDICATEURS_COMMERCIAUX: Tuple[Indicateur, ...] = (
+    ...
+    Indicateur('ca_moyen_mois', 'Panier Moyen Mensuel', RATIO,
+               VentesJournalieres.montant_total, MOIS, diviseur=VentesJournalieres.nb_commandes),
+)
+```
+
+Pour un autre jeu d'indicateurs, construire un moteur dédié :
+```python
+moteur = MoteurIndicateurs(INDICATEURS_COMMERCIAUX + (Indicateur(...),))
+moteur.calculer(db_session)
+```
+
+Auteur : ACFC Development Team
+Version : 1.0
+"""
+
+from argparse import ArgumentParser
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from sqlalchemy import Select, select, case, and_, delete, insert, tuple_
+from sqlalchemy.orm import Session as SessionBdDType
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import func
+from app_acfc.modeles import SessionBdD, Commande, VentesJournalieres
+
+# ====================================================================
+# CONSTANTES - TYPES D'AGRÉGATS ET PÉRIODES
+# ====================================================================
+
+SOMME = 'somme'                     # SUM(colonne)
+MOYENNE = 'moyenne'                 # AVG(colonne)
+COMPTE = 'compte'                   # COUNT(colonne)
+COMPTE_DISTINCT = 'compte_distinct' # COUNT(DISTINCT colonne)
+RATIO = 'ratio'                     # SUM(colonne) / SUM(diviseur)
+
+MOIS = 'mois'                       # Depuis le premier jour du mois en cours
+ANNEE = 'annee'                     # Depuis le premier jour de l'année en cours
+
+AGREGATS: Tuple[str, ...] = (SOMME, MOYENNE, COMPTE, COMPTE_DISTINCT, RATIO)
+PERIODES: Tuple[str, ...] = (MOIS, ANNEE)
+
+# ====================================================================
+# DÉFINITION DÉCLARATIVE DES INDICATEURS
+# ====================================================================
+
+class Indicateur:
+    """
+    Définition déclarative d'un indicateur commercial.
+
+    Attributes:
+        cle (str): Clé de l'indicateur dans le dictionnaire de résultats
+        libelle (str): Libellé affiché sur le tableau de bord
+        agregat (str): Type d'agrégat (SOMME, MOYENNE, COMPTE, COMPTE_DISTINCT, RATIO)
+        colonne (ColumnElement): Colonne agrégée
+        periode (str): Période de calcul (MOIS, ANNEE)
+        diviseur (ColumnElement | None): Colonne sommée au dénominateur (RATIO uniquement)
+    """
+
+    def __init__(self, cle: str, libelle: str, agregat: str, colonne: ColumnElement[Any],
+                 periode: str = ANNEE, diviseur: ColumnElement[Any] | None = None) -> None:
+        if agregat not in AGREGATS:
+            raise ValueError(f"Agrégat inconnu pour l'indicateur {cle} : {agregat}")
+        if periode not in PERIODES:
+            raise ValueError(f"Période inconnue pour l'indicateur {cle} : {periode}")
+        if (agregat == RATIO) != (diviseur is not None):
+            raise ValueError(f"Un diviseur est requis pour (et réservé à) l'agrégat ratio : {cle}")
+        self.cle = cle
+        self.libelle = libelle
+        self.agregat = agregat
+        self.colonne = colonne
+        self.periode = periode
+        self.diviseur = diviseur
+
+    def expression(self, condition: ColumnElement[bool]) -> ColumnElement[Any]:
+        """
+        Construit l'expression d'agrégation conditionnelle de l'indicateur.
+
+        Les lignes hors période produisent NULL dans le CASE et sont ignorées
+        par les fonctions d'agrégation.
+
+        Args:
+            condition (ColumnElement[bool]): Condition d'appartenance à la période
+
+        Returns:
+            ColumnElement[Any]: Expression SQL labellisée avec la clé de l'indicateur
+        """
+        valeur = case((condition, self.colonne))
+        if self.agregat == SOMME:
+            expression = func.sum(valeur)
+        elif self.agregat == MOYENNE:
+            expression = func.avg(valeur)
+        elif self.agregat == COMPTE:
+            expression = func.count(valeur)
+        elif self.agregat == COMPTE_DISTINCT:
+            expression = func.count(func.distinct(valeur))
+        else:
+            expression = func.sum(valeur) / func.nullif(func.sum(case((condition, self.diviseur))), 0)
+        return expression.label(self.cle)
+
+    def __repr__(self) -> str:
+        return f"<Indicateur(cle='{self.cle}', agregat='{self.agregat}', periode='{self.periode}')>"
+
+# Indicateurs affichés sur le tableau de bord (l'ordre est celui de l'affichage)
+INDICATEURS_COMMERCIAUX: Tuple[Indicateur, ...] = (
+    Indicateur('ca_current_month', 'CA Mensuel', SOMME, VentesJournalieres.montant_total, MOIS),
+    Indicateur('ca_current_year', 'CA Annuel', SOMME, VentesJournalieres.montant_total, ANNEE),
+    Indicateur('average_basket', 'Panier Moyen', RATIO, VentesJournalieres.montant_total, ANNEE,
+               diviseur=VentesJournalieres.nb_commandes),
+    Indicateur('active_clients', 'Clients Actifs', COMPTE_DISTINCT, VentesJournalieres.id_client, ANNEE),
+    Indicateur('orders_per_year', 'Commandes Annuelles', SOMME, VentesJournalieres.nb_commandes, ANNEE),
+)
+
+# ====================================================================
+# MOTEUR DE CALCUL
+# ====================================================================
+
+def debuts_periodes(reference: date) -> Dict[str, date]:
+    """
+    Calcule la date de début de chaque période par rapport à une date de référence.
+
+    Args:
+        reference (date): Date de référence (en général la date du jour)
+
+    Returns:
+        Dict[str, date]: Date de début par période
+    """
+    return {
+        MOIS: reference.replace(day=1),
+        ANNEE: reference.replace(month=1, day=1),
+    }
+
+class MoteurIndicateurs:
+    """
+    Moteur de calcul des indicateurs en une seule requête d'agrégation.
+
+    La requête ne parcourt que les lignes postérieures au début de la période
+    la plus ancienne ; chaque indicateur filtre ensuite sa propre période via
+    une expression CASE.
+
+    Attributes:
+        indicateurs (Tuple[Indicateur, ...]): Indicateurs à calculer
+        colonne_date (ColumnElement): Colonne de date servant au découpage en périodes
+        filtres (Tuple[ColumnElement[bool], ...]): Filtres communs à tous les indicateurs
+    """
+
+    def __init__(self, indicateurs: Tuple[Indicateur, ...] = INDICATEURS_COMMERCIAUX,
+                 colonne_date: ColumnElement[Any] = VentesJournalieres.jour,
+                 filtres: Tuple[ColumnElement[bool], ...] = ()) -> None:
+        self.indicateurs = indicateurs
+        self.colonne_date = colonne_date
+        self.filtres = filtres
+
+    def construire_requete(self, reference: date) -> Select[Any]:
+        """
+        Construit la requête unique de calcul des indicateurs.
+
+        Args:
+            reference (date): Date de référence pour le calcul des périodes
+
+        Returns:
+            Select[Any]: Requête SELECT produisant une ligne, une colonne par indicateur
+        """
+        debuts = debuts_periodes(reference)
+        debut_min = min(debuts[indicateur.periode] for indicateur in self.indicateurs)
+        return (
+            select(*[
+                indicateur.expression(self.colonne_date >= debuts[indicateur.periode])
+                for indicateur in self.indicateurs
+            ])
+            .where(and_(self.colonne_date >= debut_min, *self.filtres))
+        )
+
+    def calculer(self, db_session: SessionBdDType, reference: date | None = None) -> Dict[str, List[Any]]:
+        """
+        Exécute la requête et met en forme les indicateurs pour le tableau de bord.
+
+        Args:
+            db_session (SessionBdDType): Session de base de données
+            reference (date | None): Date de référence (date du jour par défaut)
+
+        Returns:
+            Dict[str, List[Any]]: {cle: [valeur, libelle]} dans l'ordre de déclaration
+        """
+        if not self.indicateurs:
+            return {}
+        ligne = db_session.execute(self.construire_requete(reference or date.today())).mappings().one()
+        return {
+            indicateur.cle: [ligne[indicateur.cle] or 0, indicateur.libelle]
+            for indicateur in self.indicateurs
+        }
+
+# Instance partagée par le tableau de bord
+moteur_indicateurs = MoteurIndicateurs()
+
+# ====================================================================
+# MAINTENANCE DU CUMUL JOURNALIER DES VENTES
+# ====================================================================
+
+# Commandes prises en compte dans le cumul : facturées et non annulées
+FILTRE_VENTES: Tuple[ColumnElement[bool], ...] = (Commande.is_facture == True, Commande.is_annulee == False)
+
+def cle_ventes(commande: Commande) -> Tuple[date, int]:
+    """
+    Retourne la clé de cumul (jour, client) d'une commande.
+
+    À appeler avant toute modification de la commande pour conserver la clé
+    d'origine lorsque la date ou le client changent.
+    """
+    return (commande.date_commande, commande.id_client)
+
+def _requete_cumul(*filtres: ColumnElement[bool]) -> Select[Any]:
+    """Construit l'agrégation (jour, client) des commandes facturées non annulées."""
+    return (
+        select(Commande.date_commande, Commande.id_client,
+               func.count(Commande.id), func.sum(Commande.montant))
+        .where(*FILTRE_VENTES, *filtres)
+        .group_by(Commande.date_commande, Commande.id_client)
+    )
+
+def _colonnes_cumul() -> List[Any]:
+    """Colonnes de la table de cumul alimentées par _requete_cumul."""
+    return [VentesJournalieres.jour, VentesJournalieres.id_client,
+            VentesJournalieres.nb_commandes, VentesJournalieres.montant_total]
+
+def rafraichir_ventes_journalieres(db_session: SessionBdDType, cles: Iterable[Tuple[date | None, int | None]]) -> None:
+    """
+    Recalcule les lignes de cumul des couples (jour, client) donnés.
+
+    Le recalcul se fait dans la transaction de l'appelant (DELETE puis INSERT ... SELECT
+    restreints aux clés touchées) : il est idempotent et reste cohérent quelle que soit
+    la mutation (facturation, modification du montant, de la date, annulation).
+
+    Args:
+        db_session (SessionBdDType): Session de la transaction en cours (non commitée)
+        cles (Iterable[Tuple[date, int]]): Clés (jour, client) à recalculer
+    """
+    cles_valides: Set[Tuple[date, int]] = {(jour, id_client) for jour, id_client in cles
+                                           if jour is not None and id_client is not None}
+    if not cles_valides:
+        return
+
+    # La session n'a pas d'autoflush : les modifications en attente doivent être visibles
+    db_session.flush()
+
+    liste_cles = sorted(cles_valides)
+    db_session.execute(
+        delete(VentesJournalieres)
+        .where(tuple_(VentesJournalieres.jour, VentesJournalieres.id_client).in_(liste_cles))
+    )
+    db_session.execute(
+        insert(VentesJournalieres).from_select(
+            _colonnes_cumul(),
+            _requete_cumul(tuple_(Commande.date_commande, Commande.id_client).in_(liste_cles))
+        )
+    )
+
+def reconstruire_ventes_journalieres(db_session: SessionBdDType, depuis: date | None = None) -> int:
+    """
+    Reconstruit la table de cumul depuis l'historique des commandes (backfill).
+
+    Args:
+        db_session (SessionBdDType): Session de base de données (commit à la charge de l'appelant)
+        depuis (date | None): Première date reconstruite (tout l'historique par défaut)
+
+    Returns:
+        int: Nombre de lignes de cumul écrites
+    """
+    suppression = delete(VentesJournalieres)
+    filtres: Tuple[ColumnElement[bool], ...] = ()
+    if depuis is not None:
+        suppression = suppression.where(VentesJournalieres.jour >= depuis)
+        filtres = (Commande.date_commande >= depuis,)
+
+    db_session.execute(suppression)
+    resultat = db_session.execute(insert(VentesJournalieres).from_select(_colonnes_cumul(), _requete_cumul(*filtres)))
+    return resultat.rowcount
+
+# ====================================================================
+# POINT D'ENTRÉE - RECONSTRUCTION DU CUMUL
+# ====================================================================
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Maintenance du cumul journalier des ventes ACFC")
+    parser.add_argument('--reconstruire', action='store_true',
+                        help="Reconstruire la table 14_ventes_journalieres depuis les commandes")
+    parser.add_argument('--depuis', type=lambda valeur: datetime.strptime(valeur, '%Y-%m-%d').date(),
+                        default=None, help="Première date à reconstruire (AAAA-MM-JJ)")
+    args = parser.parse_args()
+
+    if not args.reconstruire:
+        parser.print_help()
+    else:
+        db_session: SessionBdDType = SessionBdD()
+        try:
+            nb_lignes = reconstruire_ventes_journalieres(db_session, args.depuis)
+            db_session.commit()
+            print(f"Cumul journalier reconstruit : {nb_lignes} ligne(s)")
+        except Exception:
+            db_session.rollback()
+            raise
+        finally:
+            db_session.close()
@@ -0,0 +1,151 @@
+"""
+ACFC - Mise à Jour Différentielle des Lignes de Commande
+========================================================
+
+Calcule et applique la différence entre les lignes existantes d'une commande
+(12_devises_factures) et les lignes issues du formulaire de modification.
+
+Seules les lignes réellement modifiées sont écrites :
+- insertion des produits ajoutés (un seul INSERT multi-lignes)
+- mise à jour des lignes dont la quantité, le prix, la remise ou la désignation
+  a changé (UPDATE par clé primaire, exécuté en lot)
+- suppression des produits retirés (un seul DELETE ... WHERE id IN)
+
+Les lignes inchangées conservent leur identifiant, leurs colonnes calculées
+et leur rattachement à une facture (id_facture). Une ligne déjà facturée ne
+peut être ni modifiée ni supprimée.
+
+Les lignes sont appariées par référence produit (ref_auto du catalogue). Les
+lignes existantes dont la référence n'est plus au catalogue ne sont pas
+proposées par le formulaire : elles sont conservées telles quelles et ne sont
+jamais supprimées implicitement.
+
+Auteur : ACFC Development Team
+Version : 1.0
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, List, Mapping, Sequence, Set
+from sqlalchemy import insert, update, delete
+from sqlalchemy.orm import Session as SessionBdDType
+from app_acfc.modeles import DevisesFactures
+from app_acfc.montants import en_decimal, PRECISION_LIGNE
+
+# ====================================================================
+# CONSTANTES
+# ====================================================================
+
+# Colonnes d'une ligne comparées pour détecter une modification
+CHAMPS_COMPARES = ('designation', 'qte', 'prix_unitaire', 'remise')
+
+class LignesFactureesError(ValueError):
+    """Modification ou suppression demandée sur une ligne déjà rattachée à une facture."""
+
+# ====================================================================
+# CALCUL DE LA DIFFÉRENCE
+# ====================================================================
+
+@dataclass
+class DiffLignes:
+    """
+    Écritures nécessaires pour passer des lignes existantes aux lignes souhaitées.
+
+    Attributes:
+        insertions: Valeurs des lignes à créer
+        mises_a_jour: Valeurs modifiées des lignes existantes (avec leur 'id')
+        suppressions: Identifiants des lignes à supprimer
+        inchangees: Nombre de lignes conservées telles quelles
+        conservees: Lignes hors catalogue, absentes du formulaire et conservées
+    """
+    insertions: List[Dict[str, Any]] = field(default_factory=list)
+    mises_a_jour: List[Dict[str, Any]] = field(default_factory=list)
+    suppressions: List[int] = field(default_factory=list)
+    inchangees: int = 0
+    conservees: List[Any] = field(default_factory=list)
+
+    @property
+    def est_vide(self) -> bool:
+        """Vrai si aucune écriture n'est nécessaire."""
+        return not (self.insertions or self.mises_a_jour or self.suppressions)
+
+def _normaliser(champ: str, valeur: Any) -> Any:
+    """Valeur comparable d'un champ : les montants sont arrondis à la précision de la colonne."""
+    if champ in ('prix_unitaire', 'remise'):
+        return en_decimal(valeur, PRECISION_LIGNE)
+    if champ == 'qte':
+        return int(valeur)
+    return valeur
+
+def references_hors_catalogue(existantes: Sequence[Any], references_catalogue: Collection[str]) -> Set[str]:
+    """Références des lignes existantes qui ne correspondent à aucun produit du catalogue (ref_auto)."""
+    return {ligne.reference for ligne in existantes if ligne.reference not in references_catalogue}
+
+def calculer_diff(existantes: Sequence[Any], souhaitees: Sequence[Mapping[str, Any]],
+                  hors_catalogue: Collection[str] = ()) -> DiffLignes:
+    """
+    Compare les lignes existantes d'une commande aux lignes souhaitées.
+
+    Args:
+        existantes (Sequence[Any]): Lignes DevisesFactures actuelles de la commande
+        souhaitees (Sequence[Mapping[str, Any]]): Lignes issues du formulaire (voir construire_lignes_commande)
+        hors_catalogue (Collection[str]): Références absentes du formulaire (voir references_hors_catalogue) :
+            leurs lignes non souhaitées sont conservées au lieu d'être supprimées
+
+    Returns:
+        DiffLignes: Insertions, mises à jour et suppressions à appliquer
+
+    Raises:
+        LignesFactureesError: Si une ligne rattachée à une facture devrait être modifiée ou supprimée
+    """
+    diff = DiffLignes()
+    par_reference: Dict[str, Any] = {}
+    for ligne in existantes:
+        if ligne.reference in par_reference:
+            diff.suppressions.append(ligne.id)  # Doublon hérité : une seule ligne par produit
+        else:
+            par_reference[ligne.reference] = ligne
+
+    for valeurs in souhaitees:
+        ligne = par_reference.pop(valeurs['reference'], None)
+        if ligne is None:
+            diff.insertions.append(dict(valeurs))
+            continue
+        modifications = {champ: valeurs[champ] for champ in CHAMPS_COMPARES
+                         if _normaliser(champ, getattr(ligne, champ)) != _normaliser(champ, valeurs[champ])}
+        if not modifications:
+            diff.inchangees += 1
+        else:
+            diff.mises_a_jour.append({'id': ligne.id, **modifications})
+
+    for reference, ligne in par_reference.items():
+        if reference in hors_catalogue:
+            diff.conservees.append(ligne)
+            diff.inchangees += 1
+        else:
+            diff.suppressions.append(ligne.id)
+
+    # Les lignes facturées sont figées
+    facturees = {ligne.id for ligne in existantes if ligne.id_facture is not None}
+    touchees = facturees & ({m['id'] for m in diff.mises_a_jour} | set(diff.suppressions))
+    if touchees:
+        raise LignesFactureesError(f"Lignes déjà facturées non modifiables : {sorted(touchees)}")
+    return diff
+
+# ====================================================================
+# APPLICATION DE LA DIFFÉRENCE
+# ====================================================================
+
+def appliquer_diff(db_session: SessionBdDType, diff: DiffLignes) -> None:
+    """
+    Applique la différence dans la transaction courante (au plus un ordre SQL par type d'écriture).
+
+    Args:
+        db_session (SessionBdDType): Session de base de données (commit à la charge de l'appelant)
+        diff (DiffLignes): Différence calculée par calculer_diff()
+    """
+    if diff.suppressions:
+        db_session.execute(delete(DevisesFactures).where(DevisesFactures.id.in_(diff.suppressions)))
+    if diff.mises_a_jour:
+        db_session.execute(update(DevisesFactures), diff.mises_a_jour)
+    if diff.insertions:
+        db_session.execute(insert(DevisesFactures), diff.insertions)
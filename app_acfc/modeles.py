@@ -1,9 +1,11 @@
-from sqlalchemy import Integer, String, Date, DateTime, Boolean, Text, Numeric, event, Computed, LargeBinary, ForeignKey
-from sqlalchemy.sql import func
+from sqlalchemy import Integer, String, Date, DateTime, Boolean, Text, Numeric, event, Computed, LargeBinary, ForeignKey, Index
+from sqlalchemy.sql import func, select, update, case
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Mapper, relationship, mapped_column
-from typing import Any, Dict
-from sqlalchemy.engine import Connection
+from sqlalchemy.orm import sessionmaker, relationship, mapped_column, column_property, selectinload, undefer_group
+from sqlalchemy.orm import Session as SessionBdDType
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Any, Dict, Tuple
+from datetime import date
 from sqlalchemy import create_engine
 from sqlalchemy.engine.url import URL
 from dotenv import load_dotenv
@@ -308,27 +310,34 @@ class Client(Base):
             return self.pro.raison_sociale
         return ""
     
+    @classmethod
+    def options_to_dict(cls) -> Tuple[Any, ...]:
+        """
+        Options de chargement pour sérialiser une liste de clients avec to_dict().
+
+        Particuliers et professionnels sont chargés par lots (selectinload) et l'adresse
+        principale est lue par sous-requête corrélée dans la requête des clients : le nombre
+        de requêtes ne dépend pas du nombre de clients.
+        """
+        return (selectinload(cls.part), selectinload(cls.pro), undefer_group('adresse_principale'))
+
     def to_dict(self) -> Dict[str, Any]:
         """
         Convertit l'objet Client en dictionnaire pour les API JSON.
         
+        Pour une liste de clients, charger avec Client.options_to_dict() afin d'éviter
+        une requête par client (nom et adresse principale).
+        
         Returns:
             Dict[str, Any]: Dictionnaire contenant les données du client avec informations d'adresse
         """
-        # Récupération de l'adresse principale (première active trouvée)
-        adresse_principale = None
-        for adresse in self.adresses:
-            if adresse.is_active:
-                adresse_principale = adresse
-                break
-        
         return {
             'id': self.id,
             'nom_affichage': self.nom_affichage,
             'type_client': self.type_client,
             'type_client_libelle': 'Particulier' if self.type_client == 1 else 'Professionnel',
-            'code_postal': adresse_principale.code_postal if adresse_principale else '',
-            'ville': adresse_principale.ville if adresse_principale else '',
+            'code_postal': self.code_postal_principal or '',
+            'ville': self.ville_principale or '',
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
@@ -422,6 +431,9 @@ class Mail(Base):
         - Gestion des bounces et désinscriptions
     """
     __tablename__ = '02_mail'
+    __table_args__ = (
+        Index('ix_mail_mail', 'mail'),                                  # Recherche par email
+    )
 
     # === IDENTIFIANT ET LIAISON CLIENT ===
     id = mapped_column(Integer, primary_key=True, autoincrement=True, comment="Identifiant unique de l'email")
@@ -460,6 +472,9 @@ class Telephone(Base):
         - Validation format selon pays
     """
     __tablename__ = '03_telephone'
+    __table_args__ = (
+        Index('ix_telephone_telephone', 'telephone'),                   # Recherche par numéro
+    )
 
     # === IDENTIFIANT ET LIAISON CLIENT ===
     id = mapped_column(Integer, primary_key=True, autoincrement=True, comment="Identifiant unique du téléphone")
@@ -483,6 +498,10 @@ class Telephone(Base):
 class Adresse(Base):
     '''Représente une adresse associée à un client.'''
     __tablename__ = '04_adresse'
+    __table_args__ = (
+        Index('ix_adresse_client_actif', 'id_client', 'is_active'),     # Adresses actives d'un client
+        Index('ix_adresse_code_postal', 'code_postal'),                 # Recherche par code postal
+    )
 
     # === IDENTIFIANT ET LIAISON CLIENT ===
     id = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -501,6 +520,51 @@ class Adresse(Base):
     created_at = mapped_column(Date, default=func.now(), nullable=False)
     is_active = mapped_column(Boolean, default=True, nullable=False)
 
+def _adresse_principale(colonne: Any) -> Any:
+    """Sous-requête corrélée : colonne de l'adresse principale (première active, principale en priorité)."""
+    return (
+        select(colonne)
+        .where(Adresse.id_client == Client.id, Adresse.is_active == True)
+        .order_by(Adresse.is_principal.desc(), Adresse.id)
+        .limit(1)
+        .correlate_except(Adresse)
+        .scalar_subquery()
+    )
+
+# Adresse principale du client, chargée à la demande (groupe 'adresse_principale', voir Client.options_to_dict)
+Client.code_postal_principal = column_property(_adresse_principale(Adresse.code_postal),
+                                               deferred=True, group='adresse_principale')
+Client.ville_principale = column_property(_adresse_principale(Adresse.ville),
+                                          deferred=True, group='adresse_principale')
+
+class IndexRecherche(Base):
+    """
+    Index n-grammes (trigrammes) des champs de recherche des clients.
+
+    Chaque valeur recherchable (nom du particulier, raison sociale, emails,
+    téléphones, adresses actives) est normalisée puis découpée en trigrammes.
+    Une recherche « contient » devient une recherche par égalité sur la clé
+    primaire, indépendante de la taille de la base clients.
+
+    Table maintenue automatiquement à chaque écriture d'un client ou d'un contact
+    (voir app_acfc/recherche.py) et reconstructible :
+    python -m app_acfc.recherche --reconstruire
+    """
+    __tablename__ = '05_index_recherche'
+    __table_args__ = (
+        Index('ix_recherche_client', 'id_client'),                      # Réindexation d'un client
+    )
+
+    # === CLÉ DE L'INDEX ===
+    trigramme = mapped_column(String(3, collation='utf8mb4_bin'), primary_key=True,
+                              comment="Trigramme normalisé (minuscules, sans accents)")
+    source = mapped_column(String(10), primary_key=True,
+                           comment="Champ d'origine : part/pro/mail/telephone/adresse")
+    id_client = mapped_column(Integer, ForeignKey(PK_CLIENTS), primary_key=True, comment="Client indexé")
+
+    def __repr__(self) -> str:
+        return f"<IndexRecherche(trigramme='{self.trigramme}', source='{self.source}', client_id={self.id_client})>"
+
 # ====================================================================
 # MODÈLES DE DONNÉES - MODULE GESTION DES COMMANDES ET FACTURATION
 # ====================================================================
@@ -508,6 +572,12 @@ class Adresse(Base):
 class Commande(Base):
     '''Représente une commande dans le système.'''
     __tablename__ = '11_commandes'
+    __table_args__ = (
+        # Index composites des filtres d'état et de période (base existante : python -m app_acfc.index_bdd --appliquer)
+        Index('ix_commandes_client_date', 'id_client', 'date_commande'),                         # Commandes d'un client
+        Index('ix_commandes_facture_date', 'is_facture', 'is_annulee', 'date_commande'),         # Ventes facturées par période
+        Index('ix_commandes_en_cours', 'is_annulee', 'is_expedie', 'is_facture', 'date_commande'), # Commandes en cours
+    )
 
     # === IDENTIFIANT ET LIAISON CLIENT ===
     id = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -534,6 +604,9 @@ class Commande(Base):
 class DevisesFactures(Base):
     '''Représente les éléments des commandes et des factures dans le système.'''
     __tablename__ = '12_devises_factures'
+    __table_args__ = (
+        Index('ix_devises_facture', 'id_facture'),                      # Lignes d'une facture (pas de clé étrangère)
+    )
 
     # === IDENTIFIANT ET LIAISON ===
     id = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -555,10 +628,14 @@ class DevisesFactures(Base):
 class Facture(Base):
     '''Représente une facture dans le système.'''
     __tablename__ = '13_factures'
+    __table_args__ = (
+        Index('ix_factures_client_date', 'id_client', 'date_facturation'),  # Factures d'un client
+        Index('ix_factures_date', 'date_facturation'),                      # Factures par période
+    )
 
     # === IDENTIFIANT ET LIAISON ===
     id = mapped_column(Integer, primary_key=True, autoincrement=True)
-    id_fiscal = mapped_column(String(13), unique=True)
+    id_fiscal = mapped_column(String(16), unique=True)  # YYYY-MM-XXXXXX-C
     id_client = mapped_column(Integer, ForeignKey(PK_CLIENTS), nullable=False)
     client = relationship("Client", back_populates="factures")
     id_commande = mapped_column(Integer, ForeignKey(PK_COMMANDE), nullable=False)
@@ -580,16 +657,22 @@ class Facture(Base):
     # --- Méthodes de la classe Facture
     def generate_fiscal_id(self) -> str:
         """
-        Génère un identifiant fiscal au format YYYY-MM-DD-XXXXXX-C.
+        Génère un identifiant fiscal au format YYYY-MM-XXXXXX-C.
         """
-        year = self.date_facturation.year
-        month = f'{str(self.date_facturation.month).zfill(2)}'
-        id_str = f'{str(self.id).zfill(6)}'
+        return Facture.format_id_fiscal(self.id, self.date_facturation)
+
+    @staticmethod
+    def format_id_fiscal(id_facture: int, date_facturation: date) -> str:
+        """Identifiant fiscal YYYY-MM-XXXXXX-C d'une facture (C : clé EAN-13 des 12 chiffres)."""
+        year = date_facturation.year
+        month = f'{str(date_facturation.month).zfill(2)}'
+        id_str = f'{str(id_facture).zfill(6)}'
         base_code = f'{year}{month}{id_str}'
-        cle = self.cle_ean13(base_code)
+        cle = Facture.cle_ean13(base_code)
         return f'{year}-{month}-{id_str}-{cle}'
-    
-    def cle_ean13(self, base_code: str) -> str:
+
+    @staticmethod
+    def cle_ean13(base_code: str) -> str:
         """Calcule la clé EAN-13 à partir du code de base de 12 chiffres."""
         # Calcul de la clé EAN-13
         digits = [int(d) for d in base_code if d.isdigit()]
@@ -600,23 +683,62 @@ class Facture(Base):
         total = sum(d if i % 2 == 0 else d * 3 for i, d in enumerate(digits))
         return str((10 - (total % 10)) % 10)
 
-    @staticmethod
-    def set_id_fiscal_after_insert(mapper: Mapper[Any], connection: Connection, target: 'Facture') -> None:
-        """Handler after_insert: calcule l'id_fiscal et le persiste via la connexion fournie.
+def attribuer_ids_fiscaux(db_session: SessionBdDType, _flush_context: Any) -> None:
+    """
+    Écouteur after_flush : attribue l'id_fiscal des factures insérées par le flush.
 
-        On passe par une mise à jour SQL pour éviter d'appeler session.commit() depuis un event listener.
-        """
-        if not getattr(target, 'id_fiscal', None):
-            new_id = target.generate_fiscal_id()
-            # Mettre à jour la colonne en base
-            connection.execute(
-                Facture.__table__.update().where(Facture.id == target.id).values(id_fiscal=new_id)
-            )
-            # Mettre à jour l'instance en mémoire
-            target.id_fiscal = new_id
+    L'identifiant dépend de la clé primaire attribuée par la base : il est calculé après
+    l'insertion, puis écrit pour toutes les factures du flush en un seul
+    UPDATE ... SET id_fiscal = CASE id ... END WHERE id IN (...).
+    """
+    factures = [objet for objet in db_session.new
+                if isinstance(objet, Facture) and not objet.__dict__.get('id_fiscal')]
+    if not factures:
+        return
+
+    # Lecture directe de l'état ; date laissée au défaut de la base : relue en une requête
+    dates: Dict[int, Any] = {facture.id: facture.__dict__.get('date_facturation') for facture in factures}
+    a_relire = [id_facture for id_facture, jour in dates.items() if not isinstance(jour, date)]
+    if a_relire:
+        dates.update(db_session.execute(
+            select(Facture.id, Facture.date_facturation).where(Facture.id.in_(a_relire))
+        ).tuples())
+
+    ids_fiscaux = {id_facture: Facture.format_id_fiscal(id_facture, jour) for id_facture, jour in dates.items()}
+    db_session.execute(
+        update(Facture.__table__)
+        .where(Facture.__table__.c.id.in_(ids_fiscaux))
+        .values(id_fiscal=case(ids_fiscaux, value=Facture.__table__.c.id))
+    )
+    # Valeurs déjà en base : mises à jour en mémoire sans nouvelle écriture
+    for facture in factures:
+        set_committed_value(facture, 'id_fiscal', ids_fiscaux[facture.id])
+
+event.listen(SessionBdD, 'after_flush', attribuer_ids_fiscaux)
+
+class VentesJournalieres(Base):
+    """
+    Cumul journalier des ventes facturées par client (daily sales rollup).
+
+    Table de synthèse maintenue à chaque facturation, modification ou annulation
+    de commande. Elle alimente les indicateurs du tableau de bord et les rapports
+    mensuels/annuels sans reparcourir l'historique des commandes.
+
+    Une ligne par couple (jour, client) : les sommes sont additives et le nombre
+    de clients distincts reste exact sur n'importe quelle période.
+    """
+    __tablename__ = '14_ventes_journalieres'
 
-# Enregistrement de l'écouteur qui délègue la logique à la méthode de la classe
-event.listen(Facture, 'after_insert', Facture.set_id_fiscal_after_insert)
+    # === CLÉ DE CUMUL ===
+    jour = mapped_column(Date, primary_key=True, comment="Date de commande cumulée")
+    id_client = mapped_column(Integer, ForeignKey(PK_CLIENTS), primary_key=True, comment="Client ayant commandé ce jour")
+
+    # === CUMULS ===
+    nb_commandes = mapped_column(Integer, nullable=False, default=0, comment="Nombre de commandes facturées non annulées")
+    montant_total = mapped_column(Numeric(12, 2), nullable=False, default=0.00, comment="Somme des montants des commandes")
+
+    def __repr__(self) -> str:
+        return f"<VentesJournalieres(jour={self.jour}, client_id={self.id_client}, montant={self.montant_total})>"
 
 # ====================================================================
 # MODÈLES DE DONNÉES - MODULE GESTION DES PRODUITS
@@ -0,0 +1,174 @@
+"""
+ACFC - Calcul Exact des Montants
+================================
+
+Module de calcul des montants des lignes et des commandes en décimal exact
+(decimal.Decimal), avec les mêmes règles d'arrondi que la base de données :
+
+- Lignes (12_devises_factures) : prix_total = qte * prix_unitaire * (1 - remise),
+  colonne générée DECIMAL(10,4), arrondie au plus proche (demi vers le haut)
+- Commandes (11_commandes) : montant = somme des prix_total, DECIMAL(10,2)
+
+Les montants calculés par l'application sont ainsi identiques à ceux recalculés
+par la base à partir des lignes. Le rapprochement vérifie cette égalité :
+```bash
+python -m app_acfc.montants --verifier            # Liste les commandes en écart
+python -m app_acfc.montants --verifier --corriger # Aligne montant sur les lignes (un seul UPDATE)
+```
+
+La correction recalcule aussi les cumuls de ventes journaliers (14_ventes_journalieres)
+des commandes corrigées. Le cache du tableau de bord n'est invalidé que s'il est
+partagé (CACHE_BACKEND=redis) : avec le cache mémoire, propre à chaque processus
+de l'application, la commande n'y a pas accès et les fragments corrigés
+apparaissent à l'expiration de leurs entrées (CACHE_TTL, 300 s par défaut).
+
+Auteur : ACFC Development Team
+Version : 1.0
+"""
+
+from argparse import ArgumentParser
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+from sqlalchemy import Select, select, update
+from sqlalchemy.orm import Session as SessionBdDType
+from sqlalchemy.sql.functions import func
+from app_acfc.modeles import SessionBdD, Commande, DevisesFactures
+from app_acfc.indicateurs import rafraichir_ventes_journalieres
+from app_acfc.cache import cache_acfc, invalider_cache_commandes, CacheRedis
+
+# ====================================================================
+# CONSTANTES
+# ====================================================================
+
+PRECISION_LIGNE = Decimal('0.0001')     # DECIMAL(10,4) : prix_unitaire, remise, prix_total
+PRECISION_MONTANT = Decimal('0.01')     # DECIMAL(10,2) : montant des commandes
+ZERO = Decimal('0')
+UN = Decimal('1')
+
+# ====================================================================
+# CONVERSIONS ET ARRONDIS
+# ====================================================================
+
+def en_decimal(valeur: Any, precision: Decimal | None = None) -> Decimal:
+    """
+    Convertit une valeur (saisie du formulaire, float, int, Decimal) en Decimal exact.
+
+    Les float sont convertis par leur représentation décimale (str) et non par leur
+    valeur binaire : 0.1 devient Decimal('0.1').
+
+    Args:
+        valeur (Any): Valeur à convertir (None ou chaîne vide : zéro)
+        precision (Decimal | None): Précision d'arrondi (ex: PRECISION_LIGNE), aucun arrondi si None
+
+    Raises:
+        ValueError: Si la valeur n'est pas un nombre
+    """
+    if valeur is None or valeur == '':
+        resultat = ZERO
+    else:
+        try:
+            resultat = valeur if isinstance(valeur, Decimal) else Decimal(str(valeur).strip().replace(',', '.'))
+        except InvalidOperation:
+            raise ValueError(f"Montant invalide : {valeur!r}")
+        if not resultat.is_finite():
+            raise ValueError(f"Montant invalide : {valeur!r}")
+    return resultat.quantize(precision, rounding=ROUND_HALF_UP) if precision is not None else resultat
+
+def total_ligne(qte: Any, prix_unitaire: Any, remise: Any = ZERO) -> Decimal:
+    """Total d'une ligne, tel que calculé par la colonne générée prix_total."""
+    brut = (Decimal(int(qte)) * en_decimal(prix_unitaire, PRECISION_LIGNE)
+            * (UN - en_decimal(remise, PRECISION_LIGNE)))
+    return brut.quantize(PRECISION_LIGNE, rounding=ROUND_HALF_UP)
+
+def totaux_commande(lignes: Iterable[Mapping[str, Any]]) -> Tuple[List[Decimal], Decimal]:
+    """
+    Calcule en un seul parcours le total de chaque ligne et le montant de la commande.
+
+    Args:
+        lignes (Iterable[Mapping[str, Any]]): Lignes portant qte, prix_unitaire et remise
+
+    Returns:
+        Tuple[List[Decimal], Decimal]: Totaux des lignes (4 décimales) et montant de la commande (2 décimales)
+    """
+    totaux = [total_ligne(ligne['qte'], ligne['prix_unitaire'], ligne.get('remise', ZERO)) for ligne in lignes]
+    return totaux, sum(totaux, ZERO).quantize(PRECISION_MONTANT, rounding=ROUND_HALF_UP)
+
+# ====================================================================
+# RAPPROCHEMENT AVEC LA BASE
+# ====================================================================
+
+def _montant_lignes(id_commande: Any) -> Select[Any]:
+    """Montant recalculé par la base depuis les prix_total des lignes d'une commande."""
+    return (select(func.coalesce(func.round(func.sum(DevisesFactures.prix_total), 2), 0))
+            .where(DevisesFactures.id_commande == id_commande))
+
+def montant_lignes_commande(db_session: SessionBdDType, id_commande: int) -> Decimal:
+    """Montant d'une commande recalculé par la base depuis les prix_total de ses lignes."""
+    return en_decimal(db_session.scalar(_montant_lignes(id_commande)), PRECISION_MONTANT)
+
+def ecarts_montants(db_session: SessionBdDType) -> Dict[int, Tuple[Decimal, Decimal]]:
+    """
+    Commandes dont le montant enregistré diffère de la somme des prix_total de leurs lignes.
+
+    Returns:
+        Dict[int, Tuple[Decimal, Decimal]]: id_commande -> (montant enregistré, montant des lignes)
+    """
+    montant_lignes = _montant_lignes(Commande.id).scalar_subquery()
+    lignes = db_session.execute(
+        select(Commande.id, Commande.montant, montant_lignes).where(Commande.montant != montant_lignes)
+    ).all()
+    return {id_commande: (montant, calcule) for id_commande, montant, calcule in lignes}
+
+def corriger_montants(db_session: SessionBdDType) -> int:
+    """
+    Aligne le montant des commandes en écart sur leurs lignes en un seul UPDATE.
+
+    Les cumuls de ventes des couples (jour, client) des commandes corrigées sont
+    recalculés dans la même transaction.
+
+    Returns:
+        int: Nombre de commandes corrigées (commit et invalidation du cache à la charge de l'appelant)
+    """
+    montant_lignes = _montant_lignes(Commande.id).scalar_subquery()
+    en_ecart = Commande.montant != montant_lignes
+    cles_ventes = db_session.execute(
+        select(Commande.date_commande, Commande.id_client).where(en_ecart).distinct().with_for_update()
+    ).all()
+    if not cles_ventes:
+        return 0
+    resultat = db_session.execute(
+        update(Commande).where(en_ecart).values(montant=montant_lignes)
+        .execution_options(synchronize_session=False)
+    )
+    rafraichir_ventes_journalieres(db_session, cles_ventes)
+    return resultat.rowcount
+
+# ====================================================================
+# POINT D'ENTRÉE EN LIGNE DE COMMANDE
+# ====================================================================
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Rapprochement des montants des commandes ACFC avec leurs lignes")
+    parser.add_argument('--verifier', action='store_true', help="Lister les commandes dont le montant diffère des lignes")
+    parser.add_argument('--corriger', action='store_true', help="Aligner le montant des commandes en écart")
+    args = parser.parse_args()
+
+    if not args.verifier:
+        parser.print_help()
+        raise SystemExit(0)
+
+    db_session: SessionBdDType = SessionBdD()
+    try:
+        ecarts = ecarts_montants(db_session)
+        for id_commande, (montant, calcule) in ecarts.items():
+            print(f"Commande {id_commande} : montant {montant} / lignes {calcule}")
+        if ecarts and args.corriger:
+            print(f"{corriger_montants(db_session)} commande(s) corrigée(s)")
+            db_session.commit()
+            if isinstance(cache_acfc.backend, CacheRedis):
+                invalider_cache_commandes()
+            else:
+                print(f"Cache non partagé : tableau de bord à jour sous {cache_acfc.ttl_defaut} s (CACHE_TTL)")
+    finally:
+        db_session.close()
+    raise SystemExit(1 if ecarts and not args.corriger else 0)
@@ -0,0 +1,58 @@
+"""
+ACFC - Pagination par Curseur
+=============================
+
+Outils de pagination par curseur (keyset) sur un couple (date, identifiant)
+trié par ordre décroissant : commandes en cours du tableau de bord, historique
+des commandes et des factures d'un client.
+
+Contrairement à OFFSET, le coût d'une page ne dépend pas de sa position :
+la base reprend directement après la dernière ligne affichée.
+
+Auteur : ACFC Development Team
+Version : 1.0
+"""
+
+from datetime import date, datetime
+from typing import Any, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+def encoder_curseur(jour: date, identifiant: int) -> str:
+    """
+    Encode le curseur de pagination (date, identifiant) d'une ligne.
+
+    Returns:
+        str: Curseur au format AAAA-MM-JJ_id
+    """
+    return f'{jour.isoformat()}_{identifiant}'
+
+def decoder_curseur(curseur: str | None) -> Tuple[date, int] | None:
+    """
+    Décode un curseur de pagination produit par encoder_curseur.
+
+    Args:
+        curseur (str | None): Curseur reçu du client
+
+    Returns:
+        Tuple[date, int] | None: (date, identifiant) ou None si absent/invalide
+    """
+    if not curseur:
+        return None
+    try:
+        jour_str, identifiant_str = curseur.split('_', 1)
+        return datetime.strptime(jour_str, '%Y-%m-%d').date(), int(identifiant_str)
+    except ValueError:
+        return None
+
+def apres_curseur(colonne_date: Any, colonne_id: Any, curseur: Tuple[date, int]) -> ColumnElement[bool]:
+    """
+    Filtre des lignes suivant le curseur dans l'ordre (date DESC, id DESC).
+
+    Args:
+        colonne_date: Colonne de date du tri
+        colonne_id: Colonne identifiant (départage des lignes de même date)
+        curseur (Tuple[date, int]): Dernière ligne de la page précédente
+    """
+    jour, identifiant = curseur
+    return or_(colonne_date < jour, and_(colonne_date == jour, colonne_id < identifiant))
@@ -0,0 +1,365 @@
+"""
+ACFC - Index de Recherche des Clients
+=====================================
+
+Module de recherche « contient » des clients par trigrammes.
+
+Les recherches ILIKE '%terme%' ne peuvent utiliser aucun index B-tree : chaque
+frappe de la recherche client parcourait intégralement les tables clients et
+contacts. Les champs recherchables sont désormais découpés en trigrammes dans
+la table 05_index_recherche ; un terme est recherché par égalité sur ses
+trigrammes (clé primaire), puis les candidats sont confirmés par le filtre
+ILIKE d'origine, appliqué à quelques lignes seulement. Le tri (pertinence puis
+ordre alphabétique) et la pagination sont réalisés par la base.
+
+Sources indexées :
+- part : « prénom nom » du particulier
+- pro : raison sociale
+- mail : adresses email
+- telephone : numéros de téléphone
+- adresse : lignes d'adresse, code postal et ville des adresses actives
+
+Le mode « tous » interroge toutes les sources en une seule requête et retourne
+des clients dédoublonnés, classés, avec la source ayant produit la correspondance.
+
+Synchronisation : l'index d'un client est recalculé à la fin de chaque flush
+de session modifiant un client ou l'un de ses contacts. Reconstruction complète :
+```bash
+python -m app_acfc.recherche --reconstruire
+python -m app_acfc.index_bdd --appliquer      # Remplit aussi l'index s'il est vide
+```
+
+Tant que l'index est vide (table créée sur une base existante et pas encore
+reconstruite), la recherche se fait sans filtre de candidats (ILIKE seul) et
+un avertissement est journalisé.
+
+Auteur : ACFC Development Team
+Version : 1.0
+"""
+
+import unicodedata
+from argparse import ArgumentParser
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from sqlalchemy import Select, select, delete, insert, literal, union_all, event, true, or_, case
+from sqlalchemy.orm import Session as SessionBdDType, contains_eager, undefer_group
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import func
+from app_acfc.modeles import SessionBdD, Client, Part, Pro, Mail, Telephone, Adresse, IndexRecherche
+from logs.logger import acfc_log, WARNING
+
+# ====================================================================
+# CONSTANTES
+# ====================================================================
+
+SOURCE_PART = 'part'
+SOURCE_PRO = 'pro'
+SOURCE_MAIL = 'mail'
+SOURCE_TELEPHONE = 'telephone'
+SOURCE_ADRESSE = 'adresse'
+SOURCE_TOUS = 'tous'    # Recherche dans toutes les sources en une requête
+# Ordre de priorité des sources dans le classement des résultats
+SOURCES: Tuple[str, ...] = (SOURCE_PART, SOURCE_PRO, SOURCE_MAIL, SOURCE_TELEPHONE, SOURCE_ADRESSE)
+LIBELLES_SOURCES: Dict[str, str] = {
+    SOURCE_PART: 'Nom', SOURCE_PRO: 'Raison sociale', SOURCE_MAIL: 'Email',
+    SOURCE_TELEPHONE: 'Téléphone', SOURCE_ADRESSE: 'Adresse'
+}
+
+TAILLE_NGRAMME = 3
+
+# Modèles dont l'écriture impose la réindexation du client concerné
+MODELES_INDEXES: Tuple[type, ...] = (Part, Pro, Mail, Telephone, Adresse)
+
+# Nombre de clients réindexés par lot lors d'une reconstruction complète
+TAILLE_LOT_RECONSTRUCTION = 500
+
+# État de l'index, mémorisé dès qu'il contient des lignes (voir index_recherche_rempli)
+_index_rempli = False
+
+# Pagination des résultats de recherche
+TAILLE_PAGE_RECHERCHE = 20
+TAILLE_PAGE_RECHERCHE_MAX = 100
+
+# Champs recherchés par source : (modèle du contact, colonnes comparées, filtres propres à la source)
+CHAMPS_RECHERCHE: Dict[str, Tuple[Any, Tuple[ColumnElement[Any], ...], Tuple[ColumnElement[bool], ...]]] = {
+    SOURCE_PART: (Part, (Part.prenom, Part.nom, func.concat(Part.prenom, ' ', Part.nom)), ()),
+    SOURCE_PRO: (Pro, (Pro.raison_sociale,), ()),
+    SOURCE_MAIL: (Mail, (Mail.mail,), ()),
+    SOURCE_TELEPHONE: (Telephone, (Telephone.telephone,), ()),
+    SOURCE_ADRESSE: (Adresse, (Adresse.adresse_l1, Adresse.adresse_l2, Adresse.code_postal, Adresse.ville),
+                     (Adresse.is_active == True,)),
+}
+
+# ====================================================================
+# NORMALISATION ET DÉCOUPAGE EN TRIGRAMMES
+# ====================================================================
+
+def normaliser(valeur: str | None) -> str:
+    """
+    Normalise une valeur pour l'indexation : minuscules, sans accents, espaces réduits.
+
+    La normalisation est identique pour les valeurs indexées et les termes recherchés,
+    et reste plus large que la collation de la base (aucun faux négatif).
+    """
+    if not valeur:
+        return ''
+    decomposee = unicodedata.normalize('NFKD', valeur.casefold())
+    sans_accents = ''.join(c for c in decomposee if not unicodedata.combining(c))
+    return ' '.join(sans_accents.split())
+
+def trigrammes(valeur: str | None) -> Set[str]:
+    """Retourne l'ensemble des trigrammes d'une valeur normalisée."""
+    texte = normaliser(valeur)
+    return {texte[i:i + TAILLE_NGRAMME] for i in range(len(texte) - TAILLE_NGRAMME + 1)}
+
+# ====================================================================
+# RECHERCHE PAGINÉE
+# ====================================================================
+
+def clients_candidats(terme: str, sources: Iterable[str] = SOURCES) -> Select[Any]:
+    """
+    Sous-requête des clients dont une source contient tous les trigrammes du terme.
+
+    Le résultat est un sur-ensemble des correspondances exactes (les trigrammes peuvent
+    provenir de valeurs différentes d'une même source) : l'appelant confirme les candidats
+    avec son filtre ILIKE, qui ne porte alors que sur quelques lignes.
+
+    Args:
+        terme (str): Terme recherché (au moins TAILLE_NGRAMME caractères normalisés)
+        sources (Iterable[str]): Sources interrogées
+
+    Returns:
+        Select[Any]: SELECT id_client utilisable dans Client.id.in_(...)
+    """
+    trigrammes_terme = trigrammes(terme)
+    return (
+        select(IndexRecherche.id_client)
+        .where(IndexRecherche.source.in_(list(sources)),
+               IndexRecherche.trigramme.in_(sorted(trigrammes_terme)))
+        .group_by(IndexRecherche.id_client, IndexRecherche.source)
+        # Clé primaire (trigramme, source, id_client) : chaque trigramme est compté une fois par groupe
+        .having(func.count() == len(trigrammes_terme))
+    )
+
+def index_recherche_rempli(db_session: SessionBdDType | None = None) -> bool:
+    """
+    Indique si l'index de recherche contient des lignes.
+
+    Le résultat positif est mémorisé : la table n'est plus interrogée ensuite. Un index
+    vide est signalé par un avertissement, la recherche se faisant alors sans index.
+
+    Args:
+        db_session (SessionBdDType | None): Session à utiliser (une session dédiée si None)
+    """
+    global _index_rempli
+    if _index_rempli:
+        return True
+    session_dediee = db_session is None
+    db_session = SessionBdD() if session_dediee else db_session
+    try:
+        _index_rempli = db_session.execute(select(IndexRecherche.id_client).limit(1)).first() is not None
+    finally:
+        if session_dediee:
+            db_session.close()
+    if not _index_rempli:
+        acfc_log.log_to_file(level=WARNING, zone_log='recherche',
+                             message="Index de recherche vide : recherche sans index "
+                                     "(python -m app_acfc.recherche --reconstruire)")
+    return _index_rempli
+
+def filtre_candidats(terme: str, colonne: ColumnElement[Any], *sources: str,
+                     avec_index: bool = True) -> ColumnElement[bool]:
+    """
+    Filtre une colonne id_client sur les candidats de l'index pour les sources données.
+
+    Un terme trop court pour produire un trigramme, ou un index vide (avec_index False),
+    ne restreint rien (filtre toujours vrai).
+    """
+    if not avec_index or not trigrammes(terme):
+        return true()
+    return colonne.in_(clients_candidats(terme, sources or SOURCES))
+
+def _correspondances_source(terme: str, source: str, avec_index: bool = True) -> Select[Any]:
+    """
+    Correspondances (id_client, score) d'une source.
+
+    Score : priorité de la source, +10 si aucun champ ne commence par le terme.
+    Le plus petit score d'un client indique sa meilleure correspondance.
+    """
+    modele, colonnes, filtres = CHAMPS_RECHERCHE[source]
+    commence_par = or_(*[colonne.ilike(f'{terme}%') for colonne in colonnes])
+    return (
+        select(modele.id_client.label('id_client'),
+               (case((commence_par, 0), else_=10) + SOURCES.index(source)).label('score'))
+        .where(*filtres,
+               filtre_candidats(terme, modele.id_client, source, avec_index=avec_index),
+               or_(*[colonne.ilike(f'%{terme}%') for colonne in colonnes]))
+    )
+
+def filtre_recherche(terme: str, sources: Iterable[str] = SOURCES) -> ColumnElement[bool]:
+    """Filtre Client.id sur les clients correspondant au terme dans les sources données."""
+    avec_index = index_recherche_rempli()
+    correspondances = union_all(*[_correspondances_source(terme, source, avec_index)
+                                  for source in sources]).subquery()
+    return Client.id.in_(select(correspondances.c.id_client))
+
+def requete_recherche(terme: str, sources: Iterable[str] = SOURCES, offset: int = 0,
+                      limit: int = TAILLE_PAGE_RECHERCHE, avec_index: bool = True) -> Select[Any]:
+    """
+    Construit la requête paginée de recherche de clients actifs dans une ou plusieurs sources.
+
+    Chaque source produit ses correspondances, filtrées par l'index de trigrammes puis par
+    le motif ILIKE '%terme%' ; elles sont réunies (UNION ALL) et regroupées par client avec
+    le meilleur score : une seule requête, un client par ligne, et la source ayant trouvé
+    le client. Tri en SQL : correspondances en début de champ, priorité de la source (ordre
+    de SOURCES), puis ordre alphabétique du nom. Une ligne de plus que la page est demandée
+    pour savoir s'il reste des résultats.
+
+    Args:
+        terme (str): Terme recherché
+        sources (Iterable[str]): Sources interrogées (voir SOURCES)
+        offset (int): Nombre de résultats déjà affichés
+        limit (int): Taille de la page
+        avec_index (bool): Filtrer par l'index de trigrammes (False tant que l'index est vide)
+
+    Returns:
+        Select[Any]: SELECT (Client, score) avec particulier, professionnel et adresse principale chargés
+    """
+    correspondances = union_all(*[_correspondances_source(terme, source, avec_index)
+                                  for source in sources]).subquery('correspondances')
+    meilleures = (
+        select(correspondances.c.id_client, func.min(correspondances.c.score).label('score'))
+        .group_by(correspondances.c.id_client)
+        .subquery('meilleures')
+    )
+    nom_tri = case(
+        (Client.type_client == 1, func.concat(Part.nom, ' ', Part.prenom)),
+        else_=Pro.raison_sociale
+    )
+    return (
+        select(Client, meilleures.c.score)
+        .join(meilleures, meilleures.c.id_client == Client.id)
+        .outerjoin(Client.part)
+        .outerjoin(Client.pro)
+        .options(contains_eager(Client.part), contains_eager(Client.pro), undefer_group('adresse_principale'))
+        .where(Client.is_active == True)
+        .order_by(meilleures.c.score, nom_tri, Client.id)
+        .offset(offset)
+        .limit(limit + 1)
+    )
+
+def source_du_score(score: int) -> str:
+    """Retourne la source ayant produit un score de correspondance."""
+    return SOURCES[int(score) % 10]
+
+def rechercher_clients(db_session: SessionBdDType, terme: str, sources: Iterable[str] = SOURCES,
+                       offset: int = 0, limit: int = TAILLE_PAGE_RECHERCHE) -> Tuple[List[Tuple[Client, str]], bool]:
+    """
+    Exécute une recherche paginée de clients.
+
+    Returns:
+        Tuple[List[Tuple[Client, str]], bool]: (client, source correspondante) de la page,
+            présence de résultats supplémentaires
+    """
+    lignes = db_session.execute(requete_recherche(terme, tuple(sources), offset, limit,
+                                                  index_recherche_rempli(db_session))).all()
+    resultats = [(client, source_du_score(score)) for client, score in lignes[:limit]]
+    return resultats, len(lignes) > limit
+
+# ====================================================================
+# MAINTENANCE DE L'INDEX
+# ====================================================================
+
+def _valeurs_indexees(ids_clients: List[int]) -> Select[Any]:
+    """Valeurs recherchables (id_client, source, valeur) des clients donnés."""
+    adresses_actives = (Adresse.id_client.in_(ids_clients), Adresse.is_active == True)
+    return union_all(
+        select(Part.id_client, literal(SOURCE_PART), func.concat(Part.prenom, ' ', Part.nom))
+        .where(Part.id_client.in_(ids_clients)),
+        select(Pro.id_client, literal(SOURCE_PRO), Pro.raison_sociale).where(Pro.id_client.in_(ids_clients)),
+        select(Mail.id_client, literal(SOURCE_MAIL), Mail.mail).where(Mail.id_client.in_(ids_clients)),
+        select(Telephone.id_client, literal(SOURCE_TELEPHONE), Telephone.telephone)
+        .where(Telephone.id_client.in_(ids_clients)),
+        *[select(Adresse.id_client, literal(SOURCE_ADRESSE), colonne).where(*adresses_actives)
+          for colonne in (Adresse.adresse_l1, Adresse.adresse_l2, Adresse.code_postal, Adresse.ville)]
+    )
+
+def rafraichir_index_recherche(db_session: SessionBdDType, ids_clients: Iterable[int | None]) -> None:
+    """
+    Recalcule les trigrammes des clients donnés dans la transaction en cours.
+
+    Args:
+        db_session (SessionBdDType): Session de la transaction en cours
+        ids_clients (Iterable[int | None]): Clients à réindexer (None ignorés)
+    """
+    ids = sorted({id_client for id_client in ids_clients if id_client is not None})
+    if not ids:
+        return
+
+    db_session.execute(delete(IndexRecherche).where(IndexRecherche.id_client.in_(ids)))
+
+    lignes: Set[Tuple[str, str, int]] = set()
+    for id_client, source, valeur in db_session.execute(_valeurs_indexees(ids)):
+        lignes.update((trigramme, source, id_client) for trigramme in trigrammes(valeur))
+    if lignes:
+        db_session.execute(
+            insert(IndexRecherche),
+            [{'trigramme': t, 'source': s, 'id_client': c} for t, s, c in sorted(lignes)]
+        )
+
+def reconstruire_index_recherche(db_session: SessionBdDType) -> int:
+    """
+    Reconstruit l'index de recherche de tous les clients, par lots.
+
+    Args:
+        db_session (SessionBdDType): Session de base de données (commit à la charge de l'appelant)
+
+    Returns:
+        int: Nombre de clients indexés
+    """
+    db_session.execute(delete(IndexRecherche))
+    ids: List[int] = list(db_session.execute(select(Client.id).order_by(Client.id)).scalars())
+    for debut in range(0, len(ids), TAILLE_LOT_RECONSTRUCTION):
+        rafraichir_index_recherche(db_session, ids[debut:debut + TAILLE_LOT_RECONSTRUCTION])
+    return len(ids)
+
+def clients_modifies(db_session: SessionBdDType) -> Set[int]:
+    """Clients dont un objet indexé est créé, modifié ou supprimé dans la session."""
+    ids: Set[int] = set()
+    for objet in (*db_session.new, *db_session.dirty, *db_session.deleted):
+        if isinstance(objet, MODELES_INDEXES):
+            # Lecture directe de l'état : pas de chargement différé pendant le flush
+            ids.add(objet.__dict__.get('id_client'))
+        elif isinstance(objet, Client):
+            ids.add(objet.__dict__.get('id'))
+    ids.discard(None)
+    return ids
+
+def _apres_flush(db_session: SessionBdDType, _flush_context: Any) -> None:
+    """Écouteur after_flush : réindexe les clients touchés dans la même transaction."""
+    rafraichir_index_recherche(db_session, clients_modifies(db_session))
+
+event.listen(SessionBdD, 'after_flush', _apres_flush)
+
+# ====================================================================
+# POINT D'ENTRÉE - RECONSTRUCTION DE L'INDEX
+# ====================================================================
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Maintenance de l'index de recherche des clients ACFC")
+    parser.add_argument('--reconstruire', action='store_true',
+                        help="Reconstruire la table 05_index_recherche depuis les clients et contacts")
+    args = parser.parse_args()
+
+    if not args.reconstruire:
+        parser.print_help()
+    else:
+        db_session: SessionBdDType = SessionBdD()
+        try:
+            nb_clients = reconstruire_index_recherche(db_session)
+            db_session.commit()
+            print(f"Index de recherche reconstruit : {nb_clients} client(s)")
+        except Exception:
+            db_session.rollback()
+            raise
+        finally:
+            db_session.close()
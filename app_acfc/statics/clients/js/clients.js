@@ -7,6 +7,7 @@
    - Validation des formulaires
    - Actions d'édition/suppression
    - Formatage automatique des données
+   - Chargement des onglets à leur ouverture et de l'historique des commandes et factures
 ==================================================================== */
 
 /**
@@ -74,6 +75,75 @@ function initClientDetailsPage() {
             }
         });
     }
+
+    // Contenu des onglets chargé à leur première ouverture
+    document.querySelectorAll('#clientTabs [data-bs-toggle="tab"]').forEach(tab => {
+        tab.addEventListener('shown.bs.tab', function() {
+            const container = document.querySelector(`${this.dataset.bsTarget} .onglet-fragment`);
+            if (container && !container.dataset.loaded) {
+                loadOngletFragment(container);
+            }
+        });
+    });
+
+    // Pages suivantes de l'historique des commandes et factures (boutons insérés avec les onglets)
+    document.addEventListener('click', function(e) {
+        const button = e.target.closest('.historique-more');
+        if (button) {
+            e.preventDefault();
+            loadMoreHistorique(button);
+        }
+    });
+}
+
+/**
+ * Charge le contenu HTML d'un onglet de la fiche client.
+ * Le navigateur revalide la réponse par ETag : un onglet inchangé n'est pas retransféré.
+ */
+async function loadOngletFragment(container) {
+    container.dataset.loaded = 'true';
+
+    try {
+        const response = await fetch(container.dataset.fragmentUrl, { headers: { 'Accept': 'text/html' } });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        container.innerHTML = await response.text();
+    } catch (error) {
+        console.error('Erreur lors du chargement de l\'onglet:', error);
+        delete container.dataset.loaded;
+        container.innerHTML = '<p class="text-danger text-center py-5 mb-0">Erreur lors du chargement, rouvrez l\'onglet pour réessayer.</p>';
+    }
+}
+
+/**
+ * Charge la page suivante d'un historique (commandes ou factures) par curseur.
+ * Le serveur renvoie les lignes HTML du tableau et le curseur suivant dans l'en-tête X-Next-Cursor.
+ */
+async function loadMoreHistorique(button) {
+    const tbody = document.getElementById(button.dataset.target);
+    const url = `${button.dataset.url}?after=${encodeURIComponent(button.dataset.nextCursor)}`;
+    button.disabled = true;
+
+    try {
+        const response = await fetch(url, { headers: { 'Accept': 'text/html' } });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        tbody.insertAdjacentHTML('beforeend', await response.text());
+
+        const nextCursor = response.headers.get('X-Next-Cursor');
+        if (nextCursor) {
+            button.dataset.nextCursor = nextCursor;
+            button.disabled = false;
+        } else {
+            button.parentElement.remove();
+        }
+    } catch (error) {
+        console.error('Erreur lors du chargement de l\'historique:', error);
+        button.disabled = false;
+        showToast('Erreur lors du chargement de l\'historique', 'danger');
+    }
 }
 
 /**
@@ -213,6 +283,21 @@ function initClientSearchPage() {
     const noResultsDiv = document.getElementById('no-results');
     
     let searchTimeout;
+    let nextOffset = null;
+    
+    // Bouton de chargement des résultats suivants (pagination côté serveur)
+    const moreButton = document.createElement('button');
+    moreButton.type = 'button';
+    moreButton.id = 'results-more';
+    moreButton.className = 'list-group-item list-group-item-action text-center text-primary d-none';
+    moreButton.textContent = 'Plus de résultats';
+    resultsList.after(moreButton);
+    
+    // Construction de l'URL de recherche
+    function buildSearchUrl(searchTerm, searchType, offset) {
+        const params = new URLSearchParams({ q: searchTerm, type: searchType, offset: offset });
+        return `/clients/recherche_avancee?${params.toString()}`;
+    }
     
     // Fonction de recherche
     function performSearch() {
@@ -223,6 +308,7 @@ function initClientSearchPage() {
         resultsContainer.classList.add('d-none');
         noResultsDiv.classList.add('d-none');
         loadingDiv.classList.add('d-none');
+        nextOffset = null;
         
         // Vérifier la longueur minimale
         if (searchTerm.length < 3) {
@@ -233,14 +319,15 @@ function initClientSearchPage() {
         loadingDiv.classList.remove('d-none');
         
         // Effectuer la recherche
-        fetch(`/clients/recherche_avancee?q=${encodeURIComponent(searchTerm)}&type=${searchType}`)
+        fetch(buildSearchUrl(searchTerm, searchType, 0))
             .then(response => response.json())
             .then(data => {
                 loadingDiv.classList.add('d-none');
                 
-                if (data.length === 0) {
+                if (data.clients.length === 0) {
                     noResultsDiv.classList.remove('d-none');
                 } else {
+                    resultsList.innerHTML = '';
                     displayResults(data);
                 }
             })
@@ -251,12 +338,25 @@ function initClientSearchPage() {
             });
     }
     
-    // Fonction d'affichage des résultats
-    function displayResults(clients) {
-        resultsList.innerHTML = '';
-        resultsCount.textContent = clients.length;
+    // Chargement de la page suivante des résultats
+    function loadMoreResults() {
+        if (nextOffset === null) {
+            return;
+        }
+        const searchTerm = searchInput.value.trim();
+        const searchType = document.querySelector('input[name="search_type"]:checked').value;
         
-        clients.forEach(client => {
+        moreButton.disabled = true;
+        fetch(buildSearchUrl(searchTerm, searchType, nextOffset))
+            .then(response => response.json())
+            .then(data => displayResults(data))
+            .catch(error => console.error('Erreur lors du chargement des résultats:', error))
+            .finally(() => { moreButton.disabled = false; });
+    }
+    
+    // Fonction d'affichage des résultats (ajoutés à la liste existante)
+    function displayResults(data) {
+        data.clients.forEach(client => {
             const listItem = document.createElement('a');
             listItem.href = `/clients/${client.id}`;
             listItem.className = 'list-group-item list-group-item-action';
@@ -272,6 +372,9 @@ function initClientSearchPage() {
                             ${client.code_postal} ${client.ville}
                         </p>
                     </div>
+                    <span class="badge bg-light text-dark align-self-start me-2" title="Champ correspondant">
+                        ${client.champ_correspondant_libelle}
+                    </span>
                     <small class="text-muted">
                         <i class="fas fa-arrow-right"></i>
                     </small>
@@ -281,9 +384,15 @@ function initClientSearchPage() {
             resultsList.appendChild(listItem);
         });
         
+        // Compteur des résultats affichés ("+" s'il en reste)
+        nextOffset = data.has_more ? data.next_offset : null;
+        resultsCount.textContent = `${resultsList.children.length}${data.has_more ? '+' : ''}`;
+        moreButton.classList.toggle('d-none', !data.has_more);
         resultsContainer.classList.remove('d-none');
     }
     
+    moreButton.addEventListener('click', loadMoreResults);
+    
     // Événements de recherche
     searchInput.addEventListener('input', function() {
         clearTimeout(searchTimeout);
@@ -6,7 +6,7 @@
  * Fonctionnalités JavaScript spécifiques au formulaire de contenu de commande :
  * - Gestion des champs conditionnels (facturation, expédition)
  * - Gestion des modales de facturation et expédition
- * - Filtrage des produits du catalogue
+ * - Filtrage des produits du catalogue (API à facettes, sans rechargement)
  * - Activation/désactivation des champs de quantité
  * 
  * Dépendances : Bootstrap 5
@@ -263,8 +263,16 @@ function initializeFilters() {
     appliquerFiltres();
 }
 
-// Fonctions de filtrage JavaScript côté client
-function appliquerFiltres() {
+// Numéro de la dernière requête de filtrage (les réponses plus anciennes sont ignorées)
+let derniereRequeteFiltres = 0;
+
+/**
+ * Filtre le catalogue via l'API à facettes (voir catalogue.catalogue_produits_api).
+ * Les lignes du formulaire restent en place : seules leur visibilité et les comptes
+ * affichés dans les listes de filtres changent. Le navigateur revalide les réponses
+ * par ETag. En cas d'erreur de l'API, le filtrage est fait localement.
+ */
+async function appliquerFiltres() {
     const millesimeFilter = document.getElementById('filter_millesime');
     const typeFilter = document.getElementById('filter_type_produit');
     const geographieFilter = document.getElementById('filter_geographie');
@@ -273,51 +281,93 @@ function appliquerFiltres() {
         return;
     }
     
-    const millesimeValue = millesimeFilter.value;
-    const typeValue = typeFilter.value;
-    const geographieValue = geographieFilter.value;
-    
+    const filtres = {
+        millesime: millesimeFilter.value,
+        type_produit: typeFilter.value,
+        geographie: geographieFilter.value
+    };
+    const tbody = document.getElementById('catalogue-tbody');
+    const apiUrl = tbody ? tbody.dataset.apiUrl : null;
+    if (!apiUrl) {
+        afficherProduits(row => correspondAuxFiltres(row, filtres));
+        return;
+    }
+
+    const params = new URLSearchParams();
+    Object.entries(filtres).forEach(([facette, valeur]) => {
+        if (valeur) params.set(facette, valeur);
+    });
+    const numeroRequete = ++derniereRequeteFiltres;
+
+    try {
+        const response = await fetch(`${apiUrl}?${params}`, { headers: { 'Accept': 'application/json' } });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        const resultat = await response.json();
+        if (numeroRequete !== derniereRequeteFiltres) {
+            return;
+        }
+        const ids = new Set(resultat.produits.map(produit => String(produit.id)));
+        afficherProduits(row => ids.has(row.dataset.id));
+        mettreAJourFacettes(resultat.facettes, {
+            millesime: millesimeFilter,
+            type_produit: typeFilter,
+            geographie: geographieFilter
+        });
+    } catch (error) {
+        console.error('Erreur lors du filtrage du catalogue:', error);
+        if (numeroRequete === derniereRequeteFiltres) {
+            afficherProduits(row => correspondAuxFiltres(row, filtres));
+        }
+    }
+}
+
+// Filtrage local d'une ligne du catalogue (repli si l'API est indisponible)
+function correspondAuxFiltres(row, filtres) {
+    return (!filtres.millesime || row.getAttribute('data-millesime') === filtres.millesime) &&
+           (!filtres.type_produit || row.getAttribute('data-type') === filtres.type_produit) &&
+           (!filtres.geographie || row.getAttribute('data-geographie') === filtres.geographie);
+}
+
+// Affiche les lignes retenues par le prédicat et le message "aucun produit trouvé" si besoin
+function afficherProduits(estVisible) {
     const rows = document.querySelectorAll('.catalogue-row');
     let visibleCount = 0;
     
     rows.forEach(row => {
-        const millesime = row.getAttribute('data-millesime');
-        const type = row.getAttribute('data-type');
-        const geographie = row.getAttribute('data-geographie');
-        
-        let visible = true;
-        
-        // Appliquer les filtres
-        if (millesimeValue && millesime !== millesimeValue) {
-            visible = false;
-        }
-        if (typeValue && type !== typeValue) {
-            visible = false;
-        }
-        if (geographieValue && geographie !== geographieValue) {
-            visible = false;
-        }
-        
-        // Afficher/cacher la ligne
+        const visible = estVisible(row);
+        row.style.display = visible ? '' : 'none';
         if (visible) {
-            row.style.display = '';
             visibleCount++;
-        } else {
-            row.style.display = 'none';
         }
     });
     
     // Afficher/cacher le message "aucun produit trouvé"
     const noProductsMessage = document.getElementById('no-products-message');
     if (noProductsMessage) {
-        if (visibleCount === 0) {
-            noProductsMessage.style.display = 'block';
-        } else {
-            noProductsMessage.style.display = 'none';
-        }
+        noProductsMessage.style.display = visibleCount === 0 ? 'block' : 'none';
     }
 }
 
+// Affiche dans chaque liste de filtres le nombre de produits correspondant à chaque valeur
+function mettreAJourFacettes(facettes, selects) {
+    Object.entries(selects).forEach(([facette, select]) => {
+        const comptes = facettes[facette] || {};
+        Array.from(select.options).forEach(option => {
+            if (!option.value) {
+                return;
+            }
+            if (!option.dataset.libelle) {
+                option.dataset.libelle = option.textContent;
+            }
+            const compte = comptes[option.value] || 0;
+            option.textContent = `${option.dataset.libelle} (${compte})`;
+            option.disabled = compte === 0 && !option.selected;
+        });
+    });
+}
+
 function reinitialiserFiltres() {
     // Remettre les valeurs par défaut
     const millesimeFilter = document.getElementById('filter_millesime');
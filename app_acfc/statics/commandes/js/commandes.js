@@ -554,10 +554,17 @@ function bulkUpdateStatus(action) {
         .then(response => response.json())
         .then(data => {
             if (data.success) {
-                showAlert(`${selectedIds.length} commande(s) mise(s) à jour avec succès.`, 'success');
+                showAlert(`${data.nb_modifiees} commande(s) mise(s) à jour avec succès.`, 'success');
                 setTimeout(() => location.reload(), 1500);
+            } else if (data.resultats) {
+                // Résultat partiel : détail des commandes refusées
+                const refus = data.resultats
+                                  .filter(resultat => resultat.statut !== 'modifiee')
+                                  .map(resultat => `#${resultat.id} : ${resultat.message}`);
+                showAlert(`${data.nb_modifiees} commande(s) mise(s) à jour, ${refus.length} refusée(s) (${refus.join(', ')}).`, 'warning');
+                if (data.nb_modifiees > 0) setTimeout(() => location.reload(), 4000);
             } else {
-                showAlert('Erreur lors de la mise à jour.', 'error');
+                showAlert(data.error || 'Erreur lors de la mise à jour.', 'error');
             }
         })
         .catch(error => {
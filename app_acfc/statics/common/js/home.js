@@ -8,6 +8,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initAnimations();
     initQuickLinks();
     initDashboardRefresh();
+    initCommandesEnCoursPagination();
     
     // Rafraîchissement automatique des données toutes les 5 minutes
     setInterval(refreshDashboardData, 5 * 60 * 1000);
@@ -119,6 +120,90 @@ function addRefreshButton(header, refreshFunction) {
     header.appendChild(refreshBtn);
 }
 
+/**
+ * Initialise le chargement à la demande des commandes en cours
+ */
+function initCommandesEnCoursPagination() {
+    const moreBtn = document.getElementById('commandes-en-cours-more');
+    if (moreBtn) {
+        moreBtn.addEventListener('click', function(e) {
+            e.preventDefault();
+            loadMoreCommandesEnCours(this);
+        });
+    }
+}
+
+/**
+ * Construit l'élément de liste d'une commande en cours
+ */
+function buildCommandeEnCoursItem(commande) {
+    const item = document.createElement('div');
+    item.className = 'list-group-item list-group-item-action';
+    item.innerHTML = `
+        <div class="d-flex w-100 justify-content-between">
+            <h6 class="mb-1"></h6>
+            <small class="text-success"></small>
+        </div>
+        <p class="mb-1 text-truncate"></p>
+        <small class="text-muted"></small>
+    `;
+    item.querySelector('h6').textContent = `#${commande.id}`;
+    item.querySelector('.text-success').textContent = `${commande.montant}€`;
+    item.querySelector('p').textContent = commande.nom_affichage;
+    item.querySelector('.text-muted').textContent = commande.date_commande;
+    return item;
+}
+
+/**
+ * Charge la page suivante des commandes en cours (pagination par curseur)
+ */
+async function loadMoreCommandesEnCours(button) {
+    const list = document.getElementById('commandes-en-cours-list');
+    const url = `${button.dataset.url}?after=${encodeURIComponent(button.dataset.nextCursor)}`;
+    button.disabled = true;
+
+    try {
+        const response = await fetch(url, { headers: { 'Accept': 'application/json' } });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        const page = await response.json();
+        page.commandes.forEach(commande => list.appendChild(buildCommandeEnCoursItem(commande)));
+
+        if (page.next_cursor) {
+            button.dataset.nextCursor = page.next_cursor;
+            button.disabled = false;
+        } else {
+            button.parentElement.remove();
+        }
+    } catch (error) {
+        button.disabled = false;
+        handleApiError(error, 'commandes en cours');
+    }
+}
+
+/**
+ * Recharge la première page des commandes en cours
+ */
+async function loadCommandesEnCours() {
+    const list = document.getElementById('commandes-en-cours-list');
+    const moreBtn = document.getElementById('commandes-en-cours-more');
+    if (!list || !moreBtn) {
+        return;
+    }
+
+    const response = await fetch(moreBtn.dataset.url, { headers: { 'Accept': 'application/json' } });
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+    }
+    const page = await response.json();
+    list.replaceChildren(...page.commandes.map(buildCommandeEnCoursItem));
+    if (page.next_cursor) {
+        moreBtn.dataset.nextCursor = page.next_cursor;
+        moreBtn.disabled = false;
+    }
+}
+
 /**
  * Rafraîchit les données du dashboard
  */
@@ -1,9 +1,18 @@
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
-from typing import Any
+from queue import Queue, Empty, Full
+from threading import Event, Lock, Thread
+from time import monotonic
+from traceback import format_exc
+from typing import Any, Dict, List
 from datetime import datetime, timezone
+from os import getenv
 from os.path import dirname, join as join_os, abspath
 
 """
@@ -19,23 +28,53 @@ Fonctionnalités principales :
 - Stockage des logs en base MongoDB avec métadonnées
 - Création de loggers spécifiques par zone fonctionnelle
 - Gestion des zones de logging pour catégoriser les événements
+- Envoi asynchrone des logs MongoDB par lots (thread d'arrière-plan)
+- Registre des loggers fichiers : chaque fichier est ouvert une seule fois
+- Écriture des fichiers par un thread dédié (QueueHandler / QueueListener)
+- Niveau minimal par zone modifiable à chaud, messages formatés seulement s'ils sont émis
+- Format JSON structuré et contexte de requête (identifiant de corrélation, utilisateur,
+  endpoint, nombre de requêtes SQL) ajouté aux fichiers et à MongoDB
 
 Architecture :
-- Fichiers de logs rotatifs (5MB max, 3 sauvegardes)
+- Fichiers de logs rotatifs (5MB max, 3 sauvegardes), écrits par un thread
+  dédié : les requêtes ne font que déposer les enregistrements dans une file
 - Base de données MongoDB pour recherche et analyse
 - Horodatage UTC pour cohérence multi-timezone
 - Formatage standardisé des messages
+- Logs MongoDB mis en file (bornée) par les requêtes et insérés par lots
+  (insert_many) par un thread dédié : une base lente ne bloque plus l'application
+
+Configuration de l'envoi MongoDB (variables d'environnement) :
+- LOG_MONGO_TAILLE_FILE : nombre maximal d'entrées en attente (défaut: 10000)
+- LOG_MONGO_TAILLE_LOT : nombre maximal d'entrées par insert_many (défaut: 200)
+- LOG_MONGO_DELAI_ENVOI : délai maximal en secondes avant l'envoi d'un lot incomplet (défaut: 1)
+- LOG_MONGO_ATTENTE_MAX : attente maximale en secondes d'une place dans la file pleine,
+  au-delà l'entrée est abandonnée et comptée (défaut: 0, abandon immédiat)
+
+Configuration des fichiers (variables d'environnement) :
+- LOG_MAX_FICHIERS_ZONES : nombre maximal de fichiers de zone ouverts (défaut: 32) ;
+  au-delà, les messages des nouvelles zones ne sont écrits que dans les fichiers par niveau
+- LOG_FICHIERS_TAILLE_FILE : nombre maximal d'enregistrements en attente d'écriture (défaut: 10000)
+- LOG_FICHIERS_ATTENTE_MAX : attente maximale en secondes d'une place dans la file pleine,
+  au-delà l'enregistrement est abandonné et compté (défaut: 1)
+- LOG_FORMAT : 'json' (défaut, une ligne JSON par log) ou 'texte' ([timestamp] --niveau-- message)
+
+Configuration des niveaux (variables d'environnement, modifiables à chaud par definir_niveau) :
+- LOG_NIVEAU_MIN : niveau minimal par défaut des zones (ERROR, WARNING, INFO, DEBUG ; défaut: DEBUG)
+- LOG_NIVEAUX_ZONES : niveaux par zone, ex: "commandes.log=WARNING,login.log=INFO"
 
 Utilisation :
 ```python
 logger = CustomLogger("mongodb://localhost:27017", "acfc_logs", "application")
 logger.log_to_file(ERROR, "Message d'erreur", zone_log="authentification")
+logger.log_to_file(DEBUG, "Lignes : %s", lignes, zone_log="commandes.log")  # Formaté seulement si émis
 logger.log_to_db(INFO, "Connexion utilisateur", zone_log="session")
 ```
 
 Technologies :
 - logging : Module Python standard pour les logs
 - RotatingFileHandler : Rotation automatique des fichiers
+- QueueHandler / QueueListener : Écriture des fichiers hors des threads des requêtes
 - PyMongo : Client MongoDB pour Python
 - datetime : Gestion des horodatages UTC
 
@@ -49,6 +88,401 @@ WARNING = logging.WARNING   # Niveau 30 - Avertissements
 INFO = logging.INFO         # Niveau 20 - Informations générales
 DEBUG = logging.DEBUG       # Niveau 10 - Informations de débogage
 
+# Correspondance des noms de niveaux (configuration par variables d'environnement)
+NIVEAUX: Dict[str, int] = {'ERROR': ERROR, 'WARNING': WARNING, 'INFO': INFO, 'DEBUG': DEBUG}
+
+
+def lire_niveaux_zones(configuration: str) -> Dict[str, int]:
+    """
+    Lit les niveaux par zone d'une configuration "zone=NIVEAU,zone=NIVEAU".
+
+    Les entrées mal formées ou de niveau inconnu sont ignorées.
+    """
+    niveaux: Dict[str, int] = {}
+    for entree in configuration.split(','):
+        zone, _, nom = entree.partition('=')
+        if zone.strip() and nom.strip().upper() in NIVEAUX:
+            niveaux[zone.strip()] = NIVEAUX[nom.strip().upper()]
+    return niveaux
+
+# ====================================================================
+# CONTEXTE DE REQUÊTE
+# ====================================================================
+
+# Contexte de la requête en cours (id_requete, utilisateur, endpoint, requetes_bdd),
+# ouvert par l'application au début de chaque requête
+contexte_requete: ContextVar[Dict[str, Any] | None] = ContextVar('contexte_requete', default=None)
+
+
+def contexte_courant() -> Dict[str, Any]:
+    """Copie du contexte de la requête en cours (vide hors requête)."""
+    contexte = contexte_requete.get()
+    return dict(contexte) if contexte else {}
+
+
+def compter_requete_bdd(*_args: Any, **_kwargs: Any) -> None:
+    """Écouteur before_cursor_execute : compte les requêtes SQL de la requête en cours."""
+    contexte = contexte_requete.get()
+    if contexte is not None:
+        contexte['requetes_bdd'] = contexte.get('requetes_bdd', 0) + 1
+
+
+class FormatJSON(logging.Formatter):
+    """
+    Formate un enregistrement en une ligne JSON : horodatage UTC, niveau, fichier,
+    message, contexte de la requête et champs complémentaires du log.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entree: Dict[str, Any] = {
+            'horodatage': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'niveau': record.levelname,
+            'fichier': record.name,
+            'message': record.getMessage()
+        }
+        entree.update(getattr(record, 'contexte', None) or {})
+        entree.update(getattr(record, 'champs', None) or {})
+        # Trace d'exception : exc_info dans le thread d'origine, exc_text après le passage par la file
+        exception = self.formatException(record.exc_info) if record.exc_info else record.exc_text
+        if exception:
+            entree['exception'] = exception
+        return json.dumps(entree, ensure_ascii=False, default=str)
+
+
+class ExpediteurMongo:
+    """
+    Envoi asynchrone des entrées de log vers MongoDB, par lots.
+
+    Les threads des requêtes déposent les entrées dans une file bornée ; un thread
+    d'arrière-plan les insère par lots (insert_many) dès que le lot est complet ou
+    que le délai d'envoi est écoulé. File pleine : l'entrée est abandonnée (après
+    attente_max secondes) et comptée. Un lot dont l'insertion échoue est compté
+    et abandonné. La file est vidée à l'arrêt du processus.
+
+    Args:
+        collection: Collection MongoDB de destination
+        taille_file (int): Nombre maximal d'entrées en attente
+        taille_lot (int): Nombre maximal d'entrées par insert_many
+        delai_envoi (float): Délai maximal en secondes avant l'envoi d'un lot incomplet
+        attente_max (float): Attente maximale d'une place dans la file pleine (0 : abandon immédiat)
+    """
+
+    _FIN = object()  # Marqueur d'arrêt déposé dans la file
+
+    def __init__(self, collection: Any, taille_file: int = 10000, taille_lot: int = 200,
+                 delai_envoi: float = 1.0, attente_max: float = 0.0) -> None:
+        self.collection = collection
+        self.taille_lot = taille_lot
+        self.delai_envoi = delai_envoi
+        self.attente_max = attente_max
+        self._file: Queue[Any] = Queue(maxsize=taille_file)
+        self._arret = Event()
+        self._verrou = Lock()
+        self._compteurs: Dict[str, int] = {'soumises': 0, 'envoyees': 0, 'lots': 0,
+                                           'abandonnees': 0, 'perdues_erreur_envoi': 0}
+        self._thread = Thread(target=self._boucle, name='acfc-logs-mongo', daemon=True)
+        self._thread.start()
+        atexit.register(self.arreter)
+
+    def _compter(self, compteur: str, nombre: int = 1) -> None:
+        with self._verrou:
+            self._compteurs[compteur] += nombre
+
+    def soumettre(self, entree: Dict[str, Any]) -> bool:
+        """
+        Dépose une entrée dans la file d'envoi (seul coût supporté par la requête).
+
+        Returns:
+            bool: False si l'entrée a été abandonnée (file pleine ou expéditeur arrêté)
+        """
+        if self._arret.is_set():
+            self._compter('abandonnees')
+            return False
+        try:
+            if self.attente_max > 0:
+                self._file.put(entree, timeout=self.attente_max)
+            else:
+                self._file.put_nowait(entree)
+        except Full:
+            self._compter('abandonnees')
+            return False
+        self._compter('soumises')
+        return True
+
+    def _prendre_lot(self) -> List[Any]:
+        """Attend une première entrée puis complète le lot jusqu'à sa taille ou l'échéance."""
+        lot: List[Any] = []
+        echeance: float | None = None
+        while len(lot) < self.taille_lot:
+            delai = self.delai_envoi if echeance is None else echeance - monotonic()
+            if delai <= 0:
+                break
+            try:
+                entree = self._file.get(timeout=delai)
+            except Empty:
+                break
+            lot.append(entree)
+            if entree is self._FIN:
+                break
+            if echeance is None:
+                echeance = monotonic() + self.delai_envoi
+        return lot
+
+    def _envoyer(self, lot: List[Any]) -> None:
+        """Insère un lot d'entrées ; en cas d'échec, le lot est compté comme perdu."""
+        entrees = [entree for entree in lot if entree is not self._FIN]
+        try:
+            if entrees:
+                self.collection.insert_many(entrees, ordered=False)
+                self._compter('envoyees', len(entrees))
+                self._compter('lots')
+        except Exception as e:
+            # Pas de log applicatif ici : l'erreur ne doit pas reboucler vers MongoDB
+            self._compter('perdues_erreur_envoi', len(entrees))
+            print(f"Erreur lors de l'écriture des logs en base: {e}")
+        finally:
+            for _ in lot:
+                self._file.task_done()
+
+    def _boucle(self) -> None:
+        """Thread d'envoi : traite les lots jusqu'à l'arrêt, puis vide la file."""
+        while True:
+            lot = self._prendre_lot()
+            if lot:
+                self._envoyer(lot)
+            if self._arret.is_set() and self._file.empty():
+                return
+
+    def vider(self) -> None:
+        """Attend l'envoi (ou l'abandon) de toutes les entrées en attente."""
+        self._file.join()
+
+    def arreter(self, delai: float = 5.0) -> None:
+        """Arrête le thread d'envoi après avoir vidé la file (attente bornée à delai secondes)."""
+        if self._arret.is_set():
+            return
+        self._arret.set()
+        try:
+            self._file.put_nowait(self._FIN)  # Réveille le thread sans attendre le délai d'envoi
+        except Full:
+            pass
+        self._thread.join(delai)
+
+    def statistiques(self) -> Dict[str, Any]:
+        """
+        Retourne les compteurs d'envoi pour la supervision.
+
+        Returns:
+            Dict[str, Any]: soumises, envoyees, lots, abandonnees,
+            perdues_erreur_envoi et en_attente
+        """
+        with self._verrou:
+            stats: Dict[str, Any] = dict(self._compteurs)
+        stats['en_attente'] = self._file.qsize()
+        return stats
+
+
+class FileAttenteHandler(QueueHandler):
+    """
+    QueueHandler sur file bornée : attente limitée lorsque la file est pleine, puis abandon.
+
+    Compte les enregistrements ayant dû attendre une place (bloques) et ceux
+    abandonnés (abandonnes).
+
+    Args:
+        file (Queue): File partagée avec le QueueListener
+        attente_max (float): Attente maximale en secondes d'une place dans la file pleine
+    """
+
+    def __init__(self, file: 'Queue[Any]', attente_max: float = 1.0) -> None:
+        super().__init__(file)
+        self.attente_max = attente_max
+        self.compteurs: Dict[str, int] = {'bloques': 0, 'abandonnes': 0}
+        self._verrou_compteurs = Lock()
+        self._format_exception = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Copie transmissible à la file : message formaté sans la trace d'exception, qui est
+        # conservée à part (exc_text) pour le champ 'exception' du format JSON. Le contexte
+        # est lu dans le thread de la requête, avant le passage par la file.
+        exception = record.exc_text
+        if record.exc_info:
+            exception = self._format_exception.formatException(record.exc_info)
+        message = record.getMessage()
+        record = copy.copy(record)
+        record.message = message
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exception
+        record.contexte = contexte_courant()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except Full:
+            pass
+        with self._verrou_compteurs:
+            self.compteurs['bloques'] += 1
+        try:
+            if self.attente_max > 0:
+                self.queue.put(record, timeout=self.attente_max)
+                return
+        except Full:
+            pass
+        with self._verrou_compteurs:
+            self.compteurs['abandonnes'] += 1
+
+    def statistiques(self) -> Dict[str, int]:
+        """Retourne les compteurs bloques et abandonnes."""
+        with self._verrou_compteurs:
+            return dict(self.compteurs)
+
+
+class AiguillageFichiers(logging.Handler):
+    """Handler du QueueListener : transmet chaque enregistrement au fichier de son logger."""
+
+    def __init__(self, fichiers: Dict[str, RotatingFileHandler]) -> None:
+        super().__init__()
+        self.fichiers = fichiers
+
+    def handle(self, record: logging.LogRecord) -> bool:  # type: ignore[override]
+        fichier = self.fichiers.get(record.name)
+        if fichier is not None:
+            fichier.handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.handle(record)
+
+
+class RegistreLoggers:
+    """
+    Registre des loggers fichiers : un logger et un seul fichier rotatif par nom de fichier.
+
+    Chaque logger est construit au premier usage puis réutilisé. Le nombre de
+    fichiers de zone ouverts est plafonné pour borner les descripteurs de fichiers.
+
+    Les loggers ne font que déposer leurs enregistrements dans une file bornée
+    (FileAttenteHandler) ; un unique QueueListener les écrit dans les fichiers
+    rotatifs. La rotation et les lenteurs disque ne pèsent plus sur les requêtes.
+
+    Args:
+        repertoire (str): Répertoire des fichiers de logs
+        max_fichiers_zones (int): Nombre maximal de fichiers de zone ouverts
+        taille_file (int): Nombre maximal d'enregistrements en attente d'écriture
+        attente_max (float): Attente maximale d'une place dans la file pleine
+        format_json (bool): Lignes JSON (FormatJSON) au lieu du format texte
+    """
+
+    def __init__(self, repertoire: str, max_fichiers_zones: int = 32,
+                 taille_file: int = 10000, attente_max: float = 1.0, format_json: bool = True) -> None:
+        self.repertoire = repertoire
+        self.format_json = format_json
+        self.max_fichiers_zones = max_fichiers_zones
+        self._loggers: Dict[str, logging.Logger] = {}
+        self._zones: set[str] = set()
+        self._refus = 0
+        self._verrou = Lock()
+
+        self._file: Queue[Any] = Queue(maxsize=taille_file)
+        self._fichiers: Dict[str, RotatingFileHandler] = {}
+        self._handler_file = FileAttenteHandler(self._file, attente_max)
+        self._ecouteur = QueueListener(self._file, AiguillageFichiers(self._fichiers))
+        self._ecouteur.start()
+        self._actif = True
+        atexit.register(self.arreter)
+
+    def obtenir(self, filename: str, level: int) -> logging.Logger:
+        """
+        Retourne le logger du fichier, construit au premier appel.
+
+        Configuration :
+        - Rotation automatique : 5MB max par fichier, 3 sauvegardes
+        - Format : [timestamp] --niveau-- message
+
+        Args:
+            filename (str): Nom du fichier de log
+            level (int): Niveau minimum de logging (pris en compte à la création)
+        """
+        logger = self._loggers.get(filename)
+        if logger is not None:
+            return logger
+        with self._verrou:
+            logger = self._loggers.get(filename)
+            if logger is None:
+                logger = self._construire(filename, level)
+                self._loggers[filename] = logger
+            return logger
+
+    def obtenir_zone(self, filename: str, level: int) -> logging.Logger | None:
+        """
+        Retourne le logger d'un fichier de zone, dans la limite de max_fichiers_zones.
+
+        Returns:
+            Logger | None: Logger de la zone, None si le plafond est atteint
+        """
+        if filename not in self._zones:
+            with self._verrou:
+                if filename not in self._zones:
+                    if len(self._zones) >= self.max_fichiers_zones:
+                        self._refus += 1
+                        return None
+                    self._zones.add(filename)
+        return self.obtenir(filename, level)
+
+    def _construire(self, filename: str, level: int) -> logging.Logger:
+        """Ouvre le fichier rotatif et relie le logger à la file d'écriture."""
+        fichier = RotatingFileHandler(join_os(self.repertoire, filename), maxBytes=5*1024*1024, backupCount=3)
+        fichier.setFormatter(FormatJSON() if self.format_json
+                             else logging.Formatter('[%(asctime)s] --%(levelname)s-- %(message)s'))
+        self._fichiers[filename] = fichier
+
+        logger = logging.getLogger(filename)
+        logger.setLevel(level)
+        # Logger déjà relié (module rechargé) : les anciens handlers de file sont remplacés
+        for handler in [handler for handler in logger.handlers if isinstance(handler, FileAttenteHandler)]:
+            logger.removeHandler(handler)
+        logger.addHandler(self._handler_file)
+        return logger
+
+    def vider(self) -> None:
+        """Attend l'écriture de tous les enregistrements en attente."""
+        self._file.join()
+
+    def arreter(self) -> None:
+        """Écrit les enregistrements en attente, arrête le thread d'écriture et ferme les fichiers."""
+        if not self._actif:
+            return
+        self._actif = False
+        try:
+            self._ecouteur.stop()
+        except Full:
+            pass  # File saturée à l'arrêt : le thread (démon) s'arrête avec le processus
+        for fichier in list(self._fichiers.values()):
+            fichier.close()
+
+    def statistiques(self) -> Dict[str, int]:
+        """
+        Retourne l'état du registre pour la supervision.
+
+        Returns:
+            Dict[str, int]: loggers, zones, descripteurs (fichiers ouverts), zones_refusees
+            (plafond atteint), en_attente, bloques et abandonnes (file pleine)
+        """
+        with self._verrou:
+            stats = {
+                'loggers': len(self._loggers),
+                'zones': len(self._zones),
+                'descripteurs': sum(1 for fichier in self._fichiers.values() if fichier.stream is not None),
+                'zones_refusees': self._refus,
+                'en_attente': self._file.qsize()
+            }
+        stats.update(self._handler_file.statistiques())
+        return stats
+
 
 class CustomLogger:
     """
@@ -94,6 +528,13 @@ class CustomLogger:
             self.db = self.client[db_name]
             self.collection = self.db[collection_name]
             self.mongodb_available = True
+            self.expediteur: ExpediteurMongo | None = ExpediteurMongo(
+                self.collection,
+                taille_file=int(getenv('LOG_MONGO_TAILLE_FILE', '10000')),
+                taille_lot=int(getenv('LOG_MONGO_TAILLE_LOT', '200')),
+                delai_envoi=float(getenv('LOG_MONGO_DELAI_ENVOI', '1')),
+                attente_max=float(getenv('LOG_MONGO_ATTENTE_MAX', '0'))
+            )
         except (ConnectionFailure, ServerSelectionTimeoutError, Exception) as e:
             print(f"Avertissement: Impossible de se connecter à MongoDB: {e}")
             print("Le logging sera effectué uniquement dans les fichiers.")
@@ -101,34 +542,41 @@ class CustomLogger:
             self.client = None
             self.db = None
             self.collection = None
+            self.expediteur = None
         
+        # Niveaux minimaux : défaut et par zone (remplacés en bloc, lus sans verrou)
+        self.niveau_defaut: int = NIVEAUX.get(getenv('LOG_NIVEAU_MIN', 'DEBUG').upper(), DEBUG)
+        self.niveaux_zones: Dict[str, int] = lire_niveaux_zones(getenv('LOG_NIVEAUX_ZONES', ''))
+
+        # Registre des loggers fichiers (un handler par fichier, construit une seule fois)
+        self.registre = RegistreLoggers(join_os(dirname(abspath(__file__)), 'fichiers_logs'),
+                                        max_fichiers_zones=int(getenv('LOG_MAX_FICHIERS_ZONES', '32')),
+                                        taille_file=int(getenv('LOG_FICHIERS_TAILLE_FILE', '10000')),
+                                        attente_max=float(getenv('LOG_FICHIERS_ATTENTE_MAX', '1')),
+                                        format_json=getenv('LOG_FORMAT', 'json') != 'texte')
+
         # Création des loggers pour Error, Warning, Info, Debug
         self.error_logger = self._create_file_logger('error.log', ERROR)
         self.warning_logger = self._create_file_logger('warning.log', WARNING)
         self.info_logger = self._create_file_logger('info.log', INFO)
         self.debug_logger = self._create_file_logger('debug.log', DEBUG)
 
-    def _create_specific_logger(self, filepath: str, level: int = DEBUG):
+    def _create_specific_logger(self, filepath: str, level: int = DEBUG) -> logging.Logger | None:
         """
-        Crée un logger spécifique pour une zone fonctionnelle donnée.
+        Retourne le logger d'une zone fonctionnelle, créé au premier appel puis réutilisé.
         
         Args:
             filepath (str): Chemin du fichier de log spécifique
             level (int): Niveau de logging (DEBUG par défaut)
             
         Returns:
-            Logger: Instance de logger configurée pour le fichier spécifié
+            Logger | None: Logger de la zone, None si le plafond des fichiers de zone est atteint
         """
-        return self._create_file_logger(filepath, level)
+        return self.registre.obtenir_zone(filepath, level)
 
-    def _create_file_logger(self, filename: str, level: int):
+    def _create_file_logger(self, filename: str, level: int) -> logging.Logger:
         """
-        Crée et configure un logger pour écriture en fichier avec rotation.
-        
-        Configuration :
-        - Rotation automatique : 5MB max par fichier, 3 sauvegardes
-        - Format : [timestamp] --niveau-- message
-        - Handler : RotatingFileHandler pour gestion de l'espace disque
+        Retourne le logger d'un fichier par niveau (error.log, warning.log...).
         
         Args:
             filename (str): Nom du fichier de log
@@ -137,62 +585,93 @@ class CustomLogger:
         Returns:
             Logger: Instance de logger configurée et prête à l'emploi
         """
-        path_logs = join_os(dirname(abspath(__file__)), 'fichiers_logs', filename)
-        logger = logging.getLogger(filename)
-        logger.setLevel(level)
-        handler = RotatingFileHandler(path_logs, maxBytes=5*1024*1024, backupCount=3)
-        formatter = logging.Formatter('[%(asctime)s] --%(levelname)s-- %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+        return self.registre.obtenir(filename, level)
 
-    def _log_to_db(self, level: int, message: str, specific_logger: str | None = None, zone_log: str = "general"):
+    def _log_to_db(self, level: int, message: str, specific_logger: str | None = None, zone_log: str = "general",
+                   champs: Dict[str, Any] | None = None):
         """
         Enregistre un log dans la base de données MongoDB avec métadonnées.
         
         Crée une entrée structurée avec horodatage UTC et informations contextuelles
-        pour faciliter la recherche et l'analyse des logs.
+        pour faciliter la recherche et l'analyse des logs. L'entrée est seulement mise
+        en file : l'insertion est faite par lots par le thread de l'expéditeur.
         
         Args:
             level (int): Niveau de criticité du log (ERROR, WARNING, INFO, DEBUG)
             message (str): Message de log à enregistrer
             specific_logger (str | None): Nom du logger spécifique (optionnel)
             zone_log (str): Zone fonctionnelle d'origine du log (défaut: "general")
+            champs (Dict[str, Any] | None): Champs complémentaires de l'entrée (ex: duree_ms)
             
         Note:
             Si specific_logger est fourni, crée également un fichier de log dédié
             Si MongoDB n'est pas disponible, l'opération est ignorée silencieusement
+            Si la file d'envoi est pleine, l'entrée est abandonnée et comptée
         """
-        if not self.mongodb_available or self.collection is None:
+        if not self.mongodb_available or self.expediteur is None:
             # MongoDB non disponible, on ignore silencieusement
             return
             
-        try:
-            log_entry: dict[str, Any] = {
-                "level": level,
-                "message": message,
-                "timestamp": datetime.now(timezone.utc),
-                "zone": zone_log
-            }
-            self.collection.insert_one(log_entry)
-        except Exception as e:
-            # En cas d'erreur MongoDB, on continue sans interrompre l'application
-            print(f"Erreur lors de l'écriture du log en base: {e}")
+        log_entry: dict[str, Any] = {
+            "level": level,
+            "message": message,
+            "timestamp": datetime.now(timezone.utc),
+            "zone": zone_log
+        }
+        log_entry.update(contexte_courant())
+        log_entry.update(champs or {})
+        self.expediteur.soumettre(log_entry)
+
+    def statistiques(self) -> Dict[str, Any]:
+        """Retourne les compteurs d'envoi MongoDB et l'état des fichiers de logs pour la supervision."""
+        return {'mongodb': self.expediteur.statistiques() if self.expediteur is not None else None,
+                'fichiers': self.registre.statistiques(),
+                'niveaux': self.niveaux()}
+
+    def definir_niveau(self, level: int, zone_log: str | None = None) -> None:
+        """
+        Modifie à chaud le niveau minimal d'une zone (ou le niveau par défaut si zone_log est None).
+
+        Args:
+            level (int): Niveau minimal (ERROR, WARNING, INFO, DEBUG)
+            zone_log (str | None): Zone concernée, None pour le niveau par défaut
+        """
+        if zone_log is None:
+            self.niveau_defaut = level
+        else:
+            self.niveaux_zones = {**self.niveaux_zones, zone_log: level}
+
+    def est_actif(self, level: int, zone_log: str = "general") -> bool:
+        """Indique si un message de ce niveau sera émis pour la zone (garde des traces coûteuses)."""
+        return level >= self.niveaux_zones.get(zone_log, self.niveau_defaut)
+
+    def niveaux(self) -> Dict[str, Any]:
+        """Niveaux minimaux en vigueur : défaut et zones configurées (noms de niveaux)."""
+        return {'defaut': logging.getLevelName(self.niveau_defaut),
+                'zones': {zone: logging.getLevelName(niveau) for zone, niveau in self.niveaux_zones.items()}}
 
-    def log_to_file(self, level: int, message: str, specific_logger: str | None = None,
-                    zone_log: str = "general", db_log: bool = False):
+    def log_to_file(self, level: int, message: str, *args: Any, specific_logger: str | None = None,
+                    zone_log: str = "general", db_log: bool = False, champs: Dict[str, Any] | None = None,
+                    exc_info: bool = False):
         """
         Enregistre un log dans les fichiers appropriés selon le niveau de criticité.
         
         Distribue automatiquement le message vers le fichier de log correspondant
         au niveau de criticité. Optionnellement, peut aussi enregistrer en base.
+
+        Un message sous le niveau minimal de sa zone est ignoré sans être formaté :
+        les arguments args ne sont insérés dans le message (message % args) que
+        si le log est émis.
         
         Args:
             level (int): Niveau de criticité (ERROR, WARNING, INFO, DEBUG)
-            message (str): Message à enregistrer
+            message (str): Message à enregistrer (format %s si args est fourni)
+            *args (Any): Arguments du message, formatés seulement si le log est émis
             specific_logger (str | None): Nom du logger spécifique (optionnel)
             zone_log (str): Zone fonctionnelle (défaut: "general")
             db_log (bool): Si True, enregistre aussi en base MongoDB (défaut: False)
+            champs (Dict[str, Any] | None): Champs structurés ajoutés à l'entrée (ex: duree_ms)
+            exc_info (bool): Si True, joint la trace de l'exception en cours (champ 'exception')
             
         Comportement :
         - ERROR : Écrit dans error.log
@@ -201,23 +680,37 @@ class CustomLogger:
         - DEBUG : Écrit dans debug.log
         - Si specific_logger fourni : Écrit aussi dans le fichier spécifique
         """
+        if not self.est_actif(level, zone_log):
+            return
+        if args:
+            try:
+                message = message % args
+            except (TypeError, ValueError):
+                message = f'{message} {args!r}'
+
         # Log dans la base de données si demandé
         if db_log: 
-            self._log_to_db(level, message, zone_log)
+            self._log_to_db(level, message, zone_log=zone_log,
+                            champs={**(champs or {}), 'exception': format_exc()} if exc_info else champs)
         
+        # Champs structurés repris par le format JSON des fichiers
+        extra = {'champs': {'zone': zone_log, **(champs or {})}}
+
         # Distribution vers les fichiers de logs par niveau
         if level == logging.ERROR:
-            self.error_logger.error(message)
+            self.error_logger.error(message, extra=extra, exc_info=exc_info)
         elif level == logging.WARNING:
-            self.warning_logger.warning(message)
+            self.warning_logger.warning(message, extra=extra, exc_info=exc_info)
         elif level == logging.INFO:
-            self.info_logger.info(message)
+            self.info_logger.info(message, extra=extra, exc_info=exc_info)
         elif level == logging.DEBUG:
-            self.debug_logger.debug(message)
+            self.debug_logger.debug(message, extra=extra, exc_info=exc_info)
 
         # Log additionnel dans un fichier spécifique si demandé
         if specific_logger:
-            self._create_specific_logger(specific_logger).log(level, message)
+            logger_zone = self._create_specific_logger(specific_logger)
+            if logger_zone is not None:
+                logger_zone.log(level, message, extra=extra, exc_info=exc_info)
 
 # Création du logger personnalisé
 acfc_log = CustomLogger(
@@ -109,3 +109,11 @@ SOURCE docker-entrypoint-initdb.d/prepare_base_datas/cp_villes/91_villes.sql;
 -- Insertion du catalogue de produits préformaté
 -- Note: Ce fichier contient les données du catalogue
 SOURCE docker-entrypoint-initdb.d/prepare_base_datas/catalogue/21_catalogue.sql;
+
+-- ========================================
+-- INDEX DE PERFORMANCE
+-- ========================================
+
+-- Les tables métier et leurs index composites (__table_args__) sont créés par les
+-- modèles SQLAlchemy au démarrage de l'application, après ce script.
+-- Base existante : python -m app_acfc.index_bdd --appliquer
@@ -86,8 +86,8 @@ def test_recherche_avancee_particulier(client, sample_data):
     assert response.status_code == 200
     
     data = json.loads(response.data)
-    assert len(data) > 0
-    assert any(result['nom_affichage'] == 'Jean Dupont' for result in data)
+    assert len(data['clients']) > 0
+    assert any(result['nom_affichage'] == 'Jean Dupont' for result in data['clients'])
 
 
 def test_recherche_avancee_professionnel(client, sample_data):
@@ -96,8 +96,8 @@ def test_recherche_avancee_professionnel(client, sample_data):
     assert response.status_code == 200
     
     data = json.loads(response.data)
-    assert len(data) > 0
-    assert any(result['nom_affichage'] == 'ACME Corporation' for result in data)
+    assert len(data['clients']) > 0
+    assert any(result['nom_affichage'] == 'ACME Corporation' for result in data['clients'])
 
 
 def test_recherche_avancee_adresse(client, sample_data):
@@ -106,8 +106,21 @@ def test_recherche_avancee_adresse(client, sample_data):
     assert response.status_code == 200
     
     data = json.loads(response.data)
-    assert len(data) > 0
-    assert any(result['code_postal'] == '75001' for result in data)
+    assert len(data['clients']) > 0
+    assert any(result['code_postal'] == '75001' for result in data['clients'])
+
+
+def test_recherche_avancee_tous_champs(client, sample_data):
+    """Test de recherche dans tous les champs (une ligne par client, champ correspondant)."""
+    response = client.get('/clients/recherche_avancee?q=Paris&type=tous')
+    assert response.status_code == 200
+    
+    data = json.loads(response.data)
+    ids = [result['id'] for result in data['clients']]
+    assert len(ids) == len(set(ids))
+    assert sample_data['client_part_id'] in ids
+    assert all(result['champ_correspondant'] == 'adresse' for result in data['clients']
+               if result['id'] in sample_data.values())
 
 
 def test_recherche_avancee_terme_trop_court(client):
@@ -116,7 +129,8 @@ def test_recherche_avancee_terme_trop_court(client):
     assert response.status_code == 200
     
     data = json.loads(response.data)
-    assert len(data) == 0  # Aucun résultat pour moins de 3 caractères
+    assert len(data['clients']) == 0  # Aucun résultat pour moins de 3 caractères
+    assert data['has_more'] is False
 
 
 def test_recherche_avancee_sans_resultat(client):
@@ -125,4 +139,4 @@ def test_recherche_avancee_sans_resultat(client):
     assert response.status_code == 200
     
     data = json.loads(response.data)
-    assert len(data) == 0
+    assert len(data['clients']) == 0
@@ -0,0 +1,49 @@
+"""
+Fixtures communes des tests ACFC
+================================
+
+Base SQLite en mémoire limitée aux tables demandées par chaque test : le
+module de test ne garde que ses propres données d'amorçage.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def base_sqlite():
+    """
+    Fabrique de bases SQLite en mémoire.
+
+    ``base_sqlite(Client, Adresse, ...)`` crée les tables des modèles donnés
+    (dans l'ordre, pour les clés étrangères) et retourne la fabrique de
+    sessions liée, son moteur dans ``fabrique.engine`` ; ``ids_fiscaux=True``
+    y attache l'attribution des identifiants fiscaux après flush. Les moteurs
+    sont fermés en fin de test.
+    """
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+
+    moteurs = []
+
+    def creer(*modeles, ids_fiscaux: bool = False) -> sessionmaker:
+        engine = create_engine('sqlite://')
+        for modele in modeles:
+            modele.__table__.create(bind=engine)
+        fabrique = sessionmaker(bind=engine)
+        fabrique.engine = engine
+        if ids_fiscaux:
+            from app_acfc.modeles import attribuer_ids_fiscaux
+            event.listen(fabrique, 'after_flush', attribuer_ids_fiscaux)
+        moteurs.append(engine)
+        return fabrique
+
+    yield creer
+    for engine in moteurs:
+        engine.dispose()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests du Cache Applicatif
+=========================
+
+Vérifie le comportement du cache des fragments du tableau de bord :
+éviction LRU, expiration, invalidation et compteurs de succès/échecs.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from app_acfc.cache import CacheMemoire, CacheApplication, creer_cache
+    from logs.logger import WARNING
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module de cache: {e}", allow_module_level=True)
+
+
+@pytest.mark.unit
+class TestCacheMemoire:
+    """Tests du backend LRU en mémoire."""
+
+    def test_eviction_lru(self) -> None:
+        """L'entrée la moins récemment utilisée est évincée."""
+        cache = CacheMemoire(taille_max=2)
+        cache.ecrire('a', 1, 60)
+        cache.ecrire('b', 2, 60)
+        cache.lire('a')             # 'a' devient la plus récente
+        cache.ecrire('c', 3, 60)    # 'b' est évincée
+
+        assert cache.lire('a') == (True, 1)
+        assert cache.lire('b') == (False, None)
+        assert cache.lire('c') == (True, 3)
+
+    def test_expiration(self) -> None:
+        """Une entrée expirée n'est plus servie."""
+        cache = CacheMemoire()
+        with patch('app_acfc.cache.monotonic', return_value=100.0):
+            cache.ecrire('a', 1, 10)
+        with patch('app_acfc.cache.monotonic', return_value=111.0):
+            assert cache.lire('a') == (False, None)
+        assert cache.taille() == 0
+
+
+@pytest.mark.unit
+class TestCacheApplication:
+    """Tests de la façade de cache et de ses compteurs."""
+
+    def test_hits_misses(self) -> None:
+        """Le calcul n'est exécuté qu'au premier accès."""
+        cache = CacheApplication(CacheMemoire())
+        calcul = Mock(return_value=[1, 2, 3])
+
+        assert cache.obtenir('cle', calcul) == [1, 2, 3]
+        assert cache.obtenir('cle', calcul) == [1, 2, 3]
+        calcul.assert_called_once()
+
+        stats = cache.statistiques()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_ratio'] == 0.5
+        assert stats['backend'] == 'memoire'
+
+    def test_none_non_mis_en_cache(self) -> None:
+        """Un calcul en erreur (None) est retenté au prochain accès."""
+        cache = CacheApplication(CacheMemoire())
+        calcul = Mock(return_value=None)
+
+        cache.obtenir('cle', calcul)
+        cache.obtenir('cle', calcul)
+        assert calcul.call_count == 2
+
+    def test_invalidation(self) -> None:
+        """Une clé invalidée est recalculée."""
+        cache = CacheApplication(CacheMemoire())
+        calcul = Mock(side_effect=['ancien', 'nouveau'])
+
+        assert cache.obtenir('cle', calcul) == 'ancien'
+        cache.invalider('cle')
+        assert cache.obtenir('cle', calcul) == 'nouveau'
+        assert cache.statistiques()['invalidations'] == 1
+
+    def test_invalidation_pendant_le_calcul(self) -> None:
+        """Une valeur calculée avant une invalidation est retournée mais pas mise en cache."""
+        cache = CacheApplication(CacheMemoire())
+
+        def calcul_concurrent() -> str:
+            cache.invalider('cle')  # Mutation commitée pendant le calcul
+            return 'ancien'
+
+        assert cache.obtenir('cle', calcul_concurrent) == 'ancien'
+        assert cache.obtenir('cle', Mock(return_value='nouveau')) == 'nouveau'
+        assert cache.obtenir('cle', Mock(return_value='autre')) == 'nouveau'
+        assert cache.statistiques()['obsoletes'] == 1
+
+    def test_repli_redis_indisponible(self) -> None:
+        """Redis indisponible : repli sur le cache mémoire, avertissement journalisé."""
+        with patch.dict(os.environ, {'CACHE_BACKEND': 'redis'}), \
+             patch('app_acfc.cache.CacheRedis', side_effect=RuntimeError('redis absent')), \
+             patch('app_acfc.cache.acfc_log') as journal:
+            cache = creer_cache()
+
+        assert cache.backend.nom == 'memoire'
+        assert journal.log_to_file.call_args.kwargs['level'] == WARNING
+        assert journal.log_to_file.call_args.kwargs['zone_log'] == 'cache'
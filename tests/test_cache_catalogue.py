@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests de l'Instantané du Catalogue
+==================================
+
+Vérifie le calcul des valeurs de filtres de l'instantané et son rechargement
+limité aux changements de version du catalogue.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from sqlalchemy.dialects import mysql
+    from app_acfc.cache_catalogue import CacheCatalogue, charger_instantane, lire_version
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module cache_catalogue: {e}", allow_module_level=True)
+
+
+def produit(id: int, millesime: int, type_produit: str, geographie: str) -> SimpleNamespace:
+    """Ligne de catalogue minimale."""
+    return SimpleNamespace(id=id, type_produit=type_produit, stype_produit=f'{type_produit} 20g',
+                           millesime=millesime, prix_unitaire_ht=Decimal('1.29'), geographie=geographie,
+                           ref_auto=f'REF{id}', des_auto=f'DES{id}')
+
+
+@pytest.mark.unit
+class TestCacheCatalogue:
+    """Tests de l'instantané et de sa version."""
+
+    def test_valeurs_filtres(self) -> None:
+        """Les filtres sont les valeurs distinctes triées, les produits sont indexés par identifiant."""
+        db_session = Mock()
+        db_session.scalars.return_value.all.return_value = [
+            produit(3, 2025, 'Courrier', 'FRANCE'), produit(2, 2024, 'Colis', 'MONDE'),
+            produit(1, 2025, 'Courrier', 'FRANCE')]
+
+        instantane = charger_instantane(db_session, (datetime(2025, 1, 1), 3, 0))
+
+        assert instantane.millesimes == (2025, 2024)
+        assert instantane.types_produit == ('Colis', 'Courrier')
+        assert instantane.geographies == ('FRANCE', 'MONDE')
+        assert instantane.par_id[2].des_auto == 'DES2'
+        db_session.scalars.assert_called_once()
+
+    def test_version_somme_de_controle(self) -> None:
+        """La version porte une somme de contrôle du contenu, en plus de la date et du nombre de lignes."""
+        db_session = Mock()
+        db_session.execute.return_value.one.return_value = (datetime(2025, 1, 1), 3, Decimal('123'))
+
+        assert lire_version(db_session) == (datetime(2025, 1, 1), 3, 123)
+        sql = str(db_session.execute.call_args[0][0].compile(dialect=mysql.dialect()))
+        assert 'sum(crc32(concat_ws(' in sql.lower()
+
+    def test_rechargement_sur_version(self) -> None:
+        """Aucune requête dans l'intervalle, rechargement uniquement si la version change."""
+        cache = CacheCatalogue(intervalle_verification=60)
+        horloge = [100.0]
+        versions = iter([(datetime(2025, 1, 1), 3, 7), (datetime(2025, 1, 1), 3, 7), (datetime(2025, 1, 1), 3, 9)])
+        with patch('app_acfc.cache_catalogue.lire_version', side_effect=lambda s: next(versions)) as lire, \
+             patch('app_acfc.cache_catalogue.charger_instantane',
+                   side_effect=lambda s, v: SimpleNamespace(version=v, produits=())) as charger, \
+             patch('app_acfc.cache_catalogue.monotonic', side_effect=lambda: horloge[0]):
+            premier = cache.obtenir(Mock())          # Chargement initial
+            horloge[0] = 110.0
+            assert cache.obtenir(Mock()) is premier  # Dans l'intervalle : aucune requête
+            horloge[0] = 200.0
+            assert cache.obtenir(Mock()) is premier  # Version inchangée : pas de rechargement
+            horloge[0] = 300.0
+            dernier = cache.obtenir(Mock())          # Nouvelle version : rechargement
+
+        assert lire.call_count == 3
+        assert charger.call_count == 2
+        assert dernier.version == (datetime(2025, 1, 1), 3, 9)  # Même seconde, contenu modifié
+        assert cache.statistiques()['hits'] == 1
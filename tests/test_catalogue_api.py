@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests de l'API JSON du Catalogue
+================================
+
+Vérifie le calcul des filtres à facettes sur l'instantané du catalogue et la
+revalidation des réponses par ETag.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from flask import Flask
+    from app_acfc.cache_catalogue import InstantaneCatalogue, ProduitCatalogue, filtrer_catalogue
+    from app_acfc.contextes_bp import catalogue as catalogue_module
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module catalogue: {e}", allow_module_level=True)
+
+
+def instantane_test() -> InstantaneCatalogue:
+    """Instantané de 4 produits sur 2 millésimes, 2 types et 2 géographies."""
+    produits = tuple(ProduitCatalogue(id=i, type_produit=type_produit, stype_produit='', millesime=millesime,
+                                      prix_unitaire_ht=Decimal('1.29'), geographie=geographie,
+                                      ref_auto=f'REF{i}', des_auto=f'DES{i}')
+                     for i, (millesime, type_produit, geographie) in enumerate(
+                         [(2025, 'Courrier', 'FRANCE'), (2025, 'Courrier', 'MONDE'),
+                          (2025, 'Colis', 'FRANCE'), (2024, 'Courrier', 'FRANCE')], start=1))
+    return InstantaneCatalogue(version=(datetime(2025, 1, 1), 4), produits=produits, millesimes=(2025, 2024),
+                               types_produit=('Colis', 'Courrier'), geographies=('FRANCE', 'MONDE'),
+                               par_id={p.id: p for p in produits})
+
+
+@pytest.mark.unit
+class TestCatalogueApi:
+    """Tests des facettes et de l'ETag."""
+
+    def test_facettes(self) -> None:
+        """Chaque facette est comptée avec les filtres des autres facettes seulement."""
+        produits, facettes = filtrer_catalogue(instantane_test(), {'millesime': 2025, 'type_produit': 'Courrier'})
+
+        assert [p.id for p in produits] == [1, 2]
+        assert facettes['millesime'] == {'2025': 2, '2024': 1}
+        assert facettes['type_produit'] == {'Courrier': 2, 'Colis': 1}
+        assert facettes['geographie'] == {'FRANCE': 1, 'MONDE': 1}
+
+    def test_etag_304(self) -> None:
+        """Une requête portant l'ETag courant reçoit un 304 sans contenu."""
+        app = Flask(__name__)
+        app.secret_key = 'test'
+        app.register_blueprint(catalogue_module.catalogue_bp)
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['habilitations'] = '3'
+
+        with patch.object(catalogue_module, 'SessionBdD', Mock()), \
+             patch.object(catalogue_module.cache_catalogue, 'obtenir', return_value=instantane_test()):
+            reponse = client.get('/catalogue/api/produits?geographie=MONDE')
+            assert reponse.status_code == 200
+            assert reponse.get_json()['total'] == 1
+
+            reponse_304 = client.get('/catalogue/api/produits?geographie=MONDE',
+                                     headers={'If-None-Match': reponse.headers['ETag']})
+            assert reponse_304.status_code == 304
+            assert reponse_304.data == b''
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests de l'Historique et des Onglets de la Fiche Client
+=======================================================
+
+Vérifie la pagination par curseur de l'historique des commandes d'un client,
+le calcul des compteurs affichés sur les onglets et le contenu des onglets
+chargés à la demande.
+
+Les tables nécessaires sont créées dans une base SQLite en mémoire.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from datetime import date
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from app_acfc.modeles import Client, Adresse, Commande, Facture, Telephone, Mail
+    from app_acfc.pagination import decoder_curseur
+    from app_acfc.contextes_bp import clients as clients_module
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module clients: {e}", allow_module_level=True)
+
+
+@pytest.fixture
+def db_session(base_sqlite):
+    """Session SQLite en mémoire : client 1 avec 5 commandes (dont 1 annulée et 1 expédiée), client 2 avec 1."""
+    session = base_sqlite(Client, Adresse, Commande, Facture, Telephone, Mail)()
+    session.add_all([Client(id=1, type_client=1, created_at=date.today()),
+                     Client(id=2, type_client=1, created_at=date.today())])
+    jours = [date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 2), date(2025, 1, 3), date(2025, 1, 4)]
+    for i, jour in enumerate(jours, start=1):
+        session.add(Commande(id=i, id_client=1, date_commande=jour, montant=10,
+                             is_annulee=i == 1, is_expedie=i == 2))
+    session.add(Commande(id=6, id_client=2, date_commande=date(2025, 1, 5), montant=10))
+    session.add_all([Telephone(id=1, id_client=1, type_telephone='fixe_pro', telephone='0102030405', is_principal=False),
+                     Telephone(id=2, id_client=1, type_telephone='fixe_pro', telephone='0607080910', is_principal=True),
+                     Telephone(id=3, id_client=2, type_telephone='fixe_pro', telephone='0911121314', is_principal=True)])
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.mark.unit
+class TestHistoriqueClient:
+    """Tests de la page d'historique et des totaux."""
+
+    def test_pages_successives(self, db_session) -> None:
+        """Les pages s'enchaînent sans doublon, de la plus récente à la plus ancienne."""
+        ids = []
+        curseur = None
+        while True:
+            page = clients_module.page_historique(db_session, Commande, Commande.date_commande, 1,
+                                                  limit=2, after=curseur)
+            ids.extend(c.id for c in page['items'])
+            if not page['next_cursor']:
+                break
+            curseur = decoder_curseur(page['next_cursor'])
+        assert ids == [5, 4, 3, 2, 1]
+
+    def test_compteurs_onglets(self, db_session) -> None:
+        """Compteurs du client seul ; les commandes en cours excluent expédiées et annulées."""
+        compteurs = clients_module.compter_contexte_client(db_session, 1)
+        assert compteurs == {'telephones': 2, 'telephones_principaux': 1, 'emails': 0, 'emails_principaux': 0,
+                             'adresses': 0, 'adresses_principales': 0, 'commandes': 5,
+                             'commandes_en_cours': 3, 'factures': 0}
+
+    def test_contenu_onglet_contacts(self, db_session) -> None:
+        """L'onglet téléphones ne charge que les numéros du client, le principal en premier."""
+        contenu = clients_module.contenu_onglet(db_session, 'telephones', 1)
+        assert [t.id for t in contenu['telephones']] == [2, 1]
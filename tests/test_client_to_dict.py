@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests de la Sérialisation des Clients
+=====================================
+
+Vérifie que la sérialisation d'une liste de clients (to_dict) s'effectue en un
+nombre constant de requêtes, quel que soit le nombre de clients (pas de N+1 sur
+le nom et l'adresse principale).
+
+Les tables nécessaires sont créées dans une base SQLite en mémoire.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from datetime import date
+from typing import List
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from sqlalchemy import event, select
+    from app_acfc.modeles import Client, Part, Pro, Adresse
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer les modèles: {e}", allow_module_level=True)
+
+
+@pytest.fixture
+def db_session(base_sqlite):
+    """Session SQLite en mémoire avec 30 clients (particuliers et professionnels) et leurs adresses."""
+    fabrique = base_sqlite(Client, Part, Pro, Adresse)
+
+    with fabrique() as session:
+        for i in range(30):
+            client = Client(id=i + 1, type_client=1 if i % 2 else 2, is_active=True, created_at=date.today())
+            session.add(client)
+            if i % 2:
+                session.add(Part(id_client=client.id, prenom=f'Prénom{i}', nom=f'Nom{i}'))
+            else:
+                session.add(Pro(id_client=client.id, raison_sociale=f'Société {i}', type_pro=1))
+            session.add(Adresse(id_client=client.id, adresse_l1='1 rue A', code_postal='75001',
+                                ville='Ancienne', is_active=False, created_at=date.today()))
+            session.add(Adresse(id_client=client.id, adresse_l1='2 rue B', code_postal=f'{69000 + i}',
+                                ville='Lyon', is_active=True, created_at=date.today()))
+        session.commit()
+
+    requetes: List[str] = []
+    event.listen(fabrique.engine, 'before_cursor_execute', lambda *args: requetes.append(args[2]))
+    with fabrique() as session:
+        session.requetes = requetes
+        yield session
+
+
+@pytest.mark.unit
+class TestSerialisationClients:
+    """Tests du nombre de requêtes de la sérialisation des clients."""
+
+    def test_nombre_de_requetes_constant(self, db_session) -> None:
+        """Clients + particuliers + professionnels : 3 requêtes pour 30 clients."""
+        clients = db_session.execute(select(Client).options(*Client.options_to_dict())).scalars().all()
+        resultats = [client.to_dict() for client in clients]
+
+        assert len(resultats) == 30
+        assert len(db_session.requetes) == 3
+
+    def test_adresse_principale_active(self, db_session) -> None:
+        """L'adresse principale est la première adresse active du client."""
+        client = db_session.execute(
+            select(Client).options(*Client.options_to_dict()).where(Client.id == 2)
+        ).scalar_one()
+        donnees = client.to_dict()
+
+        assert donnees['nom_affichage'] == 'Prénom1 Nom1'
+        assert donnees['code_postal'] == '69001'
+        assert donnees['ville'] == 'Lyon'
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests de la Liste des Clients (/clients/all_clients)
+====================================================
+
+Vérifie les filtres de la query string et l'export NDJSON par lots parcourus
+par curseur (mémoire bornée).
+
+Les tables nécessaires sont créées dans une base SQLite en mémoire.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+import json
+from datetime import date
+from unittest.mock import patch
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from flask import Flask
+    from sqlalchemy import event
+    from app_acfc.modeles import Client, Part, Pro, Adresse
+    from app_acfc.contextes_bp import clients as clients_module
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module clients: {e}", allow_module_level=True)
+
+
+@pytest.fixture
+def session_factory(base_sqlite):
+    """Fabrique de sessions SQLite en mémoire avec 5 clients professionnels actifs et 1 inactif."""
+    fabrique = base_sqlite(Client, Part, Pro, Adresse)
+    with fabrique() as session:
+        for i in range(1, 7):
+            session.add(Client(id=i, type_client=2, is_active=i != 6, created_at=date.today()))
+            session.add(Pro(id_client=i, raison_sociale=f'Société {i}', type_pro=1))
+        session.commit()
+    fabrique.requetes = []
+    event.listen(fabrique.engine, 'before_cursor_execute', lambda *args: fabrique.requetes.append(args[2]))
+    return fabrique
+
+
+@pytest.mark.unit
+class TestListeClients:
+    """Tests des filtres et de l'export en flux."""
+
+    def test_filtres_query_string(self) -> None:
+        """Statut actif par défaut, type et recherche optionnels."""
+        with Flask(__name__).test_request_context('/clients/all_clients?type=2&status=tous&search=ab'):
+            filtres = clients_module.filtres_liste_clients(clients_module.request)
+        assert [str(f) for f in filtres] == ['"01_clients".type_client = :type_client_1']
+
+        with Flask(__name__).test_request_context('/clients/all_clients'):
+            filtres = clients_module.filtres_liste_clients(clients_module.request)
+        assert [str(f) for f in filtres] == ['"01_clients".is_active = true']
+
+    def test_export_ndjson_par_lots(self, session_factory) -> None:
+        """Tous les clients filtrés sont exportés, par lots de taille bornée."""
+        with patch.object(clients_module, 'SessionBdD', session_factory), \
+             patch.object(clients_module, 'CLIENTS_STREAM_BATCH', 2):
+            lignes = list(clients_module.generer_clients_ndjson([Client.is_active == True]))
+
+        assert [json.loads(ligne)['id'] for ligne in lignes] == [1, 2, 3, 4, 5]
+        requetes_clients = [r for r in session_factory.requetes if r.startswith('SELECT "01_clients"')]
+        assert len(requetes_clients) == 3
+        assert all('LIMIT' in r for r in requetes_clients)
+
+    def test_export_ndjson_reprise(self, session_factory) -> None:
+        """L'export reprend après le curseur donné."""
+        with patch.object(clients_module, 'SessionBdD', session_factory):
+            lignes = list(clients_module.generer_clients_ndjson([], after=4))
+        assert [json.loads(ligne)['id'] for ligne in lignes] == [5, 6]
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests des Lignes de Commande
+============================
+
+Vérifie la construction des lignes DevisesFactures depuis le formulaire de
+commande, leur insertion en un seul ordre SQL et la mise à jour différentielle
+des lignes d'une commande modifiée.
+
+Les tables nécessaires sont créées dans une base SQLite en mémoire.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from sqlalchemy import event, insert, select, func
+    from werkzeug.datastructures import MultiDict
+    from app_acfc.modeles import Client, Adresse, Commande, DevisesFactures
+    from app_acfc.contextes_bp import commandes as commandes_module
+    from app_acfc.lignes_commande import calculer_diff, appliquer_diff, references_hors_catalogue, LignesFactureesError
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module commandes: {e}", allow_module_level=True)
+
+
+def produit(id: int, prix: str) -> SimpleNamespace:
+    """Produit du catalogue minimal."""
+    return SimpleNamespace(id=id, prix_unitaire_ht=prix, ref_auto=f'25TIMB{id:02d}', des_auto=f'TIMBRE {id}')
+
+
+@pytest.mark.unit
+class TestLignesCommande:
+    """Tests de la construction et de l'insertion des lignes."""
+
+    def test_construction_lignes(self) -> None:
+        """Prix personnalisé prioritaire, produits inconnus ignorés, montant total cumulé."""
+        formulaire = MultiDict({'qte_1': '2', 'qte_2': '3', 'prix_2': '0.50'})
+        lignes, montant = commandes_module.construire_lignes_commande(
+            7, [1, 2, 99], {1: produit(1, '1.25'), 2: produit(2, '1.25')}, formulaire)
+
+        assert [(l['reference'], l['qte'], l['prix_unitaire']) for l in lignes] == [('25TIMB01', 2, 1.25),
+                                                                                   ('25TIMB02', 3, 0.5)]
+        assert all(l['id_commande'] == 7 for l in lignes)
+        assert montant == Decimal('4.00')
+
+    def test_insertion_en_un_ordre(self, base_sqlite) -> None:
+        """Les lignes d'une commande de 40 produits sont insérées par un seul ordre SQL."""
+        session = base_sqlite(Client, Adresse, Commande, DevisesFactures)()
+        session.add(Client(id=1, type_client=1, created_at=date.today()))
+        session.add(Commande(id=1, id_client=1, date_commande=date.today(), montant=0))
+        session.commit()
+
+        produits = {i: produit(i, '1.00') for i in range(1, 41)}
+        lignes, _ = commandes_module.construire_lignes_commande(1, list(produits), produits, MultiDict())
+        ordres = []
+        event.listen(session.bind, 'before_cursor_execute', lambda *args: ordres.append(args[2]))
+        session.execute(insert(DevisesFactures), lignes)
+        session.commit()
+
+        assert len([o for o in ordres if o.startswith('INSERT')]) == 1
+        assert session.scalar(select(func.count(DevisesFactures.id))) == 40
+        assert session.scalar(select(func.sum(DevisesFactures.prix_total))) == 40
+        session.close()
+
+
+def ligne(id: int, reference: str, qte: int = 1, prix: str = '1.0000', id_facture: int | None = None) -> SimpleNamespace:
+    """Ligne existante minimale."""
+    return SimpleNamespace(id=id, reference=reference, designation=f'DES {reference}', qte=qte,
+                           prix_unitaire=Decimal(prix), remise=Decimal('0.0000'), id_facture=id_facture)
+
+
+def souhaitee(reference: str, qte: int = 1, prix: float = 1.0) -> dict:
+    """Ligne issue du formulaire."""
+    return {'id_commande': 1, 'reference': reference, 'designation': f'DES {reference}', 'qte': qte,
+            'prix_unitaire': prix, 'remise': 0.0}
+
+
+@pytest.mark.unit
+class TestDiffLignes:
+    """Tests du calcul et de l'application de la différence des lignes."""
+
+    def test_diff(self) -> None:
+        """Seules les lignes ajoutées, modifiées ou retirées produisent une écriture."""
+        existantes = [ligne(1, 'A'), ligne(2, 'B', qte=2), ligne(3, 'C'), ligne(4, 'A')]
+        diff = calculer_diff(existantes, [souhaitee('A'), souhaitee('B', qte=5), souhaitee('D')])
+
+        assert diff.inchangees == 1
+        assert diff.mises_a_jour == [{'id': 2, 'qte': 5}]
+        assert [l['reference'] for l in diff.insertions] == ['D']
+        assert sorted(diff.suppressions) == [3, 4]
+
+    def test_lignes_facturees_figees(self) -> None:
+        """Une ligne facturée peut rester inchangée mais pas être modifiée ni supprimée."""
+        existantes = [ligne(1, 'A', id_facture=9), ligne(2, 'B')]
+        assert calculer_diff(existantes, [souhaitee('A'), souhaitee('C')]).suppressions == [2]
+        with pytest.raises(LignesFactureesError):
+            calculer_diff(existantes, [souhaitee('A', qte=3)])
+        with pytest.raises(LignesFactureesError):
+            calculer_diff(existantes, [souhaitee('B')])
+
+    def test_lignes_hors_catalogue_conservees(self) -> None:
+        """Une ligne hors catalogue, absente du formulaire, n'est jamais supprimée implicitement."""
+        existantes = [ligne(1, 'A'), ligne(2, 'ANCIEN', id_facture=9), ligne(3, 'B')]
+        hors_catalogue = references_hors_catalogue(existantes, {'A', 'B'})
+        assert hors_catalogue == {'ANCIEN'}
+
+        diff = calculer_diff(existantes, [souhaitee('A')], hors_catalogue)
+        assert diff.suppressions == [3]
+        assert [l.id for l in diff.conservees] == [2] and diff.inchangees == 2
+
+    def test_application(self, base_sqlite) -> None:
+        """Les lignes conservées gardent leur identifiant et leur rattachement à une facture."""
+        session = base_sqlite(Client, Adresse, Commande, DevisesFactures)()
+        session.add(Client(id=1, type_client=1, created_at=date.today()))
+        session.add(Commande(id=1, id_client=1, date_commande=date.today(), montant=0))
+        for i, reference in enumerate(['A', 'B', 'C'], start=1):
+            session.add(DevisesFactures(id=i, id_commande=1, id_facture=9 if reference == 'A' else None,
+                                        reference=reference, designation=f'DES {reference}', qte=1,
+                                        prix_unitaire=1, remise=0))
+        session.commit()
+
+        existantes = session.scalars(select(DevisesFactures).order_by(DevisesFactures.id)).all()
+        appliquer_diff(session, calculer_diff(existantes, [souhaitee('A'), souhaitee('B', qte=4), souhaitee('D')]))
+        session.commit()
+        session.expire_all()
+
+        lignes = {l.reference: l for l in session.scalars(select(DevisesFactures))}
+        assert sorted(lignes) == ['A', 'B', 'D']
+        assert (lignes['A'].id, lignes['A'].id_facture) == (1, 9)
+        assert (lignes['B'].id, lignes['B'].qte, lignes['B'].prix_total) == (2, 4, 4)
+        session.close()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests des Changements d'État des Commandes en Lot
+=================================================
+
+Vérifie la préparation des demandes (identifiants, dates) et l'application
+d'une transition à un lot de commandes : résultat par commande, un seul UPDATE
+pour les commandes éligibles et mise à jour des cumuls de ventes.
+
+Les tables nécessaires sont créées dans une base SQLite en mémoire.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from datetime import date
+from decimal import Decimal
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from sqlalchemy import event
+    from app_acfc.modeles import Client, Adresse, Commande, VentesJournalieres
+    from app_acfc.etats_commandes import (appliquer_transition, valeurs_transition, identifiants_lot,
+                                          MODIFIEE, REFUSEE, INTROUVABLE, TAILLE_MAX_LOT)
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module etats_commandes: {e}", allow_module_level=True)
+
+
+@pytest.mark.unit
+class TestPreparationLot:
+    """Tests de validation des demandes."""
+
+    def test_identifiants(self) -> None:
+        """Identifiants convertis et dédoublonnés dans l'ordre, lots vides ou trop longs refusés."""
+        assert identifiants_lot(['3', 1, '3']) == [3, 1]
+        for valeurs in ([], None, ['abc'], list(range(TAILLE_MAX_LOT + 1))):
+            with pytest.raises(ValueError):
+                identifiants_lot(valeurs)
+
+    def test_valeurs(self) -> None:
+        """Date du jour par défaut, numéro de suivi vide ignoré, action inconnue refusée."""
+        assert valeurs_transition('facture', {'date_facturation': '2025-03-01'}) == {
+            'is_facture': True, 'date_facturation': date(2025, 3, 1)}
+        assert valeurs_transition('expedie', {'id_suivi': ' '})['id_suivi'] is None
+        assert valeurs_transition('expedie', {})['date_expedition'] == date.today()
+        with pytest.raises(ValueError):
+            valeurs_transition('facture', {'date_facturation': '01/03/2025'})
+        with pytest.raises(ValueError):
+            valeurs_transition('supprime', {})
+
+
+@pytest.mark.unit
+class TestApplicationLot:
+    """Tests des transitions sur une base SQLite."""
+
+    @pytest.fixture
+    def session(self, base_sqlite):
+        session = base_sqlite(Client, Adresse, Commande, VentesJournalieres)()
+        session.add(Client(id=1, type_client=1, created_at=date.today()))
+        session.add_all([
+            Commande(id=1, id_client=1, date_commande=date(2025, 3, 1), montant=Decimal('10.00')),
+            Commande(id=2, id_client=1, date_commande=date(2025, 3, 1), montant=Decimal('5.00')),
+            Commande(id=3, id_client=1, date_commande=date(2025, 3, 1), montant=Decimal('7.00'), is_annulee=True),
+            Commande(id=4, id_client=1, date_commande=date(2025, 3, 2), montant=Decimal('3.00'), is_facture=True),
+        ])
+        session.commit()
+        yield session
+        session.close()
+
+    def test_facturation_lot(self, session) -> None:
+        """Un seul UPDATE pour les éligibles, motif pour les autres, cumul de ventes recalculé."""
+        updates = []
+        event.listen(session.bind, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: updates.append(statement)
+                     if statement.startswith('UPDATE "11_commandes"') else None)
+
+        resultats, nb = appliquer_transition(session, 'facture', [1, 2, 3, 4, 99],
+                                             valeurs_transition('facture', {'date_facturation': '2025-03-05'}))
+        session.commit()
+
+        assert nb == 2
+        assert len(updates) == 1
+        assert [r['statut'] for r in resultats] == [MODIFIEE, MODIFIEE, REFUSEE, REFUSEE, INTROUVABLE]
+        assert resultats[2]['message'] == 'Commande annulée'
+        assert session.get(Commande, 2).date_facturation == date(2025, 3, 5)
+        cumul = session.get(VentesJournalieres, (date(2025, 3, 1), 1))
+        assert cumul is not None and cumul.montant_total == Decimal('15.00')
+
+    def test_expedition_et_annulation(self, session) -> None:
+        """L'expédition exige une commande facturée ; une commande expédiée ne peut être annulée."""
+        resultats, nb = appliquer_transition(session, 'expedie', [1, 4],
+                                             valeurs_transition('expedie', {'id_suivi': 'XY123'}))
+        session.commit()
+        assert nb == 1
+        assert resultats[0]['statut'] == REFUSEE
+        assert session.get(Commande, 4).id_suivi == 'XY123'
+
+        resultats, nb = appliquer_transition(session, 'annule', [1, 4], valeurs_transition('annule', {}))
+        session.commit()
+        assert nb == 1
+        assert [r['statut'] for r in resultats] == [MODIFIEE, REFUSEE]
+        assert session.get(Commande, 1).is_annulee
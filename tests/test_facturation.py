@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests de la Génération des Factures par Lot
+===========================================
+
+Vérifie la sélection des commandes à facturer, la création des factures avec
+le rattachement de leurs lignes et le traitement par lots du job.
+
+Les tables nécessaires sont créées dans une base SQLite en mémoire.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from datetime import date
+from decimal import Decimal
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from sqlalchemy import select
+    from app_acfc.modeles import Client, Adresse, Commande, DevisesFactures, Facture
+    from app_acfc import facturation
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module facturation: {e}", allow_module_level=True)
+
+
+@pytest.fixture
+def fabrique(base_sqlite):
+    fabrique = base_sqlite(Client, Adresse, Commande, DevisesFactures, Facture, ids_fiscaux=True)
+
+    session = fabrique()
+    session.add_all([Client(id=1, type_client=1, created_at=date.today()),
+                     Client(id=2, type_client=1, created_at=date.today())])
+    session.add(Adresse(id=10, id_client=1, adresse_l1='1 rue', code_postal='75001', ville='Paris',
+                        is_principal=True, created_at=date.today()))
+    facturees = dict(is_facture=True, date_facturation=date(2025, 9, 30))
+    session.add_all([
+        Commande(id=1, id_client=1, date_commande=date(2025, 9, 1), montant=Decimal('2.50'), **facturees),
+        Commande(id=2, id_client=1, date_commande=date(2025, 9, 2), montant=Decimal('4.00'), **facturees),
+        Commande(id=3, id_client=1, date_commande=date(2025, 9, 3), montant=Decimal('1.00')),
+        Commande(id=4, id_client=1, date_commande=date(2025, 9, 4), montant=Decimal('1.00'), is_annulee=True, **facturees),
+        Commande(id=5, id_client=2, date_commande=date(2025, 9, 5), montant=Decimal('1.00'), **facturees),
+    ])
+    session.add_all([DevisesFactures(id_commande=i, reference=f'R{i}', designation='D', qte=1,
+                                     prix_unitaire=Decimal('1'), remise=0) for i in (1, 1, 2, 3)])
+    session.commit()
+    session.close()
+    return fabrique
+
+
+@pytest.mark.unit
+class TestFacturationLot:
+    """Tests du job de facturation."""
+
+    def test_generation(self, fabrique, monkeypatch) -> None:
+        """Commandes facturées non annulées uniquement, lignes rattachées, logs vidés, job idempotent."""
+        monkeypatch.setattr(facturation, 'SessionBdD', fabrique)
+        vidages = []
+        monkeypatch.setattr(facturation.acfc_log.registre, 'vider', lambda: vidages.append('fichiers'))
+
+        bilan = facturation.generer_factures(taille_lot=1)
+        assert vidages == ['fichiers']  # Logs écrits avant la fin du processus du worker RQ
+        assert bilan['factures'] == 2
+        assert bilan['lots'] == 3
+        assert bilan['sans_adresse'] == [5]
+        assert bilan['lots_en_erreur'] == 0
+
+        session = fabrique()
+        factures = session.scalars(select(Facture).order_by(Facture.id_commande)).all()
+        assert [(f.id_commande, f.id_adresse, f.montant_facture) for f in factures] == [
+            (1, 10, Decimal('2.50')), (2, 10, Decimal('4.00'))]
+        assert all(f.id_fiscal.startswith('2025-09-') for f in factures)
+        liens = dict(session.execute(select(DevisesFactures.id_commande, DevisesFactures.id_facture)).all())
+        assert liens == {1: factures[0].id, 2: factures[1].id, 3: None}
+        session.close()
+
+        assert facturation.generer_factures()['factures'] == 0
+
+    def test_date_limite(self, fabrique) -> None:
+        """Seules les commandes facturées jusqu'à la date limite sont retenues."""
+        session = fabrique()
+        assert facturation.commandes_a_facturer(session, 0, 10, date(2025, 9, 29)) == []
+        assert [c.id for c in facturation.commandes_a_facturer(session, 1, 10)] == [2, 5]
+        session.close()
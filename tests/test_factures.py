@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests des Identifiants Fiscaux des Factures
+===========================================
+
+Vérifie le format des identifiants fiscaux (YYYY-MM-XXXXXX-C, clé EAN-13) et
+leur attribution après le flush : un seul UPDATE pour toutes les factures
+insérées.
+
+Les tables nécessaires sont créées dans une base SQLite en mémoire.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from datetime import date
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from sqlalchemy import event
+    from app_acfc.modeles import Facture
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le modèle Facture: {e}", allow_module_level=True)
+
+
+@pytest.mark.unit
+class TestIdsFiscaux:
+    """Tests de l'identifiant fiscal des factures."""
+
+    def test_format(self) -> None:
+        """Format YYYY-MM-XXXXXX-C avec la clé EAN-13 des 12 chiffres."""
+        assert Facture.cle_ean13('202503000042') == '2'
+        assert Facture.format_id_fiscal(42, date(2025, 3, 14)) == '2025-03-000042-2'
+        with pytest.raises(ValueError):
+            Facture.cle_ean13('2025')
+
+    def test_attribution_apres_flush(self, base_sqlite) -> None:
+        """Un seul UPDATE par flush ; identifiant déjà saisi conservé."""
+        fabrique = base_sqlite(Facture, ids_fiscaux=True)
+        updates = []
+        event.listen(fabrique.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: updates.append(statement)
+                     if statement.startswith('UPDATE') else None)
+
+        session = fabrique()
+        factures = [Facture(id_client=1, id_commande=i, id_adresse=1, date_facturation=date(2025, 3, 14))
+                    for i in range(1, 4)]
+        factures.append(Facture(id_client=1, id_commande=4, id_adresse=1,
+                                date_facturation=date(2025, 3, 14), id_fiscal='MANUEL'))
+        session.add_all(factures)
+        session.commit()
+
+        assert len(updates) == 1
+        assert [f.id_fiscal for f in factures] == [Facture.format_id_fiscal(f.id, date(2025, 3, 14))
+                                                   for f in factures[:3]] + ['MANUEL']
+        assert session.get(Facture, factures[0].id).id_fiscal == factures[0].id_fiscal
+        session.close()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests des Index de Performance
+==============================
+
+Vérifie la déclaration des index composites sur les modèles et la détection
+des parcours complets de table dans les plans EXPLAIN.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from sqlalchemy.dialects import mysql
+    from app_acfc.index_bdd import analyser_plan, requetes_critiques
+    from app_acfc.modeles import Commande
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module d'index: {e}", allow_module_level=True)
+
+
+@pytest.mark.unit
+class TestIndexPerformance:
+    """Tests des index de performance et de l'analyse des plans."""
+
+    def test_index_commandes_declares(self) -> None:
+        """Les index composites des commandes suivent l'ordre des filtres."""
+        index = {i.name: [c.name for c in i.columns] for i in Commande.__table__.indexes}
+        assert index['ix_commandes_facture_date'] == ['is_facture', 'is_annulee', 'date_commande']
+        assert index['ix_commandes_en_cours'] == ['is_annulee', 'is_expedie', 'is_facture', 'date_commande']
+        assert index['ix_commandes_client_date'] == ['id_client', 'date_commande']
+
+    def test_requetes_critiques_compilables(self) -> None:
+        """Chaque requête critique se compile en SQL MariaDB avec ses paramètres."""
+        for requete in requetes_critiques().values():
+            sql = str(requete.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+            assert sql.startswith('SELECT')
+
+    def test_parcours_complet_detecte(self) -> None:
+        """Un type=ALL au-delà du seuil est signalé, un accès par index ne l'est pas."""
+        plan = [
+            {'table': '11_commandes', 'type': 'ALL', 'rows': 5000, 'possible_keys': None},
+            {'table': '01_clients', 'type': 'eq_ref', 'rows': 1, 'possible_keys': 'PRIMARY'},
+        ]
+        anomalies = analyser_plan(plan)
+        assert len(anomalies) == 1
+        assert '11_commandes' in anomalies[0]
+
+    def test_petites_tables_tolerees(self) -> None:
+        """Un parcours complet d'une petite table est toléré sous le seuil."""
+        assert analyser_plan([{'table': '04_adresse', 'type': 'ALL', 'rows': 12}], seuil_lignes=100) == []
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests du Moteur d'Indicateurs Commerciaux
+=========================================
+
+Vérifie que les indicateurs du tableau de bord sont calculés en une seule
+requête d'agrégation conditionnelle et correctement mis en forme.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from datetime import date
+from unittest.mock import Mock
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from sqlalchemy.dialects import mysql
+    from app_acfc.indicateurs import (MoteurIndicateurs, Indicateur, INDICATEURS_COMMERCIAUX,
+                                      debuts_periodes, rafraichir_ventes_journalieres,
+                                      SOMME, RATIO, MOIS, ANNEE)
+    from app_acfc.modeles import VentesJournalieres
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le moteur d'indicateurs: {e}", allow_module_level=True)
+
+
+def _sql(moteur: MoteurIndicateurs, reference: date) -> str:
+    """Compile la requête du moteur en SQL MariaDB."""
+    return str(moteur.construire_requete(reference).compile(dialect=mysql.dialect(),
+                                                             compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.unit
+class TestMoteurIndicateurs:
+    """Tests du moteur d'indicateurs."""
+
+    def test_debuts_periodes(self) -> None:
+        """Les périodes commencent au premier jour du mois et de l'année."""
+        debuts = debuts_periodes(date(2025, 8, 20))
+        assert debuts[MOIS] == date(2025, 8, 1)
+        assert debuts[ANNEE] == date(2025, 1, 1)
+
+    def test_une_seule_requete(self) -> None:
+        """Tous les indicateurs sont calculés dans un unique SELECT."""
+        sql = _sql(MoteurIndicateurs(), date(2025, 8, 20))
+        assert sql.count('SELECT') == 1
+        for indicateur in INDICATEURS_COMMERCIAUX:
+            assert f'AS {indicateur.cle}' in sql
+        assert "jour >= '2025-01-01'" in sql.split('WHERE')[1]
+        assert '14_ventes_journalieres' in sql
+
+    def test_mise_en_forme_et_valeurs_nulles(self) -> None:
+        """Les agrégats NULL (aucune commande) sont remplacés par 0."""
+        moteur = MoteurIndicateurs((
+            Indicateur('ca', 'CA', SOMME, VentesJournalieres.montant_total, MOIS),
+        ))
+        db_session = Mock()
+        db_session.execute.return_value.mappings.return_value.one.return_value = {'ca': None}
+
+        assert moteur.calculer(db_session, date(2025, 8, 20)) == {'ca': [0, 'CA']}
+        db_session.execute.assert_called_once()
+
+    def test_agregat_inconnu(self) -> None:
+        """Une définition invalide est rejetée dès la déclaration."""
+        with pytest.raises(ValueError):
+            Indicateur('x', 'X', 'mediane', VentesJournalieres.montant_total)
+        with pytest.raises(ValueError):
+            Indicateur('x', 'X', RATIO, VentesJournalieres.montant_total)
+
+    def test_ratio_protege_division_par_zero(self) -> None:
+        """Le panier moyen divise par NULLIF(SUM(nb_commandes), 0)."""
+        moteur = MoteurIndicateurs((
+            Indicateur('panier', 'Panier', RATIO, VentesJournalieres.montant_total, ANNEE,
+                       diviseur=VentesJournalieres.nb_commandes),
+        ))
+        sql = _sql(moteur, date(2025, 8, 20))
+        assert 'nullif(sum(CASE' in sql
+
+
+@pytest.mark.unit
+class TestCumulVentesJournalieres:
+    """Tests de la maintenance du cumul journalier des ventes."""
+
+    def test_rafraichir_sans_cle(self) -> None:
+        """Aucune requête n'est émise sans clé valide."""
+        db_session = Mock()
+        rafraichir_ventes_journalieres(db_session, [(None, 1), (date(2025, 8, 20), None)])
+        db_session.execute.assert_not_called()
+
+    def test_rafraichir_dedoublonne_les_cles(self) -> None:
+        """Les clés identiques sont recalculées une seule fois (DELETE puis INSERT ... SELECT)."""
+        db_session = Mock()
+        cle = (date(2025, 8, 20), 42)
+        rafraichir_ventes_journalieres(db_session, [cle, cle])
+
+        db_session.flush.assert_called_once()
+        assert db_session.execute.call_count == 2
+        suppression, insertion = (str(c.args[0].compile(dialect=mysql.dialect()))
+                                  for c in db_session.execute.call_args_list)
+        assert suppression.startswith('DELETE FROM `14_ventes_journalieres`')
+        assert insertion.startswith('INSERT INTO `14_ventes_journalieres`')
+        assert 'GROUP BY' in insertion
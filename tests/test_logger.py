@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Tests du Système de Logging
+===========================
+
+Vérifie l'envoi asynchrone des logs MongoDB : lots insert_many, abandon
+des entrées lorsque la file est pleine et vidage de la file à l'arrêt.
+Vérifie le registre des loggers fichiers : un seul fichier ouvert par nom,
+plafond des fichiers de zone et écriture par file d'attente bornée.
+Vérifie le niveau minimal par zone et le formatage différé des messages.
+Vérifie le format JSON et la propagation du contexte de requête.
+
+La collection MongoDB est remplacée par un objet enregistrant les lots reçus.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+import json
+import logging
+from queue import Queue
+from threading import Event
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    from logs.logger import (ExpediteurMongo, RegistreLoggers, FileAttenteHandler, CustomLogger,
+                             FormatJSON, contexte_requete, compter_requete_bdd,
+                             lire_niveaux_zones, DEBUG, INFO, WARNING)
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module logger: {e}", allow_module_level=True)
+
+
+class CollectionEnregistree:
+    """Collection recevant les lots ; peut être bloquée pour simuler une base lente."""
+
+    def __init__(self, bloquee: bool = False) -> None:
+        self.lots = []
+        self.debloquer = Event()
+        if not bloquee:
+            self.debloquer.set()
+
+    def insert_many(self, entrees, ordered=True) -> None:
+        self.debloquer.wait(5)
+        self.lots.append(list(entrees))
+
+
+@pytest.mark.unit
+class TestExpediteurMongo:
+    """Tests de l'expéditeur asynchrone des logs MongoDB."""
+
+    def test_envoi_par_lots(self) -> None:
+        """Les entrées sont regroupées par lots de taille bornée."""
+        collection = CollectionEnregistree(bloquee=True)
+        expediteur = ExpediteurMongo(collection, taille_file=100, taille_lot=10, delai_envoi=0.05)
+        for i in range(25):
+            assert expediteur.soumettre({'message': i})
+        collection.debloquer.set()
+        expediteur.vider()
+
+        assert sum(len(lot) for lot in collection.lots) == 25
+        assert max(len(lot) for lot in collection.lots) <= 10
+        stats = expediteur.statistiques()
+        assert stats['envoyees'] == 25 and stats['en_attente'] == 0
+        expediteur.arreter()
+
+    def test_file_pleine_et_arret(self) -> None:
+        """File pleine : entrée abandonnée et comptée ; l'arrêt envoie les entrées restantes."""
+        collection = CollectionEnregistree(bloquee=True)
+        expediteur = ExpediteurMongo(collection, taille_file=2, taille_lot=1, delai_envoi=0.05)
+        resultats = [expediteur.soumettre({'message': i}) for i in range(10)]
+        assert resultats.count(False) >= 7
+        assert expediteur.statistiques()['abandonnees'] == resultats.count(False)
+
+        collection.debloquer.set()
+        expediteur.arreter()
+        assert sum(len(lot) for lot in collection.lots) == resultats.count(True)
+        assert not expediteur.soumettre({'message': 'après arrêt'})
+
+
+@pytest.mark.unit
+class TestRegistreLoggers:
+    """Tests du registre des loggers fichiers."""
+
+    def test_logger_reutilise(self, tmp_path) -> None:
+        """Un logger de zone obtenu N fois n'écrit chaque message qu'une fois."""
+        registre = RegistreLoggers(str(tmp_path), max_fichiers_zones=4)
+        for i in range(5):
+            registre.obtenir_zone('test_zone.log', DEBUG).debug(f'message {i}')
+        registre.vider()
+
+        assert (tmp_path / 'test_zone.log').read_text().count('message 0') == 1
+        assert len(registre.obtenir('test_zone.log', DEBUG).handlers) == 1
+        stats = registre.statistiques()
+        assert stats['descripteurs'] == 1 and stats['en_attente'] == 0
+        registre.arreter()
+
+    def test_plafond_zones(self, tmp_path) -> None:
+        """Au-delà du plafond, aucune nouvelle zone n'est ouverte et le refus est compté."""
+        registre = RegistreLoggers(str(tmp_path), max_fichiers_zones=2)
+        assert registre.obtenir_zone('test_plafond_a.log', DEBUG) is not None
+        assert registre.obtenir_zone('test_plafond_b.log', DEBUG) is not None
+        assert registre.obtenir_zone('test_plafond_c.log', DEBUG) is None
+        assert registre.obtenir_zone('test_plafond_a.log', DEBUG) is not None
+        assert registre.statistiques()['zones_refusees'] == 1
+        registre.arreter()
+
+    def test_file_pleine(self) -> None:
+        """File d'écriture pleine : les enregistrements sont abandonnés et comptés, sans exception."""
+        handler = FileAttenteHandler(Queue(maxsize=1), attente_max=0)
+        for i in range(3):
+            handler.handle(logging.LogRecord('test', DEBUG, __file__, 0, f'message {i}', None, None))
+        assert handler.queue.qsize() == 1
+        assert handler.statistiques() == {'bloques': 2, 'abandonnes': 2}
+
+
+@pytest.mark.unit
+class TestNiveauxZones:
+    """Tests du niveau minimal par zone et du formatage différé."""
+
+    def test_lecture_configuration(self) -> None:
+        """Entrées mal formées et niveaux inconnus ignorés."""
+        assert lire_niveaux_zones('commandes.log=warning, login.log=INFO,bad,x=TRACE') == {
+            'commandes.log': WARNING, 'login.log': INFO}
+
+    def test_message_non_formate_sous_le_niveau(self) -> None:
+        """Sous le niveau de la zone, les arguments ne sont jamais convertis en texte."""
+        class Couteux:
+            conversions = 0
+
+            def __str__(self) -> str:
+                Couteux.conversions += 1
+                return 'couteux'
+
+        journal = CustomLogger.__new__(CustomLogger)  # Sans connexion MongoDB ni fichiers
+        journal.niveau_defaut = DEBUG
+        journal.niveaux_zones = {}
+        journal.definir_niveau(WARNING, 'test_zone')
+        emis = []
+        journal._log_to_db = lambda level, message, **kwargs: emis.append(message)
+
+        journal.log_to_file(DEBUG, 'Valeur : %s', Couteux(), zone_log='test_zone', db_log=True)
+        assert Couteux.conversions == 0 and emis == []
+        assert not journal.est_actif(INFO, 'test_zone') and journal.est_actif(DEBUG, 'autre')
+
+        journal.debug_logger = logging.getLogger('test_niveaux')
+        journal.log_to_file(DEBUG, 'Valeur : %s', Couteux(), zone_log='autre', db_log=True)
+        assert Couteux.conversions == 1 and emis == ['Valeur : couteux']
+
+
+@pytest.mark.unit
+class TestFormatJSON:
+    """Tests du format JSON et du contexte de requête."""
+
+    def test_contexte_dans_la_ligne(self, tmp_path) -> None:
+        """Le contexte lu dans le thread de la requête figure dans la ligne JSON écrite par la file."""
+        registre = RegistreLoggers(str(tmp_path))
+        jeton = contexte_requete.set({'id_requete': 'abc', 'utilisateur': 'jdupont', 'endpoint': 'x', 'requetes_bdd': 0})
+        try:
+            compter_requete_bdd()
+            registre.obtenir('test_json.log', DEBUG).info('Message %s', 1, extra={'champs': {'duree_ms': 12.5}})
+        finally:
+            contexte_requete.reset(jeton)
+        registre.vider()
+        registre.arreter()
+
+        ligne = json.loads((tmp_path / 'test_json.log').read_text().splitlines()[0])
+        assert ligne['message'] == 'Message 1'
+        assert ligne['niveau'] == 'INFO'
+        assert (ligne['id_requete'], ligne['utilisateur'], ligne['requetes_bdd']) == ('abc', 'jdupont', 1)
+        assert ligne['duree_ms'] == 12.5
+
+    def test_trace_exception(self, tmp_path) -> None:
+        """La trace d'une exception traverse la file dans un champ distinct du message."""
+        registre = RegistreLoggers(str(tmp_path))
+        try:
+            raise ValueError('montant invalide')
+        except ValueError:
+            registre.obtenir('test_exception.log', DEBUG).error('Sauvegarde refusée', exc_info=True)
+        registre.vider()
+        registre.arreter()
+
+        ligne = json.loads((tmp_path / 'test_exception.log').read_text().splitlines()[0])
+        assert ligne['message'] == 'Sauvegarde refusée'
+        assert ligne['exception'].startswith('Traceback') and 'ValueError: montant invalide' in ligne['exception']
+
+    def test_hors_requete(self) -> None:
+        """Hors requête : pas de champ de contexte, caractères non ASCII conservés."""
+        record = logging.LogRecord('test', INFO, __file__, 0, 'Facturée', None, None)
+        ligne = json.loads(FormatJSON().format(record))
+        assert ligne['message'] == 'Facturée' and 'id_requete' not in ligne
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests du Calcul Exact des Montants
+==================================
+
+Vérifie les conversions et arrondis décimaux des lignes et des commandes, et
+le rapprochement du montant des commandes avec les lignes en base.
+
+Les tables nécessaires sont créées dans une base SQLite en mémoire.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from datetime import date
+from decimal import Decimal
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from app_acfc.modeles import Client, Adresse, Commande, DevisesFactures, VentesJournalieres
+    from app_acfc.montants import (en_decimal, total_ligne, totaux_commande, montant_lignes_commande,
+                                   ecarts_montants, corriger_montants, PRECISION_LIGNE)
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module montants: {e}", allow_module_level=True)
+
+
+@pytest.mark.unit
+class TestCalculMontants:
+    """Tests des conversions et des arrondis."""
+
+    def test_conversions(self) -> None:
+        """Saisies avec virgule, float par leur représentation décimale, saisie invalide refusée."""
+        assert en_decimal('1,29') == Decimal('1.29')
+        assert en_decimal(0.1) == Decimal('0.1')
+        assert en_decimal('') == Decimal('0')
+        assert en_decimal('0.00005', PRECISION_LIGNE) == Decimal('0.0001')
+        with pytest.raises(ValueError):
+            en_decimal('abc')
+        with pytest.raises(ValueError):
+            en_decimal('NaN')
+
+    def test_totaux(self) -> None:
+        """Aucune dérive binaire : 3 x 0.1 vaut exactement 0.30, arrondi commercial à 2 décimales."""
+        assert total_ligne(3, 0.1) == Decimal('0.3000')
+        assert total_ligne(1, '10', '0.1') == Decimal('9.0000')
+        totaux, montant = totaux_commande([{'qte': 1, 'prix_unitaire': '0.0050'},
+                                           {'qte': 3, 'prix_unitaire': 0.1, 'remise': 0}])
+        assert totaux == [Decimal('0.0050'), Decimal('0.3000')]
+        assert montant == Decimal('0.31')
+
+
+@pytest.mark.unit
+class TestRapprochementMontants:
+    """Tests du rapprochement avec les prix_total calculés par la base."""
+
+    def test_ecarts_et_correction(self, base_sqlite) -> None:
+        """Seules les commandes en écart sont signalées puis corrigées, avec leur cumul de ventes."""
+        session = base_sqlite(Client, Adresse, Commande, DevisesFactures, VentesJournalieres)()
+        session.add(Client(id=1, type_client=1, created_at=date.today()))
+        session.add_all([Commande(id=1, id_client=1, date_commande=date.today(), montant=Decimal('2.50')),
+                         Commande(id=2, id_client=1, date_commande=date.today(), montant=Decimal('9.99'),
+                                  is_facture=True)])
+        session.add(VentesJournalieres(jour=date.today(), id_client=1, nb_commandes=1, montant_total=Decimal('9.99')))
+        session.add_all([DevisesFactures(id_commande=i, reference='R', designation='D', qte=2,
+                                         prix_unitaire=Decimal('1.25'), remise=0) for i in (1, 2)])
+        session.commit()
+
+        assert montant_lignes_commande(session, 2) == Decimal('2.50')
+        assert list(ecarts_montants(session)) == [2]
+        assert corriger_montants(session) == 1
+        session.commit()
+        assert ecarts_montants(session) == {}
+        assert session.get(VentesJournalieres, (date.today(), 1)).montant_total == Decimal('2.50')
+        assert corriger_montants(session) == 0
+        session.close()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests de l'Index de Recherche des Clients
+=========================================
+
+Vérifie la normalisation et le découpage en trigrammes, la construction de la
+requête de candidats et la détection des clients à réindexer.
+
+Auteur : ACFC Development Team
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import Mock
+
+# Configuration des chemins d'import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
+
+try:
+    from sqlalchemy.dialects import mysql
+    from app_acfc.recherche import (normaliser, trigrammes, clients_candidats, filtre_candidats,
+                                    clients_modifies, rafraichir_index_recherche, requete_recherche,
+                                    rechercher_clients, source_du_score, index_recherche_rempli,
+                                    SOURCES, SOURCE_MAIL, SOURCE_PART)
+    from app_acfc import recherche
+    from app_acfc.modeles import Client, Mail, Adresse, Commande
+except ImportError as e:
+    pytest.skip(f"Impossible d'importer le module de recherche: {e}", allow_module_level=True)
+
+
+@pytest.mark.unit
+class TestIndexRecherche:
+    """Tests de l'index de trigrammes."""
+
+    def test_normalisation(self) -> None:
+        """Minuscules, accents retirés et espaces réduits."""
+        assert normaliser('  Hélène   DUPONT ') == 'helene dupont'
+        assert normaliser(None) == ''
+
+    def test_trigrammes(self) -> None:
+        """Une valeur est découpée en trigrammes glissants."""
+        assert trigrammes('Éric') == {'eri', 'ric'}
+        assert trigrammes('ab') == set()
+
+    def test_requete_candidats(self) -> None:
+        """Les candidats doivent porter tous les trigrammes du terme dans une même source."""
+        sql = str(clients_candidats('Marc', [SOURCE_MAIL]).compile(
+            dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert "IN ('arc', 'mar')" in sql
+        assert 'HAVING count(*) = 2' in sql
+
+    def test_terme_sans_trigramme(self) -> None:
+        """Un terme trop court après normalisation ne restreint pas la recherche."""
+        assert str(filtre_candidats(' É ', Client.id)) == 'true'
+
+    def test_index_vide(self, monkeypatch) -> None:
+        """Index vide : pas de filtre de candidats, recherche ILIKE seule ; l'état rempli est mémorisé."""
+        monkeypatch.setattr(recherche, '_index_rempli', False)
+        db_session = Mock()
+        db_session.execute.return_value.first.return_value = None
+        assert not index_recherche_rempli(db_session)
+        sql = str(requete_recherche('Mar', (SOURCE_PART,), avec_index=False).compile(dialect=mysql.dialect()))
+        assert '05_index_recherche' not in sql and 'LIKE' in sql
+
+        db_session.execute.return_value.first.return_value = (1,)
+        assert index_recherche_rempli(db_session)
+        db_session.execute.reset_mock()
+        assert index_recherche_rempli(db_session) and not db_session.execute.called
+
+    def test_clients_modifies(self) -> None:
+        """Seuls les clients des contacts écrits dans la session sont réindexés."""
+        db_session = Mock(new=[Mail(id_client=3)], dirty=[Commande(id_client=8)],
+                          deleted=[Adresse(id_client=5)])
+        assert clients_modifies(db_session) == {3, 5}
+
+    def test_rafraichir(self) -> None:
+        """L'index d'un client est supprimé puis réinséré en une seule instruction."""
+        db_session = Mock()
+        db_session.execute.side_effect = [None, [(3, SOURCE_MAIL, 'abcd')], None]
+        rafraichir_index_recherche(db_session, [3, None, 3])
+
+        assert db_session.execute.call_count == 3
+        lignes = db_session.execute.call_args_list[2].args[1]
+        assert lignes == [{'trigramme': 'abc', 'source': SOURCE_MAIL, 'id_client': 3},
+                          {'trigramme': 'bcd', 'source': SOURCE_MAIL, 'id_client': 3}]
+
+
+@pytest.mark.unit
+class TestRecherchePaginee:
+    """Tests de la recherche paginée en SQL."""
+
+    def test_limite_et_tri_en_sql(self) -> None:
+        """La page, le tri et la ligne supplémentaire sont demandés à la base."""
+        sql = str(requete_recherche('Mar', (SOURCE_PART,), offset=40, limit=20).compile(
+            dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert 'LIMIT 40, 21' in sql
+        assert 'ORDER BY meilleures.score' in sql
+        assert 'DISTINCT' not in sql
+
+    def test_toutes_sources_une_requete(self) -> None:
+        """Le mode « tous » réunit les sources et regroupe les correspondances par client."""
+        sql = str(requete_recherche('Mar', SOURCES).compile(
+            dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert sql.count('UNION ALL') == len(SOURCES) - 1
+        assert 'min(correspondances.score)' in sql
+        assert 'GROUP BY correspondances.id_client' in sql
+
+    def test_source_et_indicateur_resultats_supplementaires(self) -> None:
+        """La source est déduite du score ; la ligne supplémentaire n'est pas retournée."""
+        assert source_du_score(12) == SOURCE_MAIL
+        db_session = Mock()
+        db_session.execute.return_value.all.return_value = [('a', 0), ('b', 12), ('c', 10)]
+        assert rechercher_clients(db_session, 'Mar', SOURCES, limit=2) == ([('a', SOURCE_PART), ('b', SOURCE_MAIL)], True)
+
+        db_session.execute.return_value.all.return_value = [('a', 2)]
+        assert rechercher_clients(db_session, 'Mar', SOURCES, limit=2) == ([('a', SOURCE_MAIL)], False)
@@ -39,6 +39,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_acfc'))
 try:
     from app_acfc.application import acfc
     from app_acfc.modeles import User
+    from logs.logger import acfc_log
 except ImportError as e:
     pytest.skip(f"Impossible d'importer les modules application: {e}", allow_module_level=True)
 
@@ -608,6 +609,45 @@ class TestIntegration:
                 response = client.post('/chg_pwd', data=pwd_data)
                 assert response.status_code == 200
 
+# ====================================================================
+# TESTS DU CONTEXTE DE LOG DES REQUÊTES
+# ====================================================================
+
+class ExpediteurEnregistre:
+    """Remplace l'expéditeur MongoDB : conserve les entrées soumises."""
+
+    def __init__(self) -> None:
+        self.entrees: list[dict[str, Any]] = []
+
+    def soumettre(self, entree: dict[str, Any]) -> bool:
+        self.entrees.append(entree)
+        return True
+
+class TestContexteRequete:
+    """Tests de l'utilisateur et de la trace de fin de requête dans les logs."""
+
+    @patch('app_acfc.application.SessionBdD')
+    @patch('app_acfc.application.ph_acfc')
+    def test_utilisateur_apres_connexion(self, mock_ph: Mock, mock_session_class: Mock,
+                                         client: FlaskClient, mock_user: Mock) -> None:
+        """Après la connexion, le pseudo figure dans le contexte et dans la trace MongoDB de la requête."""
+        mock_session_class.return_value.query.return_value.filter_by.return_value.first.return_value = mock_user
+        mock_ph.verify_password.return_value = True
+        mock_ph.needs_rehash.return_value = False
+        mock_user.permission = '1'  # Valeur sérialisable dans la session
+        expediteur = ExpediteurEnregistre()
+
+        with patch.object(acfc_log, 'expediteur', expediteur), patch.object(acfc_log, 'mongodb_available', True):
+            response = client.post('/login', data={'username': 'testuser', 'password': 'testpassword123'})
+            assert response.status_code == 302
+            response = client.get('/health')
+
+        traces = [entree for entree in expediteur.entrees if entree['zone'] == 'requetes']
+        assert [trace['endpoint'] for trace in traces] == ['login', 'health']
+        assert all(trace['utilisateur'] == 'testuser' for trace in traces)
+        assert traces[1]['id_requete'] == response.headers['X-Request-ID']
+        assert traces[1]['statut'] == response.status_code and 'duree_ms' in traces[1]
+
 # ====================================================================
 # CONFIGURATION DES TESTS
 # ====================================================================